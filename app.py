@@ -1,10 +1,38 @@
 import streamlit as st
-import datetime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import os
 import random
-import string
-import hashlib
-import base64
-import pandas as pd
+import tempfile
+
+from password_meter import (
+    CAPITALIZATIONS,
+    EXPORT_FORMATS,
+    IMPORT_FORMATS,
+    STRENGTH_CATEGORIES,
+    STRENGTH_CLASSES,
+    STRENGTH_LABELS,
+    available_formats,
+    brute_force_time,
+    describe_patterns,
+    detect_format,
+    display_time,
+    downsample,
+    export_history,
+    format_timestamp,
+    generate_passphrase,
+    generate_password,
+    get_default_policy,
+    get_default_wordlist,
+    get_score_cache,
+    get_suggestions,
+    import_entries,
+    new_entry,
+    open_history,
+    passphrase_conflicts,
+    passphrase_entropy,
+    score_password,
+)
+from password_meter import instrument
 
 # Page configuration
 st.set_page_config(
@@ -14,6 +42,32 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Per-rerun instrumentation. The debug panel exposes timings, cache counters
+# and profiles, so only the operator can turn it on: PASSWORD_METER_DEBUG=1
+# shows it to everyone, PASSWORD_METER_DEBUG=url only with ?debug=1 in the URL
+DEBUG_MODE = os.environ.get("PASSWORD_METER_DEBUG")
+DEBUG = DEBUG_MODE == "1" or (DEBUG_MODE == "url" and st.query_params.get("debug") == "1")
+METRICS_LOG = os.environ.get("PASSWORD_METER_METRICS_LOG")
+METRICS_PROM = os.environ.get("PASSWORD_METER_METRICS_PROM")
+script_ctx = get_script_run_ctx()
+metrics = instrument.begin_rerun(script_ctx.session_id if script_ctx else None, script_ctx,
+                                 profile=st.session_state.pop('profile_next_rerun', None))
+metrics.mark("setup")
+
+# Function to finish rerun metrics and hand them to the debug panel and sinks
+def finish_rerun(metrics):
+    metrics.finish()
+    st.session_state.last_rerun_metrics = metrics.as_dict()
+    if metrics.profile_text:
+        st.session_state.last_profile = metrics.profile_text
+    if METRICS_LOG:
+        instrument.write_jsonl(METRICS_LOG, metrics)
+    if METRICS_PROM:
+        instrument.write_prometheus(METRICS_PROM, metrics)
+
+# Scores come from the process-wide cache shared by all sessions
+score_password = instrument.timed("score_password", score_password)
+
 # CSS
 st.markdown("""
 <style>
@@ -44,6 +98,12 @@ st.markdown("""
         border-radius: 5px;
         margin-bottom: 5px;
     }
+    .stat-row {
+        display: flex;
+    }
+    .stat-row .stat-box {
+        flex: 1;
+    }
     .stat-box {
         padding: 20px;
         border-radius: 5px;
@@ -70,119 +130,206 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Entries per page in the Password History tab
+DEFAULT_PAGE_SIZE = int(os.environ.get("PASSWORD_METER_PAGE_SIZE", 10))
+HISTORY_PAGE_SIZES = sorted({DEFAULT_PAGE_SIZE, 10, 25, 50, 100})
+# Accounts listed under Account Trends
+TREND_ACCOUNTS = 10
+
+# Organization policy from PASSWORD_METER_POLICY, enforced when checking,
+# saving and generating passwords
+POLICY = get_default_policy()
+
+# Passphrase wordlist from PASSWORD_METER_WORDLIST, memory-mapped once per
+# process
+WORDLIST = get_default_wordlist()
+PASSPHRASE_SEPARATORS = {"-": "Hyphen (-)", " ": "Space", ".": "Period (.)", "_": "Underscore (_)", "": "None"}
+
+# Colors per strength code (weak, moderate, strong)
+HISTORY_BACKGROUNDS = ("#FFEBEE", "#FFF8E1", "#E8F5E9")  # Light red, yellow, green
+STRENGTH_COLORS = ("#C62828", "#F9A825", "#2E7D32")
+
 # Session state
 if 'history' not in st.session_state:
-    st.session_state.history = []
+    # In-memory by default; PASSWORD_METER_HISTORY=sqlite:///history.db persists it
+    st.session_state.history = open_history(os.environ.get("PASSWORD_METER_HISTORY"))
 if 'tab' not in st.session_state:
     st.session_state.tab = "check"
 
 # Header
 st.markdown("<h1 class='main-header'>🔐 Password Strength Meter & Generator</h1>", unsafe_allow_html=True)
 
-# Function to check password strength
-def check_strength(password):
-    score = 0
-    criteria = {
-        "length": len(password) >= 8,
-        "uppercase": any(c.isupper() for c in password),
-        "lowercase": any(c.islower() for c in password),
-        "digits": any(c.isdigit() for c in password),
-        "special": any(c in "!@#$%^&*()-_=+[]{}|;:,.<>?/" for c in password)
-    }
-    
-    # Calculate base score
-    score = sum(criteria.values())
-    
-    # Additional checks for better strength assessment
-    if len(password) >= 12:
-        score += 0.5
-    if len(password) >= 16:
-        score += 0.5
-        
-    # Check for common patterns
-    if password.lower() in ["password", "123456", "qwerty", "admin"]:
-        score = min(score, 1)
-    
-    return score, criteria
-
-# Function to get label
-def get_strength_label(score):
-    if score >= 5:
-        return "🟢 Strong", "password-strong"
-    elif score >= 3:
-        return "🟡 Moderate", "password-moderate"
-    else:
-        return "🔴 Weak", "password-weak"
-
 # Function to check if password is duplicate
 def is_duplicate(password):
     if 'history' not in st.session_state or not st.session_state.history:
         return False
-    return sum(1 for p in st.session_state.history if p['password'] == password) >= 2
+    return st.session_state.history.count(password) >= 2
+is_duplicate = instrument.timed("is_duplicate", is_duplicate)
 
-# Function to generate password
-def generate_password(length=12, include_upper=True, include_lower=True, include_digits=True, include_special=True):
-    chars = ""
-    required_chars = []
-    
-    if include_lower:
-        chars += string.ascii_lowercase
-        required_chars.append(random.choice(string.ascii_lowercase))
-    if include_upper:
-        chars += string.ascii_uppercase
-        required_chars.append(random.choice(string.ascii_uppercase))
-    if include_digits:
-        chars += string.digits
-        required_chars.append(random.choice(string.digits))
-    if include_special:
-        special_chars = "!@#$%^&*()-_=+[]{}|;:,.<>?/"
-        chars += special_chars
-        required_chars.append(random.choice(special_chars))
-    
-    if not chars:
-        chars = string.ascii_letters + string.digits + "!@#$%^&*"
-        required_chars = [
-            random.choice(string.ascii_lowercase),
-            random.choice(string.ascii_uppercase),
-            random.choice(string.digits),
-            random.choice("!@#$%^&*")
-        ]
-    
-    # Ensure we don't require more characters than the length
-    required_chars = required_chars[:min(len(required_chars), length)]
-    
-    # Fill the rest with random characters
-    password = required_chars.copy()
-    while len(password) < length:
-        password.append(random.choice(chars))
+# Function to find saved passwords that are near-duplicates of this one
+def find_similar(password):
+    if 'history' not in st.session_state or not st.session_state.history:
+        return []
+    return st.session_state.history.similar(password)
+find_similar = instrument.timed("find_similar", find_similar)
+
+# Function to list the policy rules a password breaks
+def policy_violations(password, account_name=None):
+    if POLICY is None:
+        return []
+    return POLICY.check(password, account_name)
+policy_violations = instrument.timed("policy_violations", policy_violations)
+
+# Function to delete a history entry by its id
+def delete_entry(entry_id):
+    if entry_id in st.session_state.history:
+        st.session_state.history.delete(entry_id)
+        st.session_state.pop('export', None)
+        st.toast("Entry deleted!")
+
+# Function to write the history export to a temporary file, chunk by chunk
+def prepare_export(history, fmt):
+    export_file = tempfile.TemporaryFile(buffering=0)
+    export_history(history, export_file, fmt)
+    export_file.seek(0)
+    return export_file
+prepare_export = instrument.timed("prepare_export", prepare_export)
+
+# Function to import an uploaded export into the history, one chunk at a time,
+# updating a progress bar after each chunk
+def import_upload(uploaded, fmt):
+    if fmt is None:
+        fmt = detect_format(uploaded.name, uploaded.read(4096))
+        uploaded.seek(0)
+    bar = st.progress(0.0, text=f"Importing {IMPORT_FORMATS[fmt]} export...")
     
-    # Shuffle the password
-    random.shuffle(password)
-    return ''.join(password[:length])
-
-# Function to hash password for more secure storage
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()[:10]  # Only store partial hash for demo
-
-# Function to create a downloadable link for password history
-def get_download_link(history):
-    if not history:
-        return None
+    def report(result):
+        bar.progress(min(result.bytes_read / max(uploaded.size, 1), 1.0),
+                     text=f"{result.imported:,} imported, {result.duplicates:,} duplicates skipped")
     
-    df = pd.DataFrame(history)
-    # Replace actual passwords with hashed versions for the export
-    df['password'] = df['password'].apply(hash_password)
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="password_history.csv">Download Password History</a>'
-    return href
+    result = import_entries(uploaded, st.session_state.history, fmt, progress=report)
+    bar.progress(1.0, text=f"{result.imported:,} imported, {result.duplicates:,} duplicates skipped")
+    return result
+import_upload = instrument.timed("import_upload", import_upload)
 
-# Create tabs
-tabs = ["Check Password", "Generate Password", "Password History", "Statistics"]
-selected_tab = st.radio("Select Option:", tabs, horizontal=True)
+# The Statistics markup below is built by cached functions, one markdown
+# element per block instead of one per box or bar, so a rerun with unchanged
+# statistics reuses the HTML strings and sends a handful of elements
 
-# Check Password Tab
-if selected_tab == "Check Password":
+# Function to build a row of stat boxes from (value, label, background) tuples
+@st.cache_data(max_entries=64)
+def stat_boxes_html(boxes):
+    return "<div class='stat-row'>" + "".join(f"""
+    <div class='stat-box' style='background-color: {background};'>
+        <div class='stat-number'>{value}</div>
+        <div class='stat-label'>{label}</div>
+    </div>""" for value, label, background in boxes) + "</div>"
+
+# Function to build the strength distribution bars from (category, count) pairs
+@st.cache_data(max_entries=64)
+def strength_bars_html(counts):
+    total = sum(count for _, count in counts)
+    bars = []
+    for category, count in counts:
+        percentage = (count / total) * 100
+        color = STRENGTH_COLORS[STRENGTH_CATEGORIES.index(category)]
+        bars.append(f"""
+        <div style='display: flex; align-items: center;'>
+            <div style='width: 80px;'>{category}</div>
+            <div class='bar' style='width: {percentage}%; background-color: {color};'>
+                <div class='bar-label'>{count} ({percentage:.1f}%)</div>
+            </div>
+        </div>""")
+    return "<div>" + "".join(bars) + "</div>"
+
+# Function to build the length distribution bars from sorted (length, count) pairs
+@st.cache_data(max_entries=64)
+def length_bars_html(counts):
+    max_count = max(count for _, count in counts)
+    return "".join(f"""
+    <div style='display: flex; align-items: center; margin-bottom: 5px;'>
+        <div style='width: 80px;'>{length} chars</div>
+        <div style='background-color: #1976D2; width: {(count / max_count) * 100}%; height: 20px; border-radius: 3px;'>
+            <div style='color: white; padding: 0 5px;'>{count}</div>
+        </div>
+    </div>""" for length, count in counts)
+
+# Function to build the account trend rows from TrendIndex.account_trends tuples
+@st.cache_data(max_entries=64)
+def account_trends_html(trends):
+    rows = []
+    for account, count, average, recent, change in trends:
+        if change is None or abs(change) < 0.05:
+            arrow, color = "→", "#757575"
+        elif change > 0:
+            arrow, color = "↑", "#2E7D32"
+        else:
+            arrow, color = "↓", "#C62828"
+        change_text = "" if change is None else f" ({change:+.2f})"
+        rows.append(f"""
+        <div style='display: flex; margin-bottom: 6px;'>
+            <div style='width: 200px; overflow: hidden; text-overflow: ellipsis;'>{account}</div>
+            <div style='width: 110px;'>{count} saved</div>
+            <div style='width: 130px;'>avg {average:.2f}/6</div>
+            <div style='color: {color}; font-weight: bold;'>{arrow} {recent:.2f}{change_text}</div>
+        </div>""")
+    return "".join(rows)
+
+# Function to build the recent entry rows from (account, created, code) tuples
+@st.cache_data(max_entries=64)
+def recent_entries_html(entries):
+    return "".join(f"""
+    <div style='display: flex; margin-bottom: 10px;'>
+        <div style='width: 200px; overflow: hidden; text-overflow: ellipsis;'>{account}</div>
+        <div style='width: 150px;'>{format_timestamp(created)}</div>
+        <div style='color: {STRENGTH_COLORS[code]}; font-weight: bold;'>{STRENGTH_LABELS[code]}</div>
+    </div>""" for account, created, code in entries)
+
+# Function to list the sidebar facts; the crack time is computed once per
+# process, not on every rerun
+@st.cache_data
+def password_facts():
+    return [
+        "The most common password is still '123456'",
+        f"It would take a computer about {display_time(brute_force_time(12, 94))} to crack a 12-character password with numbers, upper and lowercase letters, and symbols",
+        "The average person has 100 passwords",
+        "59% of people use the same password for multiple accounts",
+        "Password managers can help you create and store strong, unique passwords",
+        "Two-factor authentication adds an extra layer of security beyond just passwords",
+        "Passwords like 'qwerty' and 'password' can be cracked instantly",
+        "A 12-character password is 62 trillion times stronger than a 6-character password"
+    ]
+
+# Function to draw average strength per bucket and its rolling average,
+# from already downsampled points
+def trend_chart(averages, rolling, window, period):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(7, 3))
+    ax = fig.subplots()
+    ax.scatter([day for day, _ in averages], [score for _, score in averages], s=10, color="#90CAF9",
+               label=f"Average per {period}")
+    ax.plot([day for day, _ in rolling], [score for _, score in rolling], color="#1976D2",
+            label=f"{window}-{period} rolling average")
+    ax.set_ylim(0, 6)
+    ax.set_ylabel("Score")
+    ax.legend(loc="lower left", fontsize="small")
+    fig.autofmt_xdate()
+    return fig
+
+# Check Password tab. It is a fragment, so typing a password or pressing Save
+# reruns only this function: the CSS, header, tab selector and sidebar are
+# neither re-executed nor sent to the browser again
+@st.fragment
+def check_password_tab():
+    fragment_metrics, own = instrument.begin_fragment("check", metrics.session_id, get_script_run_ctx())
+    try:
+        check_password_readout()
+    finally:
+        if own:
+            finish_rerun(fragment_metrics)
+
+def check_password_readout():
     st.markdown("<h2 class='sub-header'>Check Password Strength</h2>", unsafe_allow_html=True)
     
     col1, col2 = st.columns([3, 1])
@@ -197,27 +344,29 @@ if selected_tab == "Check Password":
             if password:
                 if not account_name:
                     account_name = "Unnamed Account"
-                score, _ = check_strength(password)
-                strength_label, _ = get_strength_label(score)
-                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-                st.session_state.history.append({
-                    "account": account_name,
-                    "password": password,
-                    "strength": strength_label,
-                    "score": score,
-                    "timestamp": timestamp
-                })
-                st.success(f"✅ Password for '{account_name}' saved successfully!")
+                if policy_violations(password, account_name):
+                    st.error("❌ This password does not meet the password policy.")
+                else:
+                    st.session_state.history.append(new_entry(account_name, password))
+                    st.session_state.pop('export', None)
+                    st.success(f"✅ Password for '{account_name}' saved successfully!")
             else:
                 st.warning("⚠️ Please enter a password to save.")
     
     if password:
-        score, criteria = check_strength(password)
-        strength_label, css_class = get_strength_label(score)
+        score, criteria, estimate, code = score_password(password)
+        strength_label, css_class = STRENGTH_LABELS[code], STRENGTH_CLASSES[code]
         
         st.markdown(f"<h3>Strength: <span class='{css_class}'>{strength_label}</span></h3>", unsafe_allow_html=True)
         
+        if POLICY is not None:
+            violations = policy_violations(password, account_name)
+            if violations:
+                st.error(f"❌ Does not meet the '{POLICY.name}' policy:\n\n" +
+                         "\n".join(f"- {violation}" for violation in violations))
+            else:
+                st.success(f"✅ Meets the '{POLICY.name}' policy")
+        
         # Progress bar with color
         if score >= 5:
             bar_color = "green"
@@ -245,51 +394,129 @@ if selected_tab == "Check Password":
                 with col2:
                     st.write(f"{'✅' if met else '❌'} {key.capitalize()}")
         
+        # Pattern-aware crack time estimate
+        crack_time = display_time(estimate["crack_times"]["offline_fast_hash"])
+        st.markdown(f"**Estimated time to crack:** {crack_time} "
+                    f"<small>(offline attack, 10 billion guesses per second)</small>", unsafe_allow_html=True)
+        for description in describe_patterns(estimate, password):
+            st.warning(f"⚠️ {description}")
+        
         if is_duplicate(password):
             st.warning("⚠️ This password has been used multiple times before!")
+        similar = find_similar(password)
+        if similar:
+            accounts = ", ".join(sorted({entry.account for entry, _ in similar}))
+            st.warning(f"⚠️ This password is very similar to one already saved for: {accounts}")
             
         # Password suggestions if weak
         if score < 3:
             st.markdown("<h3>Suggestions to improve:</h3>", unsafe_allow_html=True)
-            suggestions = []
-            if not criteria["length"]:
-                suggestions.append("• Make your password at least 8 characters long")
-            if not criteria["uppercase"]:
-                suggestions.append("• Add uppercase letters (A-Z)")
-            if not criteria["lowercase"]:
-                suggestions.append("• Add lowercase letters (a-z)")
-            if not criteria["digits"]:
-                suggestions.append("• Add numbers (0-9)")
-            if not criteria["special"]:
-                suggestions.append("• Add special characters (!@#$%^&*)")
+            suggestions = get_suggestions(criteria)
                 
             for suggestion in suggestions:
-                st.markdown(suggestion)
+                st.markdown(f"• {suggestion}")
             
             st.markdown("Or use our password generator to create a strong password!")
 
+# Create tabs
+tabs = ["Check Password", "Generate Password", "Password History", "Statistics"]
+selected_tab = st.radio("Select Option:", tabs, horizontal=True)
+metrics.mark(f"tab: {selected_tab}")
+
+# Check Password Tab
+if selected_tab == "Check Password":
+    check_password_tab()
+
 # Generate Password Tab
 elif selected_tab == "Generate Password":
     st.markdown("<h2 class='sub-header'>🔑 Generate a Secure Password</h2>", unsafe_allow_html=True)
     
-    col1, col2 = st.columns([2, 1])
+    mode = st.radio("Generate a", ["Password", "Passphrase"], horizontal=True)
+    # The policy checks generated passwords against the account they are for
+    generate_account = st.text_input("Account name (optional)", key="generate_account")
     
-    with col1:
-        length = st.slider("Password Length", min_value=8, max_value=32, value=12)
-        
-        col_a, col_b = st.columns(2)
-        with col_a:
-            include_upper = st.checkbox("Include Uppercase Letters", value=True)
-            include_lower = st.checkbox("Include Lowercase Letters", value=True)
-        with col_b:
-            include_digits = st.checkbox("Include Digits", value=True)
-            include_special = st.checkbox("Include Special Characters", value=True)
+    if mode == "Password":
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            # The policy bounds the length and forces its required classes on
+            min_length, max_length, required = 8, 32, ()
+            if POLICY is not None:
+                min_length = max(POLICY.min_length, 1)
+                max_length = min(POLICY.max_length or max(max_length, min_length + 1), 128)
+                min_length = min(min_length, max_length)
+                required = POLICY.require
+            if min_length < max_length:
+                length = st.slider("Password Length", min_value=min_length, max_value=max_length,
+                                   value=min(max(12, min_length), max_length))
+            else:
+                # A slider needs two distinct bounds
+                length = min_length
+                st.caption(f"Password Length: {length}, fixed by the '{POLICY.name}' policy")
+            
+            col_a, col_b = st.columns(2)
+            with col_a:
+                include_upper = st.checkbox("Include Uppercase Letters", value=True, disabled="upper" in required)
+                include_lower = st.checkbox("Include Lowercase Letters", value=True, disabled="lower" in required)
+            with col_b:
+                include_digits = st.checkbox("Include Digits", value=True, disabled="digits" in required)
+                include_special = st.checkbox("Include Special Characters", value=True, disabled="special" in required)
+        
+        with col2:
+            st.markdown("<br>", unsafe_allow_html=True)
+            if st.button("⚡ Generate Password", use_container_width=True):
+                try:
+                    generated_password = generate_password(length, include_upper, include_lower, include_digits,
+                                                           include_special, policy=POLICY,
+                                                           account=generate_account or None)
+                except ValueError as exc:
+                    # The policy's banned terms and run limit can leave no character to draw
+                    st.error(f"❌ {exc}")
+                else:
+                    st.session_state.generated_password = generated_password
+                    st.session_state.pop('generated_entropy', None)
     
-    with col2:
-        st.markdown("<br>", unsafe_allow_html=True)
-        if st.button("⚡ Generate Password", use_container_width=True):
-            generated_password = generate_password(length, include_upper, include_lower, include_digits, include_special)
-            st.session_state.generated_password = generated_password
+    # Passphrases come from the memory-mapped PASSWORD_METER_WORDLIST; words are
+    # sampled directly from the file, so the list is never loaded per rerun
+    elif WORDLIST is None:
+        st.info("Passphrases need a wordlist. Build one with `python -m password_meter.wordlist build "
+                "words.idx wordlist.txt` and set PASSWORD_METER_WORDLIST to its path.")
+    elif POLICY is not None and "digits" in POLICY.require:
+        st.info(f"Passphrases are not available: the '{POLICY.name}' policy requires a digit, "
+                "and passphrases are made of words. Generate a password instead.")
+    else:
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            word_count = st.slider("Number of Words", min_value=3, max_value=12, value=6)
+            col_a, col_b = st.columns(2)
+            with col_a:
+                separator = st.selectbox("Separator", list(PASSPHRASE_SEPARATORS),
+                                         format_func=lambda sep: PASSPHRASE_SEPARATORS[sep])
+            with col_b:
+                capitalize = st.selectbox("Capitalization", CAPITALIZATIONS, format_func=str.capitalize)
+            entropy = passphrase_entropy(word_count, WORDLIST, capitalize)
+            st.caption(f"{word_count} words from a list of {len(WORDLIST):,}: {entropy:.1f} bits of entropy")
+            if not separator:
+                st.caption("Without a separator, different words can join into the same passphrase, "
+                           "so this is an upper bound.")
+            # Settings that can never meet the policy disable the button;
+            # otherwise passphrases are redrawn until one complies
+            conflicts = passphrase_conflicts(POLICY, separator, capitalize) if POLICY is not None else []
+            for conflict in conflicts:
+                st.warning(f"⚠️ {conflict}.")
+        
+        with col2:
+            st.markdown("<br>", unsafe_allow_html=True)
+            if st.button("⚡ Generate Passphrase", use_container_width=True, disabled=bool(conflicts)):
+                try:
+                    generated_password = generate_passphrase(word_count, separator, capitalize, WORDLIST,
+                                                             policy=POLICY, account=generate_account or None)
+                except ValueError as exc:
+                    st.error(f"❌ {exc}")
+                else:
+                    st.session_state.generated_password = generated_password
+                    st.session_state.generated_entropy = entropy
     
     if 'generated_password' in st.session_state:
         st.markdown("<h3>Generated Password:</h3>", unsafe_allow_html=True)
@@ -300,125 +527,131 @@ elif selected_tab == "Generate Password":
             st.code(st.session_state.generated_password, language=None)
             
             # Show strength of generated password
-            score, criteria = check_strength(st.session_state.generated_password)
-            strength_label, css_class = get_strength_label(score)
+            # Served from the process-wide cache on every redraw of the tab
+            score, criteria, estimate, code = score_password(st.session_state.generated_password)
+            strength_label, css_class = STRENGTH_LABELS[code], STRENGTH_CLASSES[code]
             st.markdown(f"Strength: <span class='{css_class}'>{strength_label}</span>", unsafe_allow_html=True)
+            if 'generated_entropy' in st.session_state:
+                st.caption(f"Entropy: {st.session_state.generated_entropy:.1f} bits")
         
         with col2:
             if st.button("Save This Password"):
-                account_name = st.text_input("Account name:", value="Generated Password")
+                account_name = st.text_input("Account name:", value=generate_account or "Generated Password")
                 if st.button("Confirm Save"):
-                    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    st.session_state.history.append({
-                        "account": account_name,
-                        "password": st.session_state.generated_password,
-                        "strength": strength_label,
-                        "score": score,
-                        "timestamp": timestamp
-                    })
-                    st.success("✅ Password saved successfully!")
+                    violations = policy_violations(st.session_state.generated_password, account_name)
+                    if violations:
+                        st.error("❌ " + " ".join(violations))
+                    else:
+                        st.session_state.history.append(new_entry(account_name, st.session_state.generated_password))
+                        st.session_state.pop('export', None)
+                        st.success("✅ Password saved successfully!")
 
 # Password History Tab
 elif selected_tab == "Password History":
     st.markdown("<h2 class='sub-header'>📜 Password History</h2>", unsafe_allow_html=True)
     
+    # Bulk import; entries are scored and appended in chunks, not per rerun
+    with st.expander("📥 Import from a password manager"):
+        uploaded = st.file_uploader("Export file (CSV or JSON)", type=["csv", "json"])
+        import_format = st.selectbox("Format", [None] + list(IMPORT_FORMATS),
+                                     format_func=lambda fmt: "Detect automatically" if fmt is None else IMPORT_FORMATS[fmt])
+        if uploaded is not None and st.button("Import"):
+            try:
+                result = import_upload(uploaded, import_format)
+            except ValueError as exc:
+                st.error(f"❌ Could not import {uploaded.name}: {exc}")
+            else:
+                st.session_state.pop('export', None)
+                st.success(f"✅ Imported {result.imported:,} passwords in {result.seconds:.1f}s "
+                           f"({result.duplicates:,} duplicates and {result.skipped:,} entries without a password skipped)")
+    
     if st.session_state.history:
         col1, col2 = st.columns([3, 1])
         
         with col2:
             if st.button("🗑️ Clear History"):
-                st.session_state.history = []
+                st.session_state.history.clear()
+                st.session_state.pop('export', None)
                 st.success("History cleared successfully!")
             
-            download_link = get_download_link(st.session_state.history)
-            if download_link:
-                st.markdown(download_link, unsafe_allow_html=True)
+            # Build the export only when asked for, not on every rerun. Exports
+            # carry the stored digests, so they wait until none are pending
+            # rather than blocking the rerun on the hasher.
+            export_format = st.selectbox("Export format", available_formats())
+            pending = st.session_state.history.pending_hashes
+            if pending:
+                st.caption(f"⏳ {pending:,} password digests are still being computed.")
+                st.button("🔄 Check again")
+            if st.button("📦 Prepare Export", disabled=bool(pending)):
+                st.session_state.export = (export_format, prepare_export(st.session_state.history, export_format))
+            
+            if 'export' in st.session_state:
+                fmt, export_file = st.session_state.export
+                extension, mime = EXPORT_FORMATS[fmt]
+                export_file.seek(0)
+                st.download_button("Download Password History", export_file,
+                                   file_name=f"password_history.{extension}", mime=mime)
+        
+        # Filters and paging, so only one page of entries is drawn per rerun
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            account_filter = st.selectbox("Account", ["All accounts"] + st.session_state.history.accounts())
+        with col2:
+            strength_filter = st.selectbox("Strength", ["All", "Strong", "Moderate", "Weak"])
+        with col3:
+            page_size = st.selectbox("Entries per page", HISTORY_PAGE_SIZES, index=HISTORY_PAGE_SIZES.index(DEFAULT_PAGE_SIZE))
+        
+        account = None if account_filter == "All accounts" else account_filter
+        strength = None if strength_filter == "All" else strength_filter
+        total = st.session_state.history.filtered_count(account, strength)
+        page_count = max(1, -(-total // page_size))
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+        
+        if not total:
+            st.info("No entries match the selected filters.")
         
         # Display history in a more organized way
-        for i, entry in enumerate(st.session_state.history[::-1]):
-            if entry['strength'].startswith("🟢"):
-                bg_color = "#E8F5E9"  # Light green
-            elif entry['strength'].startswith("🟡"):
-                bg_color = "#FFF8E1"  # Light yellow
-            else:
-                bg_color = "#FFEBEE"  # Light red
+        for entry in st.session_state.history.page(page - 1, page_size, account, strength):
+            bg_color = HISTORY_BACKGROUNDS[entry.code]
                 
             st.markdown(f"""
             <div class='history-item' style='background-color: {bg_color};'>
-                <strong>{entry['account']}</strong> - {entry['strength']}<br>
-                <small>{entry['timestamp']}</small>
+                <strong>{entry.account}</strong> - {STRENGTH_LABELS[entry.code]}<br>
+                <small>{format_timestamp(entry.created)}</small>
             </div>
             """, unsafe_allow_html=True)
             
             col1, col2 = st.columns([3, 1])
             with col1:
                 # Show password on demand
-                if st.button(f"Show Password #{i+1}"):
-                    st.code(entry['password'], language=None)
+                if st.button(f"Show Password #{entry.id}"):
+                    st.code(entry.password, language=None)
             with col2:
-                # Delete individual entry
-                if st.button(f"Delete #{i+1}"):
-                    st.session_state.history.remove(entry)
-                    st.success("Entry deleted!")
-                    st.experimental_rerun()
+                # Delete individual entry; the callback runs before the next
+                # rerun, so the page is simply redrawn without the entry
+                st.button(f"Delete #{entry.id}", on_click=delete_entry, args=(entry.id,))
     else:
         st.info("No passwords saved yet.")
 
-# Statistics Tab - Simplified without charts
+# Statistics Tab
 elif selected_tab == "Statistics":
     st.markdown("<h2 class='sub-header'>📊 Password Statistics</h2>", unsafe_allow_html=True)
     
     if st.session_state.history:
-        # Extract data for analysis
-        scores = [entry.get('score', 0) for entry in st.session_state.history]
-        strengths = [entry['strength'] for entry in st.session_state.history]
-        
-        # Calculate average score
-        avg_score = sum(scores) / len(scores)
-        
-        # Count by strength category
-        strength_counts = {
-            "Strong": sum(1 for s in strengths if s.startswith("🟢")),
-            "Moderate": sum(1 for s in strengths if s.startswith("🟡")),
-            "Weak": sum(1 for s in strengths if s.startswith("🔴"))
-        }
+        # Aggregates are kept up to date by the history on every change
+        with metrics.timer("statistics_aggregation"):
+            stats = st.session_state.history.stats
+            avg_score = stats.average_score
+            strength_counts = stats.strength_counts
         
         # Display stats in boxes
         st.markdown("<h3>Password Strength Overview</h3>", unsafe_allow_html=True)
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.markdown(f"""
-            <div class='stat-box' style='background-color: #E3F2FD;'>
-                <div class='stat-number'>{len(st.session_state.history)}</div>
-                <div class='stat-label'>Total Passwords</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        with col2:
-            st.markdown(f"""
-            <div class='stat-box' style='background-color: #E8F5E9;'>
-                <div class='stat-number'>{strength_counts["Strong"]}</div>
-                <div class='stat-label'>Strong Passwords</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        with col3:
-            st.markdown(f"""
-            <div class='stat-box' style='background-color: #FFF8E1;'>
-                <div class='stat-number'>{strength_counts["Moderate"]}</div>
-                <div class='stat-label'>Moderate Passwords</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        with col4:
-            st.markdown(f"""
-            <div class='stat-box' style='background-color: #FFEBEE;'>
-                <div class='stat-number'>{strength_counts["Weak"]}</div>
-                <div class='stat-label'>Weak Passwords</div>
-            </div>
-            """, unsafe_allow_html=True)
+        st.markdown(stat_boxes_html((
+            (stats.count, "Total Passwords", "#E3F2FD"),
+            (strength_counts["Strong"], "Strong Passwords", "#E8F5E9"),
+            (strength_counts["Moderate"], "Moderate Passwords", "#FFF8E1"),
+            (strength_counts["Weak"], "Weak Passwords", "#FFEBEE"),
+        )), unsafe_allow_html=True)
         
         # Average score
         st.markdown("<h3>Average Password Strength</h3>", unsafe_allow_html=True)
@@ -431,115 +664,75 @@ elif selected_tab == "Statistics":
         
         # Strength distribution as bars instead of pie chart
         st.markdown("<h3>Password Strength Distribution</h3>", unsafe_allow_html=True)
-        
-        total = sum(strength_counts.values())
-        if total > 0:
-            for category, count in strength_counts.items():
-                percentage = (count / total) * 100
-                if category == "Strong":
-                    color = "#2E7D32"
-                elif category == "Moderate":
-                    color = "#F9A825"
-                else:
-                    color = "#C62828"
-                
-                st.markdown(f"""
-                <div>
-                    <div style='display: flex; align-items: center;'>
-                        <div style='width: 80px;'>{category}</div>
-                        <div class='bar' style='width: {percentage}%; background-color: {color};'>
-                            <div class='bar-label'>{count} ({percentage:.1f}%)</div>
-                        </div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+        if stats.count:
+            st.markdown(strength_bars_html(tuple(strength_counts.items())), unsafe_allow_html=True)
         
         # Password length distribution as text
         st.markdown("<h3>Password Length Information</h3>", unsafe_allow_html=True)
+        st.markdown(stat_boxes_html((
+            (f"{stats.average_length:.1f}", "Average Length", "#E3F2FD"),
+            (stats.min_length, "Shortest Password", "#E3F2FD"),
+            (stats.max_length, "Longest Password", "#E3F2FD"),
+        )), unsafe_allow_html=True)
+        
+        # Length distribution as simple bars
+        length_counts = stats.length_counts
         
-        password_lengths = [len(entry['password']) for entry in st.session_state.history]
-        avg_length = sum(password_lengths) / len(password_lengths)
-        min_length = min(password_lengths)
-        max_length = max(password_lengths)
+        if length_counts:
+            st.markdown("<h3>Password Length Distribution</h3>", unsafe_allow_html=True)
+            st.markdown(length_bars_html(tuple(sorted(length_counts.items()))), unsafe_allow_html=True)
         
-        col1, col2, col3 = st.columns(3)
+        # Strength over time, from the day/week buckets the history keeps up to
+        # date; charts get at most MAX_POINTS points however long the history
+        st.markdown("<h3>Strength Over Time</h3>", unsafe_allow_html=True)
+        trends = st.session_state.history.trends
         
+        col1, col2, col3 = st.columns(3)
         with col1:
-            st.markdown(f"""
-            <div class='stat-box' style='background-color: #E3F2FD;'>
-                <div class='stat-number'>{avg_length:.1f}</div>
-                <div class='stat-label'>Average Length</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
+            period = st.selectbox("Bucket", ["day", "week"], format_func=str.capitalize)
         with col2:
-            st.markdown(f"""
-            <div class='stat-box' style='background-color: #E3F2FD;'>
-                <div class='stat-number'>{min_length}</div>
-                <div class='stat-label'>Shortest Password</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
+            window = st.number_input(f"Rolling window ({period}s)", min_value=1, max_value=90,
+                                     value=7 if period == "day" else 4)
         with col3:
-            st.markdown(f"""
-            <div class='stat-box' style='background-color: #E3F2FD;'>
-                <div class='stat-number'>{max_length}</div>
-                <div class='stat-label'>Longest Password</div>
-            </div>
-            """, unsafe_allow_html=True)
+            # A text filter rather than a selectbox, which would send every
+            # account name to the browser on each rerun
+            trend_filter = st.text_input("Trend for account", placeholder="All accounts").strip()
         
-        # Length distribution as simple bars
-        length_counts = {}
-        for length in password_lengths:
-            if length in length_counts:
-                length_counts[length] += 1
+        trend_account = None
+        if trend_filter:
+            if trends.has_account(trend_filter):
+                trend_account = trend_filter
             else:
-                length_counts[length] = 1
+                st.caption(f"No passwords saved for {trend_filter!r}; showing all accounts.")
         
-        if length_counts:
-            st.markdown("<h3>Password Length Distribution</h3>", unsafe_allow_html=True)
-            
-            # Sort by length
-            sorted_lengths = sorted(length_counts.items())
-            max_count = max(length_counts.values())
-            
-            for length, count in sorted_lengths:
-                percentage = (count / max_count) * 100
-                st.markdown(f"""
-                <div style='display: flex; align-items: center; margin-bottom: 5px;'>
-                    <div style='width: 80px;'>{length} chars</div>
-                    <div style='background-color: #1976D2; width: {percentage}%; height: 20px; border-radius: 3px;'>
-                        <div style='color: white; padding: 0 5px;'>{count}</div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-        
-        # Recent password strengths (instead of timeline)
+        with metrics.timer("trend_analytics"):
+            series = trends.series(period, trend_account)
+            averages = downsample([(day, average) for day, _, average, *_ in series])
+            rolling = downsample(trends.rolling(period, window, trend_account))
+            account_trends = trends.account_trends(period, window, TREND_ACCOUNTS)
+        
+        if len(series) > 1:
+            st.pyplot(trend_chart(averages, rolling, window, period))
+        else:
+            st.info(f"Trends appear once passwords have been saved in more than one {period}.")
+        
+        # Per-account trend: latest window against the one before it
+        st.markdown("<h3>Account Trends</h3>", unsafe_allow_html=True)
+        st.markdown(account_trends_html(tuple(account_trends)), unsafe_allow_html=True)
+        
+        # Recent password strengths
         if len(st.session_state.history) > 1:
             st.markdown("<h3>Recent Password Strengths</h3>", unsafe_allow_html=True)
             
-            # Get the 5 most recent passwords
-            recent_entries = st.session_state.history[-5:][::-1]
-            
-            for entry in recent_entries:
-                if entry['strength'].startswith("🟢"):
-                    color = "#2E7D32"
-                elif entry['strength'].startswith("🟡"):
-                    color = "#F9A825"
-                else:
-                    color = "#C62828"
-                
-                st.markdown(f"""
-                <div style='display: flex; margin-bottom: 10px;'>
-                    <div style='width: 200px; overflow: hidden; text-overflow: ellipsis;'>{entry['account']}</div>
-                    <div style='width: 150px;'>{entry['timestamp']}</div>
-                    <div style='color: {color}; font-weight: bold;'>{entry['strength']}</div>
-                </div>
-                """, unsafe_allow_html=True)
+            # The 5 most recent passwords
+            recent_entries = tuple((entry.account, entry.created, entry.code)
+                                   for entry in st.session_state.history.recent(5))
+            st.markdown(recent_entries_html(recent_entries), unsafe_allow_html=True)
     else:
         st.info("No password data available for statistics. Save some passwords first!")
 
 # Add a sidebar with tips
+metrics.mark("sidebar")
 with st.sidebar:
     st.markdown("## 📝 Password Tips")
     st.markdown("""
@@ -564,17 +757,34 @@ with st.sidebar:
     - Sync across devices
     """)
     
-    # Add a fun fact about passwords
-    password_facts = [
-        "The most common password is still '123456'",
-        "It would take a computer about 7 quintillion years to crack a 12-character password with numbers, upper and lowercase letters, and symbols",
-        "The average person has 100 passwords",
-        "59% of people use the same password for multiple accounts",
-        "Password managers can help you create and store strong, unique passwords",
-        "Two-factor authentication adds an extra layer of security beyond just passwords",
-        "Passwords like 'qwerty' and 'password' can be cracked instantly",
-        "A 12-character password is 62 trillion times stronger than a 6-character password"
-    ]
+    if POLICY is not None:
+        st.markdown(f"### Password Policy ({POLICY.name}):")
+        st.markdown("\n".join(f"- {rule}" for rule in POLICY.describe()))
     
+    # Add a fun fact about passwords, picked once per session so reruns send
+    # the same element
+    if 'password_fact' not in st.session_state:
+        st.session_state.password_fact = random.choice(password_facts())
     st.markdown("### 💡 Did You Know?")
-    st.info(random.choice(password_facts))
\ No newline at end of file
+    st.info(st.session_state.password_fact)
+
+    # Debug panel with the metrics of the last finished rerun
+    if DEBUG:
+        st.markdown("### 🛠️ Rerun Metrics")
+        last = st.session_state.get('last_rerun_metrics')
+        if last:
+            st.markdown(f"**Last rerun:** {last['wall_ms']:.1f} ms, {last['markdown_calls']} markdown calls, "
+                        f"{last['messages']} messages, {last['payload_bytes'] or 0:,} bytes")
+            st.json(last, expanded=False)
+        cache = get_score_cache().stats()
+        hit_rate = "n/a" if cache["hit_rate"] is None else f"{cache['hit_rate']:.0%}"
+        st.markdown(f"**Score cache:** {cache['size']:,}/{cache['maxsize']:,} entries, {hit_rate} hits "
+                    f"({cache['hits']:,} hits, {cache['misses']:,} misses, {cache['evictions']:,} evictions)")
+        profiler = st.selectbox("Profiler", ["cprofile", "pyinstrument"])
+        if st.button("Profile next rerun"):
+            st.session_state.profile_next_rerun = profiler
+        if st.session_state.get('last_profile'):
+            st.code(st.session_state.last_profile, language=None)
+
+# Finish the rerun metrics
+finish_rerun(metrics)
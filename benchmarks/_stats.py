@@ -0,0 +1,8 @@
+# Helpers shared by the benchmark scripts, which import it from their own
+# directory (it is on sys.path when a script is run directly).
+
+
+# Function to pick the value at a fraction (0.99 for p99) of sorted values,
+# nearest rank without interpolation
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
@@ -0,0 +1,51 @@
+# Per-keystroke latency of estimate_strength against its budget.
+#
+# Every prefix of each sample password is estimated, as happens while typing
+# into the Check Password tab, and p50/p99/max latency are compared with
+# LATENCY_BUDGET_MS. Exits non-zero if p99 is over budget.
+#
+#     python benchmarks/bench_estimator.py --samples 500
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_meter import generate_passwords  # noqa: E402
+from password_meter.estimator import LATENCY_BUDGET_MS, _matchers, estimate_strength  # noqa: E402
+
+SAMPLES = [
+    "password", "Password123!", "correcthorsebatterystaple", "Tr0ub4dor&3", "qwertyuiop[]",
+    "Summer2024!", "12/05/1990", "abcabcabcabc", "p@ssw0rd!2023", "zxcvbnm,./asdfgh",
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure per-keystroke estimate_strength latency against its budget.")
+    parser.add_argument("--samples", type=int, default=200, help="random passwords added to the fixed samples")
+    parser.add_argument("--length", type=int, default=24)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    _matchers()
+    print(f"matcher build (once per process): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    timings = []
+    for password in SAMPLES + generate_passwords(args.samples, args.length):
+        for end in range(1, len(password) + 1):
+            start = time.perf_counter()
+            estimate_strength(password[:end])
+            timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    print(f"{len(timings)} estimates: p50 {p50:.3f} ms, p99 {p99:.3f} ms, max {timings[-1]:.3f} ms "
+          f"(budget {LATENCY_BUDGET_MS} ms)")
+    return 0 if p99 <= LATENCY_BUDGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
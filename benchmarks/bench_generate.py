@@ -0,0 +1,34 @@
+# Throughput of the batch password generator against generate_password.
+#
+#     python benchmarks/bench_generate.py --count 10000 --length 16
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_meter import generate_password, generate_passwords  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare batch password generation throughput with generate_password.")
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--length", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    for _ in range(args.count):
+        generate_password(args.length)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    generate_passwords(args.count, args.length)
+    batch = time.perf_counter() - start
+
+    print(f"generate_password:  {args.count / single:12,.0f} passwords/s")
+    print(f"generate_passwords: {args.count / batch:12,.0f} passwords/s ({single / batch:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
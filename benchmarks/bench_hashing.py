@@ -0,0 +1,65 @@
+# Save and import throughput with KDF hashing inline against the hasher pool.
+#
+# "save" appends entries one at a time, as the Save buttons do, and reports
+# how long each append blocks the caller and how long until every digest is
+# stored. "import" runs import_entries on a generated CSV export. Each runs
+# once with an inline hasher (workers=0) and once with the pool.
+#
+#     python benchmarks/bench_hashing.py --saves 100 --imports 500 --workers 4
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_meter import Hasher, PasswordHistory, generate_passwords, import_entries, new_entry  # noqa: E402
+
+
+def bench_saves(hasher, passwords):
+    history = PasswordHistory(hasher=hasher)
+    entries = [new_entry("account", password) for password in passwords]
+    blocked = []
+    start = time.perf_counter()
+    for entry in entries:
+        call = time.perf_counter()
+        history.append(entry)
+        blocked.append(time.perf_counter() - call)
+    history.wait_hashes()
+    return time.perf_counter() - start, blocked
+
+
+def bench_import(hasher, passwords):
+    data = "account,password\n" + "".join(f"site{i},{password}\n" for i, password in enumerate(passwords))
+    history = PasswordHistory(hasher=hasher)
+    start = time.perf_counter()
+    import_entries(io.BytesIO(data.encode()), history, "csv")
+    returned = time.perf_counter() - start
+    history.wait_hashes()
+    return time.perf_counter() - start, returned
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare save and import throughput with inline and pooled KDF hashing.")
+    parser.add_argument("--saves", type=int, default=100)
+    parser.add_argument("--imports", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--processes", action="store_true", help="use a process pool instead of threads")
+    args = parser.parse_args(argv)
+
+    passwords = generate_passwords(max(args.saves, args.imports), 14)
+    for name, hasher in (("inline", Hasher(0)), (f"pool x{args.workers}", Hasher(args.workers, args.processes))):
+        total, blocked = bench_saves(hasher, passwords[:args.saves])
+        print(f"{name:9} save:   {args.saves / total:8.1f} saves/s, append blocks p50 "
+              f"{statistics.median(blocked) * 1000:8.3f} ms, max {max(blocked) * 1000:8.3f} ms")
+        total, returned = bench_import(hasher, passwords[:args.imports])
+        print(f"{name:9} import: {args.imports / total:8.1f} rows/s hashed, import_entries returned after "
+              f"{returned:.2f}s of {total:.2f}s")
+        hasher.shutdown()
+    print(f"{os.cpu_count()} CPUs", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
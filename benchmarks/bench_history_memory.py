@@ -0,0 +1,66 @@
+# Memory per history entry: the old dict entries against HistoryEntry records.
+#
+#     python benchmarks/bench_history_memory.py --count 100000
+import argparse
+import datetime
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_meter import (  # noqa: E402
+    STRENGTH_LABELS,
+    HistoryEntry,
+    check_strength,
+    generate_passwords,
+    get_strength_code,
+    password_fingerprint,
+)
+
+ACCOUNTS = ["email", "bank", "github", "work", "shopping", "social", "cloud", "vpn"]
+
+
+# Bytes allocated by build(), which must return what it built
+def _allocated(build):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        return tracemalloc.get_traced_memory()[0] - before, kept
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure memory per entry, dicts against HistoryEntry records.")
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    start = int(datetime.datetime(2024, 1, 1).timestamp())
+    rows = []
+    for i, password in enumerate(generate_passwords(args.count, 12)):
+        score, _ = check_strength(password)
+        rows.append((i + 1, ACCOUNTS[i % len(ACCOUNTS)], password, get_strength_code(score), score, start + 60 * i))
+
+    # Both layouts share the password strings and scores; only what each
+    # entry adds on top is counted
+    def dicts():
+        return [{"account": "".join(account), "password": password, "strength": STRENGTH_LABELS[code],
+                 "score": score, "timestamp": datetime.datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S"),
+                 "id": entry_id, "hash": password_fingerprint(password)}
+                for entry_id, account, password, code, score, created in rows]
+
+    def records():
+        return [HistoryEntry("".join(account), password, code, score, created, password_fingerprint(password),
+                             entry_id)
+                for entry_id, account, password, code, score, created in rows]
+
+    dict_bytes, _ = _allocated(dicts)
+    record_bytes, _ = _allocated(records)
+    print(f"dict entries:   {dict_bytes / args.count:7.1f} bytes/entry")
+    print(f"HistoryEntry:   {record_bytes / args.count:7.1f} bytes/entry ({1 - record_bytes / dict_bytes:.0%} less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# Cold-start import cost of the core package.
+#
+# Each scenario runs in a fresh interpreter under -X importtime, so nothing is
+# cached between runs; the median of the cumulative import time is reported,
+# along with any heavy dependency the scenario ended up loading. Point --tree
+# at another checkout to compare before/after.
+#
+#     python benchmarks/bench_import.py
+#     python benchmarks/bench_import.py --tree /path/to/older/checkout
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "streamlit", "sqlite3", "matplotlib")
+
+SCENARIOS = {
+    "import package": "import password_meter",
+    "score one password": "from password_meter import check_strength; check_strength('Tr0ub4dor&3')",
+    "estimate one password": "from password_meter import estimate_strength; estimate_strength('Tr0ub4dor&3')",
+    "generate one password": "from password_meter import generate_password; generate_password()",
+}
+
+_REPORT = ("import sys; print('LOADED', ','.join(m for m in {heavy!r} if m in sys.modules))")
+_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (\S+)")
+
+
+def _run(tree, code):
+    script = f"{code}; " + _REPORT.format(heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", script], cwd=tree,
+                          capture_output=True, text=True, check=True)
+    total = 0
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        # Only count top-level imports; nested ones are part of their parent
+        if match and not line.split("|")[-1].startswith("  "):
+            total += int(match.group(1))
+    loaded = proc.stdout.rsplit("LOADED", 1)[-1].strip()
+    return total / 1000, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold import time of password_meter.")
+    parser.add_argument("--tree", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    for name, code in SCENARIOS.items():
+        results = [_run(args.tree, code) for _ in range(args.runs)]
+        median = statistics.median(ms for ms, _ in results)
+        loaded = results[-1][1] or "none"
+        print(f"{name:>22}: {median:7.2f} ms   heavy modules loaded: {loaded}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# Passphrase generation from a memory-mapped wordlist against reading and
+# splitting the plain wordlist for every passphrase.
+#
+#     python benchmarks/bench_passphrase.py --words 100000 --count 10000
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_meter import Wordlist, build_wordlist, generate_passphrase  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare mmap wordlist passphrases with reading the list each time.")
+    parser.add_argument("--words", type=int, default=100_000, help="size of the synthetic wordlist")
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--length", type=int, default=6, help="words per passphrase")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    system = random.SystemRandom()
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = os.path.join(tmp, "words.txt")
+        index_path = os.path.join(tmp, "words.idx")
+        with open(text_path, "w") as f:
+            for _ in range(args.words):
+                f.write("".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))) + "\n")
+
+        start = time.perf_counter()
+        count = build_wordlist([text_path], index_path)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        wordlist = Wordlist(index_path)
+        for _ in range(args.count):
+            generate_passphrase(args.length, wordlist=wordlist)
+        mapped = time.perf_counter() - start
+
+        naive_count = max(1, args.count // 100)
+        start = time.perf_counter()
+        for _ in range(naive_count):
+            with open(text_path) as f:
+                words = f.read().split()
+            "-".join(system.choice(words) for _ in range(args.length))
+        naive = (time.perf_counter() - start) / naive_count
+
+    print(f"build:             {build * 1000:10.1f} ms for {count:,} words")
+    print(f"memory-mapped:     {mapped / args.count * 1e6:10.1f} µs/passphrase")
+    print(f"load and split:    {naive * 1e6:10.1f} µs/passphrase ({naive * args.count / mapped:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
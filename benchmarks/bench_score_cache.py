@@ -0,0 +1,91 @@
+# Hit rate and scoring latency of the process-wide score cache under a
+# simulated multi-session load.
+#
+# Each session is a thread, like a Streamlit session, and runs --reruns
+# reruns. A rerun either types the next character of a password into the
+# Check tab (scoring the prefix typed so far) or redraws the Generate tab
+# (scoring the session's generated password again). Passwords come from a
+# small pool shared by all sessions plus passwords of the session's own. The
+# same workload runs with the cache disabled and enabled.
+#
+#     python benchmarks/bench_score_cache.py --sessions 50 --reruns 200
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_meter import ScoreCache, generate_passwords  # noqa: E402
+
+SHARED = ["Summer2024!", "P@ssw0rd123", "correct horse battery staple", "Welcome1!", "qwerty12345",
+          "Tr0ub4dor&3", "iloveyou2023", "Spring#2025", "Dragon!2024", "letmein!!"]
+
+
+# Function to build the score calls of one session, one list per rerun
+def session_workload(seed, reruns):
+    rng = random.Random(seed)
+    generated = generate_passwords(1, 16)[0]
+    typing = ""
+    target = rng.choice(SHARED)
+    workload = []
+    for _ in range(reruns):
+        if rng.random() < 0.7:
+            if typing == target:
+                typing, target = "", rng.choice(SHARED + generate_passwords(1, 12))
+            typing = target[:len(typing) + 1]
+            workload.append(typing)
+        else:
+            workload.append(generated)
+    return workload
+
+
+def run(cache, workloads):
+    latencies = []
+    lock = threading.Lock()
+
+    def session(workload):
+        times = []
+        for password in workload:
+            # CPU time of this thread, so time spent waiting for the GIL
+            # while other sessions run is not counted as scoring latency
+            start = time.thread_time()
+            cache.get(password)
+            times.append(time.thread_time() - start)
+        with lock:
+            latencies.extend(times)
+
+    threads = [threading.Thread(target=session, args=(workload,)) for workload in workloads]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure score cache hit rate and latency over simulated sessions.")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--reruns", type=int, default=200)
+    parser.add_argument("--size", type=int, default=4096, help="cache size in entries")
+    args = parser.parse_args(argv)
+
+    workloads = [session_workload(seed, args.reruns) for seed in range(args.sessions)]
+    for name, cache in (("uncached", ScoreCache(0)), ("cached", ScoreCache(args.size))):
+        wall, latencies = run(cache, workloads)
+        p50 = statistics.median(latencies) * 1e6
+        p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+        print(f"{name:9} {len(latencies) / wall:10,.0f} scores/s  p50 {p50:8.1f} µs  p99 {p99:8.1f} µs  "
+              f"mean {statistics.fmean(latencies) * 1e6:8.1f} µs")
+        if cache.maxsize:
+            stats = cache.stats()
+            print(f"          hit rate {stats['hit_rate']:.1%}, {stats['hits']:,} hits, {stats['misses']:,} misses, "
+                  f"{stats['evictions']:,} evictions, {stats['size']:,} entries")
+
+
+if __name__ == "__main__":
+    main()
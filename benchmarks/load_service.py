@@ -0,0 +1,94 @@
+# Local load test for the HTTP scoring service.
+#
+# Starts the service in-process (or targets --host/--port with --external),
+# opens --concurrency keep-alive connections that each send POST /score
+# requests back to back, and reports throughput, p50/p99/max latency, how many
+# requests were rejected with 503 and the average micro-batch size.
+#
+#     python benchmarks/load_service.py --requests 20000 --concurrency 200
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_meter import generate_passwords  # noqa: E402
+from password_meter.service import start_service  # noqa: E402
+
+
+async def _request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def _client(host, port, passwords, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for password in passwords:
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, "POST", "/score", {"password": password})
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(args):
+    service = server = None
+    if not args.external:
+        service, server = await start_service(args.host, args.port, max_batch=args.max_batch,
+                                              max_wait=args.max_wait_ms / 1000, max_queue=args.max_queue)
+    passwords = generate_passwords(args.requests, 12)
+    per_client = [passwords[i::args.concurrency] for i in range(args.concurrency)]
+    latencies, statuses = [], {}
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(args.host, args.port, chunk, latencies, statuses) for chunk in per_client))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    _, health = await _request(reader, writer, "GET", "/health")
+    writer.close()
+    if server is not None:
+        server.close()
+        await service.batcher.stop()
+
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    print(f"{len(latencies):,} requests over {args.concurrency} connections in {elapsed:.2f} s "
+          f"-> {len(latencies) / elapsed:,.0f} requests/s")
+    print(f"latency p50 {ms[len(ms) // 2]:.2f} ms, p99 {ms[int(len(ms) * 0.99) - 1]:.2f} ms, max {ms[-1]:.2f} ms")
+    print(f"status codes {statuses}; server scored {health['scored']:,} in {health['batches']:,} batches "
+          f"(avg {health['scored'] / max(health['batches'], 1):.1f} per batch), rejected {health['rejected']:,}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the password scoring service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--external", action="store_true", help="target an already running service")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--max-batch", type=int, default=512)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--max-queue", type=int, default=1024)
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
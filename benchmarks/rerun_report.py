@@ -0,0 +1,54 @@
+# Summary of a rerun metrics log (PASSWORD_METER_METRICS_LOG), per kind of
+# rerun: full script runs and each fragment. Pass the log of an older build
+# with --before to print both side by side.
+#
+#     PASSWORD_METER_METRICS_LOG=after.jsonl streamlit run app.py
+#     python benchmarks/rerun_report.py after.jsonl --before before.jsonl
+import argparse
+import json
+import statistics
+
+from _stats import percentile
+
+
+def summarize(path):
+    groups = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                groups.setdefault(record.get("fragment") or "full", []).append(record)
+    summary = {}
+    for kind, records in groups.items():
+        wall = [record["wall_ms"] for record in records]
+        payload = [record["payload_bytes"] for record in records if record.get("payload_bytes") is not None]
+        summary[kind] = {
+            "reruns": len(records),
+            "wall_p50_ms": statistics.median(wall),
+            "wall_p99_ms": percentile(sorted(wall), 0.99),
+            "payload_p50_bytes": statistics.median(payload) if payload else None,
+            "elements_p50": statistics.median(sum(record["elements"].values()) for record in records),
+        }
+    return summary
+
+
+def _print(label, summary):
+    for kind, row in sorted(summary.items()):
+        payload = "n/a" if row["payload_p50_bytes"] is None else f"{row['payload_p50_bytes']:,.0f} B"
+        print(f"{label:>6} {kind:>8}: {row['reruns']:6,} reruns  wall p50 {row['wall_p50_ms']:8.2f} ms  "
+              f"p99 {row['wall_p99_ms']:8.2f} ms  payload p50 {payload:>10}  elements p50 {row['elements_p50']:g}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize rerun wall time and payload from a metrics log.")
+    parser.add_argument("log")
+    parser.add_argument("--before", help="metrics log of the build to compare against")
+    args = parser.parse_args(argv)
+
+    if args.before:
+        _print("before", summarize(args.before))
+    _print("after" if args.before else "", summarize(args.log))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# Benchmark suite for the hot paths of the app.
+#
+# Times check_strength, generate_password, hash_password, the history export
+# and the Statistics-tab aggregation on synthetic histories, and writes
+# throughput, p50/p99 latency and peak memory for every case to a JSON file.
+# Pass an earlier results file with --compare to flag regressions.
+#
+#     python benchmarks/run.py --sizes 1e3,1e4,1e5,1e6 --output results.json
+#     python benchmarks/run.py --compare results.json
+import argparse
+import copy
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_meter import (  # noqa: E402
+    HistoryEntry,
+    PasswordHistory,
+    check_strength,
+    export_history,
+    generate_password,
+    generate_passwords,
+    get_strength_code,
+    hash_password,
+)
+from _stats import percentile  # noqa: E402
+
+ACCOUNTS = ["email", "bank", "github", "work", "shopping", "social", "cloud", "vpn"]
+# Per-call cases run this many calls per history size, capped by the size
+MAX_CALLS = 100_000
+# hash_password is a slow KDF by design, so it gets far fewer calls
+KDF_CALLS = 20
+# History-wide cases are repeated this many times for the latency percentiles
+REPEATS = 5
+
+
+def synthetic_entries(n, seed=0):
+    rng = random.Random(seed)
+    start = int(datetime.datetime(2024, 1, 1).timestamp())
+    passwords = []
+    for length in (6, 8, 10, 12, 16, 20):
+        passwords += generate_passwords(n // 6 + 1, length, include_special=length > 8)
+    rng.shuffle(passwords)
+    # Entries share one precomputed digest, so building a history does not
+    # queue a KDF run per entry
+    digest = hash_password("synthetic")
+    entries = []
+    for i, password in enumerate(passwords[:n]):
+        score, _ = check_strength(password)
+        entries.append(HistoryEntry(rng.choice(ACCOUNTS), password, get_strength_code(score), score, start + 60 * i,
+                                    digest))
+    return entries
+
+
+def _measure(run, calls):
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings
+
+
+def _peak_memory(run):
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _result(name, size, timings, items_per_call, peak):
+    total = sum(timings)
+    return {
+        "name": name,
+        "size": size,
+        "calls": len(timings),
+        "seconds": total,
+        "throughput_per_s": len(timings) * items_per_call / total if total else None,
+        "p50_ms": percentile(timings, 0.50) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        "peak_memory_bytes": peak,
+    }
+
+
+def _per_call_case(name, size, func, inputs):
+    inputs = inputs[:min(size, MAX_CALLS)]
+    values = iter(inputs * 2)
+    timings = _measure(lambda: func(next(values)), len(inputs))
+    peak = _peak_memory(lambda: [func(value) for value in inputs])
+    return _result(name, size, timings, 1, peak)
+
+
+# items_per_call is the history size for cases that touch every entry and 1
+# for those that should not depend on it
+def _history_case(name, size, func, items_per_call):
+    timings = _measure(func, REPEATS)
+    peak = _peak_memory(func)
+    return _result(name, size, timings, items_per_call, peak)
+
+
+def run_suite(sizes):
+    results = []
+    for size in sizes:
+        entries = synthetic_entries(size)
+        passwords = [entry.password for entry in entries]
+        print(f"history size {size:,}", file=sys.stderr)
+
+        results.append(_per_call_case("check_strength", size, check_strength, passwords))
+        results.append(_per_call_case("generate_password", size, lambda _: generate_password(16), passwords))
+        results.append(_per_call_case("hash_password", size, hash_password, passwords[:KDF_CALLS]))
+
+        history = PasswordHistory()
+        results.append(_history_case("history_append", size,
+                                     lambda: PasswordHistory(map(copy.copy, entries)), size))
+        history.extend(map(copy.copy, entries))
+        results.append(_history_case("export_csv", size, lambda: export_history(history, io.BytesIO(), "CSV"), size))
+        results.append(_history_case("statistics_read", size, lambda: _read_statistics(history), 1))
+    return results
+
+
+# Everything the Statistics tab reads from the aggregates
+def _read_statistics(history):
+    stats = history.stats
+    return (stats.count, stats.average_score, dict(stats.strength_counts), stats.average_length,
+            stats.min_length, stats.max_length, sorted(stats.length_counts.items()), history.recent(5))
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    for result in results:
+        before = baseline.get((result["name"], result["size"]))
+        if not before or not before["throughput_per_s"] or not result["throughput_per_s"]:
+            continue
+        change = result["throughput_per_s"] / before["throughput_per_s"] - 1
+        flag = ""
+        if change < -tolerance:
+            flag = "  <-- regression"
+            regressions += 1
+        print(f"{result['name']:>18} {result['size']:>9,}  {change:+7.1%} throughput{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the app's hot paths.")
+    parser.add_argument("--sizes", default="1e3,1e4,1e5",
+                        help="comma-separated synthetic history sizes (default: %(default)s)")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed throughput drop before a case counts as a regression")
+    args = parser.parse_args(argv)
+
+    sizes = [int(float(size)) for size in args.sizes.split(",")]
+    results = run_suite(sizes)
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2)
+
+    for r in results:
+        print(f"{r['name']:>18} {r['size']:>9,}  {r['throughput_per_s']:>14,.0f}/s  "
+              f"p50 {r['p50_ms']:9.3f} ms  p99 {r['p99_ms']:9.3f} ms  peak {r['peak_memory_bytes'] / 1e6:8.1f} MB")
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# UI-free core of the Password Strength Meter, importable without Streamlit.
+#
+# Names are resolved lazily: a submodule (and whatever it depends on, such as
+# sqlite3 or pyarrow) is only imported the first time one of its names is used,
+# so importing the package from a worker, CLI or test costs next to nothing.
+import importlib
+
+_EXPORTS = {
+    "SPECIAL_CHARS": "password_meter.strength",
+    "COMMON_PASSWORDS": "password_meter.strength",
+    "STRENGTH_CATEGORIES": "password_meter.strength",
+    "STRENGTH_CLASSES": "password_meter.strength",
+    "STRENGTH_LABELS": "password_meter.strength",
+    "check_strength": "password_meter.strength",
+    "check_strength_batch": "password_meter.strength",
+    "get_strength_category": "password_meter.strength",
+    "get_strength_code": "password_meter.strength",
+    "get_strength_label": "password_meter.strength",
+    "get_suggestions": "password_meter.strength",
+    "is_common_password": "password_meter.strength",
+    "strength_code": "password_meter.strength",
+    "CommonPasswordIndex": "password_meter.common_index",
+    "build_index": "password_meter.common_index",
+    "HistoryEntry": "password_meter.history",
+    "HistoryStats": "password_meter.history",
+    "PasswordHistory": "password_meter.history",
+    "format_timestamp": "password_meter.history",
+    "password_fingerprint": "password_meter.history",
+    "new_entry": "password_meter.history",
+    "open_history": "password_meter.history",
+    "password_digest": "password_meter.history",
+    "EXPORT_FORMATS": "password_meter.export",
+    "available_formats": "password_meter.export",
+    "export_history": "password_meter.export",
+    "generate_password": "password_meter.generator",
+    "generate_passwords": "password_meter.generator",
+    "CAPITALIZATIONS": "password_meter.generator",
+    "generate_passphrase": "password_meter.generator",
+    "passphrase_entropy": "password_meter.generator",
+    "passphrase_conflicts": "password_meter.generator",
+    "Wordlist": "password_meter.wordlist",
+    "build_wordlist": "password_meter.wordlist",
+    "get_default_wordlist": "password_meter.wordlist",
+    "open_wordlist": "password_meter.wordlist",
+    "brute_force_time": "password_meter.estimator",
+    "describe_patterns": "password_meter.estimator",
+    "display_time": "password_meter.estimator",
+    "estimate_strength": "password_meter.estimator",
+    "SimilarityIndex": "password_meter.similarity",
+    "IMPORT_FORMATS": "password_meter.importer",
+    "detect_format": "password_meter.importer",
+    "import_entries": "password_meter.importer",
+    "TrendIndex": "password_meter.trends",
+    "downsample": "password_meter.trends",
+    "Hasher": "password_meter.kdf",
+    "get_default_hasher": "password_meter.kdf",
+    "hash_password": "password_meter.kdf",
+    "verify_password": "password_meter.kdf",
+    "ScoreCache": "password_meter.score_cache",
+    "get_score_cache": "password_meter.score_cache",
+    "score_password": "password_meter.score_cache",
+    "CompiledPolicy": "password_meter.policy",
+    "compile_policy": "password_meter.policy",
+    "get_default_policy": "password_meter.policy",
+    "load_policy": "password_meter.policy",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,5 @@
+import sys
+
+from password_meter.cli import main
+
+sys.exit(main())
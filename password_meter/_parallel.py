@@ -0,0 +1,14 @@
+# Helpers shared by the modules that score chunks in worker processes.
+import collections
+
+
+# Results of fn over the chunks, in input order, with a bounded number of
+# chunks in flight
+def ordered_map(executor, fn, chunks, args, max_pending):
+    pending = collections.deque()
+    for chunk in chunks:
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, chunk, *args))
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,242 @@
+# Command-line scoring of large password files.
+#
+#     python -m password_meter score passwords.txt -o scores.csv
+#     python -m password_meter score dump.txt --delimiter : --format jsonl -o scores.jsonl
+#     python -m password_meter serve --port 8080
+#     python -m password_meter import vault.json --history sqlite:///history.db
+#
+# The input is read as a stream of fixed-size byte chunks, each cut at its last
+# newline, and every chunk is scored by a worker process with the same
+# check_strength/estimate_strength/get_strength_code logic as the app. At most
+# a few chunks per worker are in flight and results are written in input
+# order, so memory stays bounded no matter how large the file is.
+import argparse
+import codecs
+import csv
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from password_meter._parallel import ordered_map
+from password_meter.estimator import estimate_strength
+from password_meter.history import password_fingerprint
+from password_meter.strength import CRITERIA, STRENGTH_CATEGORIES, check_strength_batch, get_strength_code
+
+CHUNK_BYTES = 1 << 22
+CSV_COLUMNS = ("account", "hash", "score", "label") + CRITERIA
+
+
+# Newline-delimited records from a binary stream, CHUNK_BYTES at a time
+def iter_chunks(stream, chunk_bytes=CHUNK_BYTES):
+    rest = b""
+    while True:
+        block = stream.read(chunk_bytes)
+        if not block:
+            break
+        block = rest + block
+        cut = block.rfind(b"\n") + 1
+        if not cut:
+            rest = block
+            continue
+        rest = block[cut:]
+        yield block[:cut]
+    if rest:
+        yield rest
+
+
+# Records are split on "\n" only, with a trailing "\r" dropped, so passwords
+# containing other line-break characters stay whole
+def _parse(chunk, delimiter):
+    accounts, passwords = [], []
+    for line in chunk.decode("utf-8", "replace").split("\n"):
+        if line.endswith("\r"):
+            line = line[:-1]
+        if not line:
+            continue
+        if delimiter is not None and delimiter in line:
+            account, password = line.split(delimiter, 1)
+        else:
+            account, password = "", line
+        accounts.append(account)
+        passwords.append(password)
+    return accounts, passwords
+
+
+# Delimiter given on the command line with backslash escapes such as "\t"
+# resolved; other characters, including non-ASCII ones, are kept as they are
+def unescape_delimiter(delimiter):
+    return codecs.decode(delimiter.encode("latin-1", "backslashreplace"), "unicode_escape")
+
+
+# Function run by the workers: score one chunk and return it encoded
+def score_chunk(chunk, delimiter, fmt):
+    accounts, passwords = _parse(chunk, delimiter)
+    columns = check_strength_batch(passwords)
+    labels = [STRENGTH_CATEGORIES[get_strength_code(score, estimate_strength(password))]
+              for score, password in zip(columns["score"], passwords)]
+    hashes = list(map(password_fingerprint, passwords))
+
+    out = io.StringIO()
+    if fmt == "csv":
+        csv.writer(out, lineterminator="\n").writerows(
+            zip(accounts, hashes, columns["score"], labels, *(columns[name] for name in CRITERIA)))
+    else:
+        for i, account in enumerate(accounts):
+            out.write(json.dumps({
+                "account": account,
+                "hash": hashes[i],
+                "score": columns["score"][i],
+                "label": labels[i],
+                "criteria": {name: columns[name][i] for name in CRITERIA},
+            }) + "\n")
+    return out.getvalue().encode(), len(passwords)
+
+
+class _Progress:
+    def __init__(self, stream, interval=1.0):
+        self.stream = stream
+        self.interval = interval
+        self.records = 0
+        self.start = self.last = time.perf_counter()
+
+    def update(self, records):
+        self.records += records
+        now = time.perf_counter()
+        if now - self.last >= self.interval:
+            self.last = now
+            self._report(now, "\r")
+
+    def finish(self):
+        self._report(time.perf_counter(), "\r", end="\n")
+
+    def _report(self, now, prefix, end=""):
+        elapsed = max(now - self.start, 1e-9)
+        self.stream.write(f"{prefix}{self.records:,} records, {self.records / elapsed:,.0f} records/s{end}")
+        self.stream.flush()
+
+
+def score_file(stream, out, delimiter=None, fmt="csv", workers=None, chunk_bytes=CHUNK_BYTES, progress=None):
+    if fmt == "csv":
+        out.write((",".join(CSV_COLUMNS) + "\n").encode())
+    chunks = iter_chunks(stream, chunk_bytes)
+    args = (delimiter, fmt)
+    total = 0
+
+    if workers == 1:
+        results = (score_chunk(chunk, *args) for chunk in chunks)
+        total = _write(results, out, progress)
+    else:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(workers) as executor:
+            total = _write(ordered_map(executor, score_chunk, chunks, args, 2 * workers), out, progress)
+    if progress is not None:
+        progress.finish()
+    return total
+
+
+def _write(results, out, progress):
+    total = 0
+    for data, records in results:
+        out.write(data)
+        total += records
+        if progress is not None:
+            progress.update(records)
+    return total
+
+
+def import_file(args):
+    from password_meter.history import open_history
+    from password_meter.importer import detect_format, import_entries
+
+    if not args.history or not args.history.startswith("sqlite:///"):
+        print("import needs a persistent history: pass --history sqlite:///path.db", file=sys.stderr)
+        return 2
+    history = open_history(args.history)
+    progress = None if args.quiet else _Progress(sys.stderr)
+    with open(args.input, "rb") as stream:
+        fmt = args.format
+        if fmt == "auto":
+            fmt = detect_format(args.input, stream.peek(4096)[:4096])
+
+        def report(result):
+            if progress is not None:
+                progress.update(result.read - progress.records)
+
+        result = import_entries(stream, history, fmt, dedupe=not args.no_dedupe, progress=report,
+                                workers=args.workers or os.cpu_count() or 1)
+    if progress is not None:
+        report(result)
+        progress.finish()
+    print(f"Imported {result.imported:,} entries ({result.duplicates:,} duplicates, "
+          f"{result.skipped:,} without a password skipped)", file=sys.stderr)
+    if not args.quiet:
+        print("Waiting for the password digests to be stored...", file=sys.stderr)
+    history.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m password_meter",
+                                     description="Score passwords from files or over HTTP.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score = commands.add_parser("score", help="score every password in a file")
+    score.add_argument("input", help="newline-delimited passwords, or '-' for stdin")
+    score.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    score.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    score.add_argument("--delimiter", default=None,
+                       help="separator between account and password on each line (default: password only)")
+    score.add_argument("--workers", type=int, default=None,
+                       help="worker processes (default: CPU count; 1 scores in-process)")
+    score.add_argument("--chunk-size", type=int, default=CHUNK_BYTES, help="bytes read per chunk")
+    score.add_argument("--quiet", action="store_true", help="do not report progress on stderr")
+
+    serve = commands.add_parser("serve", help="run the HTTP scoring service")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    serve.add_argument("--max-batch", type=int, default=512, help="passwords per micro-batch")
+    serve.add_argument("--max-wait-ms", type=float, default=2.0, help="longest wait to fill a micro-batch")
+    serve.add_argument("--max-queue", type=int, default=1024, help="queued requests before rejecting with 503")
+
+    imp = commands.add_parser("import", help="import a password-manager export into a history")
+    imp.add_argument("input", help="export file (generic CSV, Bitwarden JSON or KeePass CSV)")
+    imp.add_argument("--format", choices=("auto", "csv", "bitwarden", "keepass"), default="auto")
+    imp.add_argument("--history", default=os.environ.get("PASSWORD_METER_HISTORY"),
+                     help="history URL, e.g. sqlite:///history.db (default: $PASSWORD_METER_HISTORY)")
+    imp.add_argument("--workers", type=int, default=None,
+                     help="scoring processes (default: CPU count; 1 scores in-process)")
+    imp.add_argument("--no-dedupe", action="store_true", help="keep entries already in the history")
+    imp.add_argument("--quiet", action="store_true", help="do not report progress on stderr")
+
+    args = parser.parse_args(argv)
+    if args.command == "import":
+        return import_file(args)
+    if args.command == "serve":
+        import asyncio
+
+        from password_meter.service import serve as run_service
+
+        try:
+            asyncio.run(run_service(args.host, args.port, max_batch=args.max_batch,
+                                    max_wait=args.max_wait_ms / 1000, max_queue=args.max_queue))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.delimiter is not None:
+        args.delimiter = unescape_delimiter(args.delimiter)
+
+    stream = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    progress = None if args.quiet else _Progress(sys.stderr)
+    try:
+        score_file(stream, out, args.delimiter, args.format, args.workers, args.chunk_size, progress)
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+        if out is not sys.stdout.buffer:
+            out.close()
+    return 0
@@ -0,0 +1,174 @@
+# On-disk index of common/breached passwords.
+#
+# The index file holds 8-byte fingerprints of the lowercased passwords, sorted
+# and grouped into 2**bits buckets by their top bits, plus a table of bucket
+# offsets. It is opened with mmap, so a lookup reads one offset pair and a
+# handful of fingerprints no matter how large the list is, and every session in
+# the process shares the same read-only pages.
+#
+# Build an index from one or more newline-delimited wordlists with:
+#
+#     python -m password_meter.common_index build common.idx rockyou.txt ...
+import functools
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b"PWIDX1\0\0"
+HEADER = struct.Struct("<8sQII8x")  # magic, count, bucket bits, reserved
+ENV_VAR = "PASSWORD_METER_COMMON_INDEX"
+
+_PARTITION_BITS = 8
+_CHUNK = 1 << 16
+
+
+def fingerprint(password):
+    digest = hashlib.blake2b(password.lower().encode("utf-8", "surrogatepass"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _bucket_bits(count):
+    # About two to four fingerprints per bucket
+    return max(1, count.bit_length() - 2)
+
+
+class CommonPasswordIndex:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.bits, _ = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a common password index")
+        view = memoryview(self._mmap)
+        table_end = HEADER.size + 4 * ((1 << self.bits) + 1)
+        self._offsets = view[HEADER.size:table_end].cast("I")
+        self._fingerprints = view[table_end:table_end + 8 * self.count].cast("Q")
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, password):
+        fp = fingerprint(password)
+        bucket = fp >> (64 - self.bits)
+        fingerprints = self._fingerprints
+        for i in range(self._offsets[bucket], self._offsets[bucket + 1]):
+            if fingerprints[i] == fp:
+                return True
+        return False
+
+
+# Index configured through the environment, opened once per process
+@functools.lru_cache(maxsize=None)
+def get_default_index():
+    path = os.environ.get(ENV_VAR)
+    if not path:
+        return None
+    return CommonPasswordIndex(path)
+
+
+def _read_words(path):
+    with open(path, "rb") as f:
+        for line in f:
+            word = line.rstrip(b"\r\n")
+            if word:
+                yield word.decode("utf-8", "replace")
+
+
+# Function to build an index file from newline-delimited wordlists.
+# Fingerprints are first spread over temporary partition files by their top
+# bits, then each partition is sorted and deduplicated on its own, so memory
+# use is bounded by the largest partition rather than the whole list.
+def build_index(wordlists, out_path):
+    import tempfile
+
+    shift = 64 - _PARTITION_BITS
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(out_path))) as tmp:
+        parts = [open(os.path.join(tmp, f"{i}.part"), "w+b") for i in range(1 << _PARTITION_BITS)]
+        buffers = [array("Q") for _ in parts]
+        try:
+            for path in wordlists:
+                for word in _read_words(path):
+                    fp = fingerprint(word)
+                    buf = buffers[fp >> shift]
+                    buf.append(fp)
+                    if len(buf) >= _CHUNK:
+                        buf.tofile(parts[fp >> shift])
+                        del buf[:]
+
+            # Sort and deduplicate every partition into one data file
+            count = 0
+            data_path = os.path.join(tmp, "data")
+            with open(data_path, "w+b") as data:
+                for part, buf in zip(parts, buffers):
+                    part.seek(0)
+                    values = array("Q", part.read())
+                    values.extend(buf)
+                    del buf[:]
+                    part.close()
+                    unique = array("Q", sorted(set(values)))
+                    unique.tofile(data)
+                    count += len(unique)
+
+                bits = _bucket_bits(count)
+                offsets = array("I", bytes(4 * ((1 << bits) + 1)))
+                data.seek(0)
+                for value in _iter_file(data):
+                    offsets[(value >> (64 - bits)) + 1] += 1
+                for i in range(1, len(offsets)):
+                    offsets[i] += offsets[i - 1]
+
+                with open(out_path, "wb") as out:
+                    out.write(HEADER.pack(MAGIC, count, bits, 0))
+                    offsets.tofile(out)
+                    data.seek(0)
+                    while True:
+                        block = data.read(8 * _CHUNK)
+                        if not block:
+                            break
+                        out.write(block)
+        finally:
+            for part in parts:
+                part.close()
+    return count
+
+
+def _iter_file(f):
+    while True:
+        block = f.read(8 * _CHUNK)
+        if not block:
+            return
+        yield from array("Q", block)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m password_meter.common_index",
+                                     description="Build or query a common password index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="build an index from newline-delimited wordlists")
+    build.add_argument("output")
+    build.add_argument("wordlists", nargs="+")
+
+    query = commands.add_parser("query", help="check passwords against an index")
+    query.add_argument("index")
+    query.add_argument("passwords", nargs="+")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        count = build_index(args.wordlists, args.output)
+        print(f"Indexed {count} unique passwords into {args.output}")
+    else:
+        index = CommonPasswordIndex(args.index)
+        for password in args.passwords:
+            print(f"{password}\t{'common' if password in index else 'not found'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,561 @@
+# Pattern-aware guess estimation in the spirit of zxcvbn.
+#
+# A password is split into the cheapest sequence of patterns an attacker would
+# try: dictionary words (also reversed and with l33t substitutions), keyboard
+# walks, character sequences, repeats, dates and years, with brute force for
+# whatever is left. The number of guesses for that sequence gives the crack
+# times and a 0-4 score.
+#
+# The dictionary trie and keyboard adjacency graphs are built once per process
+# by _matchers(); a single estimate then stays well within a per-keystroke
+# latency budget (see benchmarks/bench_estimator.py).
+import datetime
+import functools
+import math
+import re
+import time
+
+from password_meter.common_index import get_default_index
+from password_meter.strength import COMMON_PASSWORDS
+
+# Per-keystroke latency budget for estimate_strength, in milliseconds
+LATENCY_BUDGET_MS = 10
+
+# Longer passwords are estimated in chunks of up to MAX_LENGTH characters,
+# each on its own patterns. Chunks that repeat an earlier one only add a factor
+# for the number of chunks, and a password that repeats a short unit is cut
+# on whole units so that its chunks all match.
+MAX_LENGTH = 100
+# Guess counts are capped here so they still convert to a float
+MAX_GUESSES = 1e300
+
+BRUTEFORCE_CARDINALITY = 10
+MIN_GUESSES_SINGLE_CHAR = 10
+MIN_GUESSES_MULTI_CHAR = 50
+MIN_GUESSES_BEFORE_GROWING_SEQUENCE = 10000
+REFERENCE_YEAR = datetime.date.today().year
+MIN_YEAR_SPACE = 20
+
+# Guesses per second for the usual attack scenarios
+ATTACK_RATES = {
+    "online_throttled": 100 / 3600,
+    "online_unthrottled": 10,
+    "offline_slow_hash": 1e4,
+    "offline_fast_hash": 1e10,
+}
+
+# Ranked by how early an attacker tries them
+COMMON_WORDS = (
+    "password", "123456", "12345678", "qwerty", "123456789", "12345", "1234", "111111", "1234567",
+    "dragon", "123123", "baseball", "abc123", "football", "monkey", "letmein", "696969", "shadow",
+    "master", "666666", "qwertyuiop", "123321", "mustang", "1234567890", "michael", "654321",
+    "superman", "1qaz2wsx", "7777777", "121212", "000000", "qazwsx", "123qwe", "killer", "trustno1",
+    "jordan", "jennifer", "zxcvbnm", "asdfgh", "hunter", "buster", "soccer", "harley", "batman",
+    "andrew", "tigger", "sunshine", "iloveyou", "2000", "charlie", "robert", "thomas", "hockey",
+    "ranger", "daniel", "starwars", "klaster", "112233", "george", "computer", "michelle", "jessica",
+    "pepper", "1111", "zxcvbn", "555555", "11111111", "131313", "freedom", "777777", "pass", "maggie",
+    "159753", "aaaaaa", "ginger", "princess", "joshua", "cheese", "amanda", "summer", "love",
+    "ashley", "nicole", "chelsea", "biteme", "matthew", "access", "yankees", "987654321", "dallas",
+    "austin", "thunder", "taylor", "matrix", "admin", "welcome", "login", "secret", "root", "test",
+    "guest", "master", "changeme", "default", "winter", "spring", "autumn", "monday", "friday",
+    "hello", "world", "money", "family", "flower", "orange", "purple", "banana", "apple", "cookie",
+    "chicken", "dog", "cat", "house", "music", "movie", "secure", "strong", "letmein", "qwerty",
+    "the", "be", "and", "of", "you", "that", "have", "for", "not", "with", "this", "but", "from",
+    "they", "say", "her", "she", "will", "one", "all", "would", "there", "their", "what", "out",
+    "about", "who", "get", "which", "when", "make", "can", "like", "time", "just", "him", "know",
+    "take", "people", "into", "year", "your", "good", "some", "could", "them", "see", "other",
+    "than", "then", "now", "look", "only", "come", "its", "over", "think", "also", "back", "after",
+    "use", "two", "how", "our", "work", "first", "well", "way", "even", "new", "want", "because",
+    "any", "these", "give", "day", "most", "blue", "red", "green", "black", "white", "light",
+    "night", "star", "moon", "sun", "fire", "water", "earth", "heart", "angel", "baby", "happy",
+    "lucky", "magic", "power", "king", "queen", "tiger", "lion", "eagle", "wolf", "bear", "horse",
+    "pokemon", "ninja", "pirate", "hacker", "google", "facebook", "mypassword", "passw0rd",
+)
+
+L33T_TABLE = str.maketrans({"4": "a", "@": "a", "8": "b", "(": "c", "{": "c", "3": "e", "6": "g",
+                            "1": "i", "!": "i", "|": "i", "0": "o", "$": "s", "5": "s", "7": "t",
+                            "+": "t", "2": "z"})
+
+QWERTY_ROWS = (
+    ("`~", "1!", "2@", "3#", "4$", "5%", "6^", "7&", "8*", "9(", "0)", "-_", "=+"),
+    ("qQ", "wW", "eE", "rR", "tT", "yY", "uU", "iI", "oO", "pP", "[{", "]}", "\\|"),
+    ("aA", "sS", "dD", "fF", "gG", "hH", "jJ", "kK", "lL", ";:", "'\""),
+    ("zZ", "xX", "cC", "vV", "bB", "nN", "mM", ",<", ".>", "/?"),
+)
+KEYPAD_ROWS = (
+    (None, "/", "*", "-"),
+    ("7", "8", "9", "+"),
+    ("4", "5", "6", None),
+    ("1", "2", "3", None),
+    (None, "0", ".", None),
+)
+
+DATE_SPLITS = {
+    4: ((1, 2), (2, 3)),
+    5: ((1, 3), (2, 3)),
+    6: ((1, 2), (2, 4), (4, 5)),
+    7: ((1, 3), (2, 3), (4, 5), (4, 6)),
+    8: ((2, 4), (4, 6)),
+}
+DATE_WITH_SEPARATOR = re.compile(r"^(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})$")
+YEAR = re.compile(r"19\d\d|20\d\d")
+REPEAT_GREEDY = re.compile(r"(.+)\1+")
+REPEAT_LAZY = re.compile(r"(.+?)\1+")
+
+
+class _Matchers:
+    def __init__(self):
+        # Dictionary trie: nested dicts, with the rank stored under None
+        self.trie = {}
+        for rank, word in enumerate(COMMON_WORDS + tuple(sorted(COMMON_PASSWORDS)), 1):
+            node = self.trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node.setdefault(None, rank)
+
+        self.graphs = {
+            "qwerty": _slanted_graph(QWERTY_ROWS),
+            "keypad": _aligned_graph(KEYPAD_ROWS),
+        }
+
+
+# key -> neighbouring keys, one slot per direction (None where there is no
+# key); each character maps to (key, shifted)
+def _slanted_graph(rows):
+    positions = {}
+    for y, row in enumerate(rows):
+        for x, key in enumerate(row):
+            positions[(x, y)] = key
+    neighbours = {}
+    for (x, y), key in positions.items():
+        around = [(x - 1, y), (x + 1, y), (x, y - 1), (x + 1, y - 1), (x - 1, y + 1), (x, y + 1)]
+        neighbours[key] = [positions.get(p) for p in around]
+    chars = {char: (key, i == 1) for key in positions.values() for i, char in enumerate(key)}
+    return _graph(neighbours, chars)
+
+
+def _aligned_graph(rows):
+    positions = {}
+    for y, row in enumerate(rows):
+        for x, key in enumerate(row):
+            if key is not None:
+                positions[(x, y)] = key
+    neighbours = {}
+    for (x, y), key in positions.items():
+        around = [(x + dx, y + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+        neighbours[key] = [positions.get(p) for p in around]
+    chars = {key: (key, False) for key in positions.values()}
+    return _graph(neighbours, chars)
+
+
+def _graph(neighbours, chars):
+    degree = sum(len(list(filter(None, n))) for n in neighbours.values()) / len(neighbours)
+    return {"neighbours": neighbours, "chars": chars, "starts": len(neighbours), "degree": degree}
+
+
+@functools.lru_cache(maxsize=None)
+def _matchers():
+    return _Matchers()
+
+
+def _match(pattern, i, j, token, guesses, **extra):
+    return dict(pattern=pattern, i=i, j=j, token=token, guesses=guesses, **extra)
+
+
+def _n_choose_k(n, k):
+    return math.comb(n, k) if 0 <= k <= n else 0
+
+
+def _uppercase_variations(token):
+    if token.islower() or not any(c.isalpha() for c in token):
+        return 1
+    if token.isupper() or (token[0].isupper() and token[1:].islower()) or \
+            (token[-1].isupper() and token[:-1].islower()):
+        return 2
+    upper = sum(c.isupper() for c in token)
+    lower = sum(c.islower() for c in token)
+    return sum(_n_choose_k(upper + lower, i) for i in range(1, min(upper, lower) + 1))
+
+
+def _dictionary_matches(password, trie):
+    matches = []
+    lowered = password.lower()
+    unleeted = lowered.translate(L33T_TABLE)
+    reversed_lowered = lowered[::-1]
+    n = len(password)
+    variants = [(lowered, False, False), (reversed_lowered, True, False)]
+    if unleeted != lowered:
+        variants.append((unleeted, False, True))
+    for text, reversed_, l33t in variants:
+        for i in range(n):
+            node = trie
+            for j in range(i, n):
+                node = node.get(text[j])
+                if node is None:
+                    break
+                rank = node.get(None)
+                if rank is None or j == i:
+                    continue
+                if reversed_:
+                    start, end = n - 1 - j, n - i
+                else:
+                    start, end = i, j + 1
+                token = password[start:end]
+                if l33t and token.lower() == text[start:end]:
+                    continue
+                guesses = rank * _uppercase_variations(token)
+                if reversed_:
+                    guesses *= 2
+                if l33t:
+                    subs = sum(a != b for a, b in zip(token.lower(), text[start:end]))
+                    guesses *= 2 ** min(subs, 4)
+                matches.append(_match("dictionary", start, end, token, guesses, rank=rank,
+                                      word=text[i:j + 1][::-1] if reversed_ else text[start:end],
+                                      reversed=reversed_, l33t=l33t))
+    return matches
+
+
+def _spatial_matches(password, graphs):
+    matches = []
+    n = len(password)
+    for name, graph in graphs.items():
+        chars, neighbours = graph["chars"], graph["neighbours"]
+        i = 0
+        while i < n - 2:
+            j = i
+            turns = 0
+            shifted = 1 if chars.get(password[i], (None, False))[1] else 0
+            last_direction = None
+            while j + 1 < n:
+                current, following = chars.get(password[j]), chars.get(password[j + 1])
+                if current is None or following is None or following[0] not in neighbours[current[0]]:
+                    break
+                direction = neighbours[current[0]].index(following[0])
+                if direction != last_direction:
+                    turns += 1
+                    last_direction = direction
+                shifted += following[1]
+                j += 1
+            if j - i >= 2:
+                matches.append(_match("spatial", i, j + 1, password[i:j + 1],
+                                      _spatial_guesses(graph, j + 1 - i, turns, shifted), graph=name))
+            i = j + 1 if j > i else i + 1
+    return matches
+
+
+def _spatial_guesses(graph, length, turns, shifted):
+    starts, degree = graph["starts"], graph["degree"]
+    guesses = 0
+    for i in range(2, length + 1):
+        for j in range(1, min(turns, i - 1) + 1):
+            guesses += _n_choose_k(i - 1, j - 1) * starts * degree ** j
+    unshifted = length - shifted
+    if shifted and not unshifted:
+        guesses *= 2
+    elif shifted:
+        guesses *= sum(_n_choose_k(shifted + unshifted, i) for i in range(1, min(shifted, unshifted) + 1))
+    return guesses
+
+
+def _sequence_matches(password):
+    matches = []
+    n = len(password)
+    i = 0
+    while i < n - 2:
+        delta = ord(password[i + 1]) - ord(password[i])
+        j = i + 1
+        if 1 <= abs(delta) <= 5:
+            while j + 1 < n and ord(password[j + 1]) - ord(password[j]) == delta:
+                j += 1
+        if j - i >= 2:
+            token = password[i:j + 1]
+            first = token[0]
+            if first in "aAzZ019":
+                base = 4
+            elif first.isdigit():
+                base = 10
+            else:
+                base = 26
+            if delta < 0:
+                base *= 2
+            matches.append(_match("sequence", i, j + 1, token, base * len(token), ascending=delta > 0))
+            i = j
+        else:
+            i += 1
+    return matches
+
+
+def _repeat_matches(password):
+    matches = []
+    pos = 0
+    while pos < len(password):
+        greedy = REPEAT_GREEDY.search(password, pos)
+        if greedy is None:
+            break
+        lazy = REPEAT_LAZY.search(password, pos)
+        if len(greedy.group(0)) > len(lazy.group(0)):
+            # "abcabc" style: the greedy match found a longer repeating unit
+            match = greedy
+            base = REPEAT_LAZY.fullmatch(greedy.group(0))
+            unit = base.group(1) if base else greedy.group(1)
+        else:
+            match = lazy
+            unit = lazy.group(1)
+        count = len(match.group(0)) // len(unit)
+        unit_guesses = _minimum_guesses(unit)["guesses"]
+        matches.append(_match("repeat", match.start(), match.end(), match.group(0), unit_guesses * count,
+                              unit=unit, count=count))
+        pos = match.end()
+    return matches
+
+
+def _year_space(year):
+    return max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE)
+
+
+def _two_digit_year(year):
+    if year > 99:
+        return year
+    return year + (1900 if year > 50 else 2000)
+
+
+# (day, month, year) for three integers in any common order, or None
+def _to_date(a, b, c):
+    if b > 31 or b <= 0:
+        return None
+    for year, rest in ((c, (a, b)), (a, (b, c))):
+        if 1000 <= year <= 2050 or year <= 99:
+            for day, month in (rest, rest[::-1]):
+                if 1 <= day <= 31 and 1 <= month <= 12:
+                    return day, month, _two_digit_year(year)
+    return None
+
+
+def _date_matches(password):
+    matches = []
+    n = len(password)
+    for i in range(n - 3):
+        for j in range(i + 4, min(n, i + 10) + 1):
+            token = password[i:j]
+            if token.isdigit():
+                if len(token) == 4 and YEAR.fullmatch(token):
+                    matches.append(_match("year", i, j, token, _year_space(int(token))))
+                best = None
+                for k, l in DATE_SPLITS.get(len(token), ()):
+                    date = _to_date(int(token[:k]), int(token[k:l]), int(token[l:]))
+                    if date and (best is None or _year_space(date[2]) < _year_space(best[2])):
+                        best = date
+                if best:
+                    matches.append(_match("date", i, j, token, 365 * _year_space(best[2]), separator=""))
+            else:
+                parts = DATE_WITH_SEPARATOR.match(token)
+                if parts:
+                    date = _to_date(int(parts.group(1)), int(parts.group(3)), int(parts.group(4)))
+                    if date:
+                        matches.append(_match("date", i, j, token, 365 * _year_space(date[2]) * 4,
+                                              separator=parts.group(2)))
+    return matches
+
+
+def _all_matches(password):
+    matchers = _matchers()
+    matches = _dictionary_matches(password, matchers.trie)
+    matches += _spatial_matches(password, matchers.graphs)
+    matches += _sequence_matches(password)
+    matches += _repeat_matches(password)
+    matches += _date_matches(password)
+    return matches
+
+
+# Cheapest split of the password into matches and brute-force runs
+def _minimum_guesses(password):
+    n = len(password)
+    if not n:
+        return {"guesses": 1, "sequence": []}
+
+    by_end = [[] for _ in range(n + 1)]
+    for match in _all_matches(password):
+        floor = MIN_GUESSES_SINGLE_CHAR if match["j"] - match["i"] == 1 else MIN_GUESSES_MULTI_CHAR
+        match["guesses"] = max(match["guesses"], floor)
+        by_end[match["j"]].append(match)
+
+    inf = float("inf")
+    # best[k][j]: fewest guesses for password[:j] as k segments; back holds
+    # (previous end, match or None for brute force) for the reconstruction
+    best = [[inf] * (n + 1) for _ in range(n + 1)]
+    brute = [[inf] * (n + 1) for _ in range(n + 1)]
+    pattern = [[inf] * (n + 1) for _ in range(n + 1)]
+    back = {}
+    best[0][0] = pattern[0][0] = 1
+    # k segments cost at least MIN_GUESSES_BEFORE_GROWING_SEQUENCE ** (k - 1)
+    # = 10 ** (4 * (k - 1)) guesses, more than brute-forcing the whole
+    # password (10 ** n) once k > n / 4 + 1, so longer splits never win
+    max_segments = n // 4 + 2
+    for j in range(1, n + 1):
+        ends = by_end[j]
+        for k in range(1, min(j, max_segments) + 1):
+            previous, pattern_k = best[k - 1], pattern[k]
+            for match in ends:
+                candidate = previous[match["i"]] * match["guesses"]
+                if candidate < pattern_k[j]:
+                    pattern_k[j] = candidate
+                    back[("p", k, j)] = match
+            # Brute force either starts after a pattern or extends a run
+            start = pattern[k - 1][j - 1] * BRUTEFORCE_CARDINALITY
+            extend = brute[k][j - 1] * BRUTEFORCE_CARDINALITY
+            brute[k][j] = min(start, extend)
+            back[("b", k, j)] = "start" if start <= extend else "extend"
+            best[k][j] = min(pattern[k][j], brute[k][j])
+
+    guesses, segments = inf, 0
+    for k in range(1, min(n, max_segments) + 1):
+        if best[k][n] < inf:
+            total = math.factorial(k) * best[k][n] + MIN_GUESSES_BEFORE_GROWING_SEQUENCE ** (k - 1)
+            if total < guesses:
+                guesses, segments = total, k
+
+    sequence = []
+    k, j = segments, n
+    while j > 0:
+        if pattern[k][j] <= brute[k][j]:
+            match = back[("p", k, j)]
+            sequence.append(match)
+            j, k = match["i"], k - 1
+        else:
+            end = j
+            while back[("b", k, j)] == "extend":
+                j -= 1
+            j -= 1
+            sequence.append(_match("bruteforce", j, end, password[j:end],
+                                   BRUTEFORCE_CARDINALITY ** (end - j)))
+            k -= 1
+    sequence.reverse()
+    return {"guesses": guesses, "sequence": sequence}
+
+
+def guesses_to_score(guesses):
+    if guesses < 1e3 + 5:
+        return 0
+    if guesses < 1e6 + 5:
+        return 1
+    if guesses < 1e8 + 5:
+        return 2
+    if guesses < 1e10 + 5:
+        return 3
+    return 4
+
+
+_UNITS = (("minute", 60), ("hour", 3600), ("day", 86400), ("month", 86400 * 31), ("year", 86400 * 365))
+_LARGE_NUMBERS = (("quintillion", 1e18), ("quadrillion", 1e15), ("trillion", 1e12), ("billion", 1e9),
+                  ("million", 1e6), ("thousand", 1e3))
+
+
+# Function to describe a duration in seconds the way the sidebar tips do
+def display_time(seconds):
+    if seconds < 1:
+        return "less than a second"
+    if seconds < 60:
+        return f"{round(seconds)} second{'s' if round(seconds) != 1 else ''}"
+    for unit, size in reversed(_UNITS):
+        if seconds >= size:
+            break
+    amount = seconds / size
+    if unit == "year" and amount >= 1e21:
+        return "longer than a sextillion years"
+    if unit == "year" and amount >= 1000:
+        for name, value in _LARGE_NUMBERS:
+            if amount >= value:
+                return f"{amount / value:,.0f} {name} years"
+    amount = round(amount)
+    return f"{amount} {unit}{'s' if amount != 1 else ''}"
+
+
+def crack_times(guesses):
+    return {scenario: guesses / rate for scenario, rate in ATTACK_RATES.items()}
+
+
+# Shortest unit of at most MAX_LENGTH characters the password repeats, if any
+def _period(password):
+    for period in range(1, min(MAX_LENGTH, len(password) // 2) + 1):
+        if password[period:] == password[:-period]:
+            return period
+    return None
+
+
+# Function to estimate how many guesses a password would take to crack
+def estimate_strength(password):
+    start = time.perf_counter()
+    size = MAX_LENGTH
+    if len(password) > MAX_LENGTH:
+        period = _period(password)
+        if period:
+            size -= MAX_LENGTH % period
+    head = password[:size]
+    result = _minimum_guesses(head)
+    guesses = result["guesses"]
+    seen = {head}
+    chunks = range(size, len(password), size)
+    for start in chunks:
+        if guesses >= MAX_GUESSES:
+            break
+        chunk = password[start:start + size]
+        if chunk not in seen:
+            seen.add(chunk)
+            guesses *= _minimum_guesses(chunk)["guesses"]
+    if len(seen) <= len(chunks):
+        guesses *= len(chunks) + 1
+    if guesses > MAX_GUESSES:
+        guesses = MAX_GUESSES
+
+    # A password found verbatim in the breached-password index is only as
+    # strong as its position in a cracking list
+    index = get_default_index()
+    if index is not None and password.lower() in index:
+        guesses = min(guesses, max(len(index) / 2, MIN_GUESSES_MULTI_CHAR))
+
+    return {
+        "guesses": guesses,
+        "guesses_log10": math.log10(guesses),
+        "score": guesses_to_score(guesses),
+        "crack_times": crack_times(guesses),
+        "sequence": result["sequence"],
+        "calc_time_ms": (time.perf_counter() - start) * 1000,
+    }
+
+
+# Keys of a match that hold parts of the password itself
+PLAINTEXT_KEYS = ("token", "word", "unit", "separator")
+
+
+# Copy of an estimate whose matches keep only offsets, pattern and guess data,
+# for keeping estimates around without the password's pieces
+def without_plaintext(estimate):
+    sequence = [{key: value for key, value in match.items() if key not in PLAINTEXT_KEYS}
+                for match in estimate["sequence"]]
+    return dict(estimate, sequence=sequence)
+
+
+# Function to describe the patterns that made a password easy to guess. Tokens
+# are sliced from password when the estimate was stripped of them.
+def describe_patterns(estimate, password=None):
+    descriptions = []
+    for match in estimate["sequence"]:
+        pattern = match["pattern"]
+        token = match["token"] if "token" in match else password[match["i"]:match["j"]]
+        if pattern == "dictionary":
+            kind = "a reversed" if match["reversed"] else "a l33t-spelled" if match["l33t"] else "a common"
+            descriptions.append(f"'{token}' is {kind} word or password")
+        elif pattern == "spatial":
+            descriptions.append(f"'{token}' is a keyboard pattern")
+        elif pattern == "sequence":
+            descriptions.append(f"'{token}' is a character sequence")
+        elif pattern == "repeat":
+            descriptions.append(f"'{token}' repeats '{token[:len(token) // match['count']]}'")
+        elif pattern in ("date", "year"):
+            descriptions.append(f"'{token}' looks like a {pattern}")
+    return descriptions
+
+
+# Function to estimate how long brute-forcing a random password takes
+def brute_force_time(length, cardinality, rate=ATTACK_RATES["offline_fast_hash"]):
+    return cardinality ** length / 2 / rate
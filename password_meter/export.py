@@ -0,0 +1,125 @@
+# Chunked export of the password history.
+#
+# Rows are written straight from the history entries to a binary file object a
+# chunk at a time, using the KDF digest stored on each entry (digests still
+# being computed in the background are waited for first), so an export never
+# builds a DataFrame, never rehashes and never holds more than one chunk of
+# encoded output in memory. Rows are read from the entry columns:
+# the strength code becomes its label (or an Arrow dictionary index) and the
+# epoch timestamp is formatted for CSV or written as an Arrow timestamp.
+import csv
+import io
+
+from password_meter.history import format_timestamp
+from password_meter.strength import STRENGTH_LABELS
+
+# The hashed password keeps its historical "password" column name
+EXPORT_COLUMNS = ("id", "account", "password", "strength", "score", "timestamp")
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Arrow": ("arrow", "application/vnd.apache.arrow.file"),
+}
+CHUNK_ROWS = 10_000
+
+
+def iter_entry_chunks(history, chunk_rows=CHUNK_ROWS):
+    chunk = []
+    for entry in history:
+        chunk.append(entry)
+        if len(chunk) == chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Scores are written as floats whatever the backend returned, as in the
+# Arrow schema, so "7" and "7.0" never mix in one column
+def _csv_rows(chunk):
+    return [(entry.id, entry.account, entry.hash, STRENGTH_LABELS[entry.code], float(entry.score),
+             format_timestamp(entry.created)) for entry in chunk]
+
+
+# Yields the CSV export as encoded chunks, header first
+def iter_csv_chunks(history, chunk_rows=CHUNK_ROWS):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    for chunk in iter_entry_chunks(history, chunk_rows):
+        writer.writerows(_csv_rows(chunk))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def write_csv(history, fileobj, chunk_rows=CHUNK_ROWS):
+    for data in iter_csv_chunks(history, chunk_rows):
+        fileobj.write(data)
+
+
+def _arrow_batches(history, chunk_rows):
+    import pyarrow as pa
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("account", pa.string()),
+        ("password", pa.string()),
+        ("strength", pa.dictionary(pa.int8(), pa.string())),
+        ("score", pa.float64()),
+        ("timestamp", pa.timestamp("s", tz="UTC")),
+    ])
+    labels = pa.array(STRENGTH_LABELS, pa.string())
+
+    def batch(chunk):
+        return pa.RecordBatch.from_arrays([
+            pa.array([entry.id for entry in chunk], pa.int64()),
+            pa.array([entry.account for entry in chunk], pa.string()),
+            pa.array([entry.hash for entry in chunk], pa.string()),
+            pa.DictionaryArray.from_arrays(pa.array([entry.code for entry in chunk], pa.int8()), labels),
+            pa.array([entry.score for entry in chunk], pa.float64()),
+            pa.array([entry.created for entry in chunk], schema.field("timestamp").type),
+        ], schema=schema)
+
+    return schema, map(batch, iter_entry_chunks(history, chunk_rows))
+
+
+def write_parquet(history, fileobj, chunk_rows=CHUNK_ROWS):
+    import pyarrow.parquet as pq
+
+    schema, batches = _arrow_batches(history, chunk_rows)
+    with pq.ParquetWriter(fileobj, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def write_arrow(history, fileobj, chunk_rows=CHUNK_ROWS):
+    import pyarrow as pa
+
+    schema, batches = _arrow_batches(history, chunk_rows)
+    with pa.ipc.new_file(fileobj, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+_WRITERS = {"csv": write_csv, "parquet": write_parquet, "arrow": write_arrow}
+
+
+# Formats usable in this environment; the columnar ones need pyarrow
+def available_formats():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return ["CSV"]
+    return list(EXPORT_FORMATS)
+
+
+# Function to write the history in the given format to a binary file object
+def export_history(history, fileobj, fmt="CSV", chunk_rows=CHUNK_ROWS):
+    extension, _ = EXPORT_FORMATS[fmt]
+    wait_hashes = getattr(history, "wait_hashes", None)
+    if wait_hashes is not None:
+        wait_hashes()
+    _WRITERS[extension](history, fileobj, chunk_rows)
@@ -0,0 +1,247 @@
+# Password generation from the cryptographically secure system RNG.
+#
+# generate_password builds one password at a time. generate_passwords produces
+# a whole batch from bulk os.urandom buffers: each character pool maps raw
+# bytes to characters with one bytes.translate call that also drops the bytes
+# above the largest multiple of the pool size (rejection sampling, so every
+# character is equally likely), and the required characters are inserted at
+# uniformly random positions instead of shuffling every password.
+#
+# generate_passphrase draws diceware-style words from a memory-mapped wordlist
+# (see password_meter.wordlist), and passphrase_entropy reports its strength.
+# Words cannot be steered the way single characters are, so under a policy a
+# passphrase is drawn again until it complies, after passphrase_conflicts has
+# ruled out settings that can never comply.
+import math
+import os
+import random
+import secrets
+import string
+
+_random = random.SystemRandom()
+
+FALLBACK_SPECIAL_CHARS = "!@#$%^&*"
+# Passphrase word styles; "random" capitalizes each word with probability 1/2
+CAPITALIZATIONS = ("lower", "title", "upper", "random")
+# Draws tried before a policy is reported as unsatisfiable for passphrases
+PASSPHRASE_ATTEMPTS = 100
+_BLOCK = 1 << 16
+
+
+# Function to generate password. With a policy (a dict or CompiledPolicy),
+# the password is built to comply with it, including the account name rule
+# when an account is given; the length is clamped to the policy's bounds.
+def generate_password(length=12, include_upper=True, include_lower=True, include_digits=True, include_special=True,
+                      policy=None, account=None):
+    if policy is not None:
+        from password_meter.policy import compile_policy
+
+        include = [name for name, selected in (("upper", include_upper), ("lower", include_lower),
+                                               ("digits", include_digits), ("special", include_special)) if selected]
+        return compile_policy(policy).generate(length, include, account)
+
+    chars = ""
+    required_chars = []
+
+    if include_lower:
+        chars += string.ascii_lowercase
+        required_chars.append(_random.choice(string.ascii_lowercase))
+    if include_upper:
+        chars += string.ascii_uppercase
+        required_chars.append(_random.choice(string.ascii_uppercase))
+    if include_digits:
+        chars += string.digits
+        required_chars.append(_random.choice(string.digits))
+    if include_special:
+        special_chars = "!@#$%^&*()-_=+[]{}|;:,.<>?/"
+        chars += special_chars
+        required_chars.append(_random.choice(special_chars))
+
+    if not chars:
+        chars = string.ascii_letters + string.digits + "!@#$%^&*"
+        required_chars = [
+            _random.choice(string.ascii_lowercase),
+            _random.choice(string.ascii_uppercase),
+            _random.choice(string.digits),
+            _random.choice("!@#$%^&*")
+        ]
+
+    # Ensure we don't require more characters than the length
+    required_chars = required_chars[:min(len(required_chars), length)]
+
+    # Fill the rest with random characters
+    password = required_chars.copy()
+    while len(password) < length:
+        password.append(_random.choice(chars))
+
+    # Shuffle the password
+    _random.shuffle(password)
+    return ''.join(password[:length])
+
+
+def _pools(include_upper, include_lower, include_digits, include_special):
+    required = []
+    if include_lower:
+        required.append(string.ascii_lowercase)
+    if include_upper:
+        required.append(string.ascii_uppercase)
+    if include_digits:
+        required.append(string.digits)
+    if include_special:
+        required.append("!@#$%^&*()-_=+[]{}|;:,.<>?/")
+    if not required:
+        return (string.ascii_letters + string.digits + FALLBACK_SPECIAL_CHARS,
+                [string.ascii_lowercase, string.ascii_uppercase, string.digits, FALLBACK_SPECIAL_CHARS])
+    return "".join(required), required
+
+
+# Uniform characters from a pool, drawn from bulk random bytes
+class _CharStream:
+    def __init__(self, pool, reserve=0):
+        size = len(pool)
+        limit = 256 - 256 % size
+        self._table = bytes(ord(pool[b % size]) if b < limit else 0 for b in range(256))
+        self._rejected = bytes(range(limit, 256))
+        self._ratio = 256 / limit
+        self._buffer = b""
+        self._pos = 0
+        if reserve:
+            self._refill(reserve)
+
+    def _refill(self, n):
+        size = max(_BLOCK, int(n * self._ratio * 1.1) + 64)
+        self._buffer = self._buffer[self._pos:] + os.urandom(size).translate(self._table, self._rejected)
+        self._pos = 0
+
+    def take(self, n):
+        while self._pos + n > len(self._buffer):
+            self._refill(n)
+        chunk = self._buffer[self._pos:self._pos + n]
+        self._pos += n
+        return chunk
+
+
+# Uniform integers below a bound, drawn from bulk random bytes
+class _IndexStream:
+    def __init__(self):
+        self._buffer = b""
+        self._pos = 0
+
+    def below(self, n):
+        if n > 256:
+            return secrets.randbelow(n)
+        limit = 256 - 256 % n
+        while True:
+            if self._pos >= len(self._buffer):
+                self._buffer = os.urandom(_BLOCK)
+                self._pos = 0
+            value = self._buffer[self._pos]
+            self._pos += 1
+            if value < limit:
+                return value % n
+
+
+# Function to generate a batch of passwords with the same guarantees as
+# generate_password: at least one character of each selected class (as many as
+# fit in the length), the rest drawn uniformly from all selected classes
+def generate_passwords(count, length=12, include_upper=True, include_lower=True, include_digits=True,
+                       include_special=True):
+    chars, required = _pools(include_upper, include_lower, include_digits, include_special)
+    required = required[:min(len(required), length)]
+    fill_length = length - len(required)
+
+    fill = _CharStream(chars, count * fill_length)
+    required_streams = [_CharStream(pool, count) for pool in required]
+    positions = _IndexStream()
+
+    passwords = []
+    for _ in range(count):
+        password = bytearray(fill.take(fill_length))
+        for stream in required_streams:
+            password.insert(positions.below(len(password) + 1), stream.take(1)[0])
+        passwords.append(password.decode("ascii"))
+    return passwords
+
+
+def _wordlist(wordlist):
+    from password_meter.wordlist import get_default_wordlist, open_wordlist
+
+    if wordlist is None:
+        wordlist = get_default_wordlist()
+        if wordlist is None:
+            raise ValueError("No wordlist configured; set PASSWORD_METER_WORDLIST to a file built with "
+                             "python -m password_meter.wordlist build")
+    elif isinstance(wordlist, str):
+        wordlist = open_wordlist(wordlist)
+    return wordlist
+
+
+# Reasons these passphrase settings can never satisfy a policy (a dict or
+# CompiledPolicy), empty when they can
+def passphrase_conflicts(policy, separator="-", capitalize="lower"):
+    from password_meter.policy import compile_policy
+
+    policy = compile_policy(policy)
+    conflicts = []
+    if "digits" in policy.require:
+        conflicts.append("The policy requires a digit, and passphrases are made of words")
+    if "special" in policy.require and not (separator and separator in policy.special_chars):
+        conflicts.append(f"The policy requires a special character; use one of {policy.special_chars!r} "
+                         "as the separator")
+    if "upper" in policy.require and capitalize == "lower":
+        conflicts.append("The policy requires an uppercase letter; capitalize the words")
+    if "lower" in policy.require and capitalize == "upper":
+        conflicts.append("The policy requires a lowercase letter; do not uppercase every word")
+    return conflicts
+
+
+# Function to generate a passphrase of words drawn uniformly from a wordlist
+# (a Wordlist, a path to one, or the PASSWORD_METER_WORDLIST one by default).
+# With a policy, passphrases are drawn until one complies (for this account,
+# when given); ValueError explains why none did.
+def generate_passphrase(words=6, separator="-", capitalize="lower", wordlist=None, policy=None, account=None):
+    if capitalize not in CAPITALIZATIONS:
+        raise ValueError(f"Unknown capitalization: {capitalize}")
+    if policy is None:
+        return _passphrase(words, separator, capitalize, _wordlist(wordlist))
+
+    from password_meter.policy import compile_policy
+
+    policy = compile_policy(policy)
+    conflicts = passphrase_conflicts(policy, separator, capitalize)
+    if conflicts:
+        raise ValueError(". ".join(conflicts))
+    wordlist = _wordlist(wordlist)
+    for _ in range(PASSPHRASE_ATTEMPTS):
+        passphrase = _passphrase(words, separator, capitalize, wordlist)
+        violations = policy.check(passphrase, account)
+        if not violations:
+            return passphrase
+    raise ValueError(f"No passphrase out of {PASSPHRASE_ATTEMPTS} met the policy, for example: "
+                     + " ".join(violations))
+
+
+def _passphrase(words, separator, capitalize, wordlist):
+    picked = wordlist.sample(words, _random)
+    if capitalize == "title":
+        picked = [word.capitalize() for word in picked]
+    elif capitalize == "upper":
+        picked = [word.upper() for word in picked]
+    elif capitalize == "random":
+        flips = _random.getrandbits(words) if words else 0
+        picked = [word.capitalize() if flips >> i & 1 else word for i, word in enumerate(picked)]
+    return separator.join(picked)
+
+
+# Function to get the entropy in bits of passphrases from generate_passphrase
+# with these settings. Random capitalization adds one bit per word that
+# capitalize() changes, so a list where a fraction f of the words start with a
+# letter adds f bits per word. With an empty separator this is an upper bound:
+# different word sequences can join into the same passphrase ("sun" + "set"
+# and "sunset").
+def passphrase_entropy(words=6, wordlist=None, capitalize="lower"):
+    wordlist = _wordlist(wordlist)
+    bits = words * math.log2(len(wordlist))
+    if capitalize == "random":
+        bits += words * wordlist.capitalizable / len(wordlist)
+    return bits
@@ -0,0 +1,314 @@
+import datetime
+import functools
+import hashlib
+import os
+import sys
+import time
+from collections import Counter
+
+from password_meter.estimator import estimate_strength
+from password_meter.kdf import PendingDigests, get_default_hasher, is_kdf_digest
+from password_meter.similarity import SimilarityIndex
+from password_meter.strength import (
+    STRENGTH_CATEGORIES,
+    STRENGTH_LABELS,
+    check_strength,
+    get_strength_code,
+)
+from password_meter.trends import TrendIndex
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+DIGEST_KEY_BYTES = 32
+
+
+# Keyed digest of a password for reuse counts. Every history has its own
+# random key, so its digests cannot be looked up in precomputed tables or
+# matched against another history's.
+def password_digest(password, key):
+    return hashlib.blake2b(password.encode("utf-8", "surrogatepass"), key=key, digest_size=32).digest()
+
+
+# Short, unsalted fingerprint of a password, for reports that only need to
+# tell rows apart; saved entries store a salted KDF digest (see kdf.py)
+def password_fingerprint(password):
+    return hashlib.sha256(password.encode()).hexdigest()[:10]
+
+
+# Function to format an epoch timestamp the way the app shows it (local time)
+def format_timestamp(epoch):
+    return time.strftime(TIMESTAMP_FORMAT, time.localtime(epoch))
+
+
+# Function to turn a formatted local timestamp back into epoch seconds
+def parse_timestamp(text):
+    return int(datetime.datetime.strptime(text, TIMESTAMP_FORMAT).timestamp())
+
+
+# One saved password. Entries are stored by the million, so they use slots
+# instead of a dict, keep the strength as a small integer code (an index into
+# STRENGTH_LABELS) and the creation time as integer epoch seconds. The label
+# and formatted timestamp are derived on access. hash is the salted KDF
+# digest, None until the history it was appended to has computed it.
+class HistoryEntry:
+    __slots__ = ("id", "account", "password", "hash", "code", "score", "created")
+
+    def __init__(self, account, password, code, score, created, hash=None, id=None):
+        self.id = id
+        self.account = sys.intern(account)
+        self.password = password
+        self.hash = hash
+        self.code = code
+        self.score = score
+        self.created = created
+
+    @property
+    def strength(self):
+        return STRENGTH_LABELS[self.code]
+
+    @property
+    def category(self):
+        return STRENGTH_CATEGORIES[self.code]
+
+    @property
+    def timestamp(self):
+        return format_timestamp(self.created)
+
+    def as_dict(self):
+        return {"id": self.id, "account": self.account, "password": self.password, "hash": self.hash,
+                "strength": self.strength, "score": self.score, "timestamp": self.timestamp}
+
+    def __eq__(self, other):
+        if not isinstance(other, HistoryEntry):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return (f"HistoryEntry(id={self.id!r}, account={self.account!r}, strength={self.strength!r}, "
+                f"score={self.score!r}, timestamp={self.timestamp!r})")
+
+
+# Function to build a history entry for a password, scored and labelled the
+# same way as the Check Password tab. timestamp is epoch seconds or a
+# formatted string and defaults to now.
+def new_entry(account, password, timestamp=None):
+    score, _ = check_strength(password)
+    code = get_strength_code(score, estimate_strength(password))
+    if timestamp is None:
+        timestamp = int(time.time())
+    elif isinstance(timestamp, str):
+        timestamp = parse_timestamp(timestamp)
+    return HistoryEntry(account, password, code, score, timestamp)
+
+
+# Running aggregates over the history for the Statistics tab. Every field is
+# updated on add/discard, and min/max length come from the length histogram,
+# so reading them costs O(number of buckets) and stays correct after deletes.
+class HistoryStats:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.score_sum = 0
+        self.length_sum = 0
+        self.strength_counts = {"Strong": 0, "Moderate": 0, "Weak": 0}
+        self.length_counts = Counter()
+
+    def add(self, entry):
+        self._update(entry, 1)
+
+    def discard(self, entry):
+        self._update(entry, -1)
+
+    def _update(self, entry, sign):
+        length = len(entry.password)
+        self.count += sign
+        self.score_sum += sign * entry.score
+        self.length_sum += sign * length
+        self.strength_counts[STRENGTH_CATEGORIES[entry.code]] += sign
+        self.length_counts[length] += sign
+        if not self.length_counts[length]:
+            del self.length_counts[length]
+
+    @property
+    def average_score(self):
+        return self.score_sum / self.count if self.count else 0
+
+    @property
+    def average_length(self):
+        return self.length_sum / self.count if self.count else 0
+
+    @property
+    def min_length(self):
+        return min(self.length_counts) if self.length_counts else 0
+
+    @property
+    def max_length(self):
+        return max(self.length_counts) if self.length_counts else 0
+
+
+# Saved password entries keyed by a stable, increasing id, plus a counter of
+# how often each password (keyed by its digest under the history's own key)
+# occurs, the Statistics aggregates and the per-day/week trend buckets, all
+# kept up to date on every append, delete and clear so neither reuse checks
+# nor the Statistics tab ever scan the history. Near-duplicate reuse
+# ("Summer2024!" after "Summer2025!") is answered by an LSH index over the
+# saved passwords that is maintained the same way. Entries appended without a KDF digest are hashed by the hasher
+# (the process-wide one by default) in the background; pending_hashes counts
+# the ones still in flight and wait_hashes() waits for them.
+#
+# For paging, ids are also kept in insertion order in one list per filter
+# (all entries, per account, per strength category and per account and
+# category). Deleting only drops the entry from the dict, leaving its id in
+# those lists as a tombstone; a list is compacted once it holds more
+# tombstones than live ids, so deletes are O(1) amortized and a page costs
+# O(offset + page size).
+class PasswordHistory:
+    def __init__(self, entries=(), hasher=None):
+        self._hasher = hasher
+        self._pending = PendingDigests()
+        self._entries = {}
+        self._next_id = 1
+        self._digest_key = os.urandom(DIGEST_KEY_BYTES)
+        self._digest_counts = Counter()
+        self._index = {}
+        self._index_counts = Counter()
+        self._index_dead = Counter()
+        self._similar = SimilarityIndex()
+        self.stats = HistoryStats()
+        self.trends = TrendIndex()
+        for entry in entries:
+            self.append(entry)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries.values())
+
+    def __contains__(self, entry_id):
+        return entry_id in self._entries
+
+    def get(self, entry_id):
+        return self._entries.get(entry_id)
+
+    @staticmethod
+    def _index_keys(entry):
+        account = entry.account
+        category = STRENGTH_CATEGORIES[entry.code]
+        return {(None, None), (account, None), (None, category), (account, category)}
+
+    # Adds a HistoryEntry, stamping it with its id, and returns the id
+    def append(self, entry):
+        entry_id = self._next_id
+        self._next_id += 1
+        entry.id = entry_id
+        self._entries[entry_id] = entry
+        for key in self._index_keys(entry):
+            self._index.setdefault(key, []).append(entry_id)
+            self._index_counts[key] += 1
+        self._digest_counts[password_digest(entry.password, self._digest_key)] += 1
+        self._similar.add(entry_id, entry.password)
+        self.stats.add(entry)
+        self.trends.add(entry)
+        if not is_kdf_digest(entry.hash):
+            self._pending.add(self.hasher, entry.password, functools.partial(setattr, entry, "hash"))
+        return entry_id
+
+    @property
+    def hasher(self):
+        if self._hasher is None:
+            self._hasher = get_default_hasher()
+        return self._hasher
+
+    # Number of appended entries still waiting for their digest
+    @property
+    def pending_hashes(self):
+        return len(self._pending)
+
+    # Waits until every appended entry has its digest
+    def wait_hashes(self, timeout=None):
+        self._pending.wait(timeout)
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def delete(self, entry_id):
+        entry = self._entries.pop(entry_id)
+        for key in self._index_keys(entry):
+            self._index_counts[key] -= 1
+            if not self._index_counts[key]:
+                del self._index[key], self._index_counts[key], self._index_dead[key]
+                continue
+            self._index_dead[key] += 1
+            if self._index_dead[key] > self._index_counts[key]:
+                self._index[key] = [i for i in self._index[key] if i in self._entries]
+                del self._index_dead[key]
+        digest = password_digest(entry.password, self._digest_key)
+        self._digest_counts[digest] -= 1
+        if not self._digest_counts[digest]:
+            del self._digest_counts[digest]
+        self._similar.remove(entry_id)
+        self.stats.discard(entry)
+        self.trends.discard(entry)
+        return entry
+
+    def clear(self):
+        self._pending.clear()
+        self._entries.clear()
+        self._index.clear()
+        self._index_counts.clear()
+        self._index_dead.clear()
+        self._digest_counts.clear()
+        self._similar.clear()
+        self.stats.clear()
+        self.trends.clear()
+
+    # Number of saved entries using this password
+    def count(self, password):
+        return self._digest_counts.get(password_digest(password, self._digest_key), 0)
+
+    # (entry, similarity) for saved entries whose password is close to, but not
+    # the same as, this one, most similar first
+    def similar(self, password, limit=5):
+        return [(self._entries[entry_id], score) for entry_id, score in self._similar.query(password, limit)]
+
+    # Account names with at least one entry
+    def accounts(self):
+        return sorted(account for account, category in self._index if account is not None and category is None)
+
+    # Number of entries matching the filters
+    def filtered_count(self, account=None, strength=None):
+        return self._index_counts.get((account, strength), 0)
+
+    # One page of entries matching the filters, newest first
+    def page(self, page=0, page_size=10, account=None, strength=None):
+        ids = self._index.get((account, strength), ())
+        skip = page * page_size
+        entries = []
+        for entry_id in reversed(ids):
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                continue
+            if skip:
+                skip -= 1
+                continue
+            entries.append(entry)
+            if len(entries) == page_size:
+                break
+        return entries
+
+    def recent(self, n=5):
+        return self.page(0, n)
+
+
+# Function to open the history backend named by a URL: the in-memory history
+# by default, or a persistent SQLite store for "sqlite:///path/to/history.db"
+def open_history(url=None):
+    if not url or url == "memory":
+        return PasswordHistory()
+    if url.startswith("sqlite:///"):
+        from password_meter.sqlite_history import SQLiteHistory
+        return SQLiteHistory(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported history backend: {url}")
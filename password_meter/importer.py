@@ -0,0 +1,299 @@
+# Streaming bulk import of password-manager exports into the history.
+#
+#     python -m password_meter import vault.json --format bitwarden --history sqlite:///history.db
+#
+# Supported exports:
+#
+#   csv        any CSV with a password column and an account-like column
+#              (account, name, title, url, ...)
+#   bitwarden  Bitwarden unencrypted JSON export (login items)
+#   keepass    KeePass / KeePassXC CSV export
+#
+# Records are parsed lazily (the Bitwarden items array is decoded one item at a
+# time), duplicates of entries already in the history or earlier in the file
+# are dropped by a digest of account and password, and the rest are scored in
+# chunks exactly like the Save buttons score them, optionally in worker
+# processes, and appended with history.extend one chunk at a time. Memory
+# stays flat apart from the 16-byte digest kept per imported entry.
+import codecs
+import csv
+import datetime
+import hashlib
+import io
+import itertools
+import json
+import time
+
+from password_meter.estimator import estimate_strength
+from password_meter.history import HistoryEntry
+from password_meter.strength import check_strength_batch, get_strength_code
+
+IMPORT_FORMATS = {
+    "csv": "Generic CSV",
+    "bitwarden": "Bitwarden JSON",
+    "keepass": "KeePass CSV",
+}
+CHUNK_ROWS = 1000
+_READ_SIZE = 1 << 16
+
+# Header names, lowercased, in order of preference
+ACCOUNT_COLUMNS = ("account", "name", "title", "site", "website", "web site", "url", "login_uri", "username",
+                   "login name", "login_username")
+PASSWORD_COLUMNS = ("password", "login_password", "pass")
+TIMESTAMP_COLUMNS = ("timestamp", "created", "creation time", "last modified", "modified")
+
+
+class ImportResult:
+    def __init__(self):
+        self.read = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.bytes_read = 0
+        self.started = time.perf_counter()
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    def __repr__(self):
+        return (f"ImportResult(read={self.read}, imported={self.imported}, duplicates={self.duplicates}, "
+                f"skipped={self.skipped})")
+
+
+# Function to turn an ISO 8601 or "YYYY-MM-DD HH:MM:SS" time into epoch
+# seconds, or None when it cannot be parsed
+def parse_time(value):
+    if not value:
+        return None
+    try:
+        return int(datetime.datetime.fromisoformat(value.strip()).timestamp())
+    except ValueError:
+        return None
+
+
+# Text view of a binary or text stream; pass it to _release when done so the
+# caller's stream is not closed along with the wrapper
+def _text(stream):
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+
+
+def _release(text, stream):
+    if text is not stream:
+        text.detach()
+
+
+def _column(header, names):
+    lowered = [name.strip().lower() for name in header]
+    for name in names:
+        if name in lowered:
+            return lowered.index(name)
+    return None
+
+
+# (account, password, epoch seconds or None) for every row of a CSV export
+def iter_csv(stream, account_columns=ACCOUNT_COLUMNS):
+    text = _text(stream)
+    try:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if header is None:
+            return
+        password = _column(header, PASSWORD_COLUMNS)
+        if password is None:
+            raise ValueError("CSV export has no password column")
+        account = _column(header, account_columns)
+        created = _column(header, TIMESTAMP_COLUMNS)
+        for row in reader:
+            if len(row) <= password:
+                yield None
+                continue
+            yield (row[account] if account is not None and account < len(row) else "",
+                   row[password],
+                   parse_time(row[created]) if created is not None and created < len(row) else None)
+    finally:
+        _release(text, stream)
+
+
+# KeePassXC exports Title/Username/Password/URL, KeePass 2 Account/Login Name/
+# Password/Web Site; the entry title names the account
+def iter_keepass(stream):
+    return iter_csv(stream, ("title", "account", "url", "web site", "username", "login name"))
+
+
+# Incremental JSON decoding over a text stream, one value at a time
+class _JSONStream:
+    def __init__(self, text):
+        self._text = text
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+
+    def _more(self):
+        block = self._text.read(_READ_SIZE)
+        self._buffer = self._buffer[self._pos:] + block
+        self._pos = 0
+        return bool(block)
+
+    # Skips whitespace and the given separators, returns the next character
+    def peek(self, skip=""):
+        while True:
+            buffer, pos = self._buffer, self._pos
+            while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] in skip):
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._more():
+                raise ValueError("unexpected end of JSON export")
+
+    def expect(self, char, skip=""):
+        if self.peek(skip) != char:
+            raise ValueError(f"expected '{char}' in JSON export")
+        self._pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._more():
+                    raise
+                continue
+            # A number cut at the end of the buffer still decodes, as a
+            # shorter one, so a value is only accepted once it ends before
+            # the buffer does or the input is exhausted
+            if end < len(self._buffer) or not self._more():
+                self._pos = end
+                return value
+
+
+# Objects of the array under a top-level key, decoded one at a time from a
+# text stream without loading the document; other top-level values are
+# decoded and dropped
+def iter_json_array(text, key):
+    stream = _JSONStream(text)
+    stream.expect("{")
+    while stream.peek(",") != "}":
+        name = stream.value()
+        stream.expect(":")
+        if name != key:
+            stream.value()
+            continue
+        stream.expect("[")
+        while stream.peek(",") != "]":
+            yield stream.value()
+        return
+
+
+# Login items of a Bitwarden unencrypted JSON export
+def iter_bitwarden(stream):
+    text = _text(stream)
+    try:
+        for item in iter_json_array(text, "items"):
+            login = item.get("login") if isinstance(item, dict) else None
+            password = login.get("password") if isinstance(login, dict) else None
+            if not isinstance(password, str):
+                yield None
+                continue
+            yield (item.get("name") or "", password,
+                   parse_time(item.get("creationDate") or item.get("revisionDate")))
+    finally:
+        _release(text, stream)
+
+
+_READERS = {"csv": iter_csv, "bitwarden": iter_bitwarden, "keepass": iter_keepass}
+
+
+def pair_digest(account, password):
+    data = f"{account}\0{password}".encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+# Function run on each chunk (possibly in a worker process): score the
+# passwords the way new_entry does
+def score_chunk(passwords):
+    scores = check_strength_batch(passwords)["score"]
+    return scores, [get_strength_code(score, estimate_strength(password))
+                    for score, password in zip(scores, passwords)]
+
+
+def _chunks(records, result, history, dedupe, chunk_rows, now):
+    seen = {pair_digest(entry.account, entry.password) for entry in history} if dedupe else None
+    chunk = []
+    for record in records:
+        result.read += 1
+        if record is None or not record[1]:
+            result.skipped += 1
+            continue
+        account, password, created = record
+        account = account or "Unnamed Account"
+        if seen is not None:
+            digest = pair_digest(account, password)
+            if digest in seen:
+                result.duplicates += 1
+                continue
+            seen.add(digest)
+        chunk.append((account, password, created or now))
+        if len(chunk) == chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Function to import an export into the history. stream is a binary or text
+# file object, fmt one of IMPORT_FORMATS and progress, when given, is called
+# with the ImportResult after every chunk. workers > 1 scores chunks in that
+# many processes.
+def import_entries(stream, history, fmt="csv", chunk_rows=CHUNK_ROWS, dedupe=True, progress=None, workers=1):
+    reader = _READERS.get(fmt)
+    if reader is None:
+        raise ValueError(f"Unsupported import format: {fmt}")
+    result = ImportResult()
+    raw = getattr(stream, "buffer", stream)
+    chunks = _chunks(reader(stream), result, history, dedupe, chunk_rows, int(time.time()))
+
+    # Scoring runs ahead of the appends by up to a few chunks per worker
+    chunks, ahead = itertools.tee(chunks)
+    passwords = ([password for _, password, _ in chunk] for chunk in ahead)
+    executor = None
+    if workers and workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        from password_meter._parallel import ordered_map
+
+        executor = ProcessPoolExecutor(workers)
+        scored = ordered_map(executor, score_chunk, passwords, (), 2 * workers)
+    else:
+        scored = map(score_chunk, passwords)
+
+    try:
+        for chunk, (scores, codes) in zip(chunks, scored):
+            history.extend(HistoryEntry(account, password, code, score, created)
+                           for (account, password, created), score, code in zip(chunk, scores, codes))
+            result.imported += len(chunk)
+            try:
+                result.bytes_read = raw.tell()
+            except (AttributeError, OSError, ValueError):
+                pass
+            if progress is not None:
+                progress(result)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return result
+
+
+# Function to guess the format of an export from its file name and first bytes
+def detect_format(name, head=b""):
+    name = (name or "").lower()
+    if name.endswith(".json") or head.lstrip(codecs.BOM_UTF8).lstrip()[:1] == b"{":
+        return "bitwarden"
+    first_line = head.split(b"\n", 1)[0].lower()
+    if (b"title" in first_line and b"group" in first_line) or b"login name" in first_line:
+        return "keepass"
+    return "csv"
@@ -0,0 +1,239 @@
+# Per-rerun instrumentation for the Streamlit page.
+#
+# A RerunMetrics object is started at the top of every rerun and finished at
+# the bottom. In between it collects wall time per phase (setup, the active tab,
+# the sidebar), call counts and time of the functions wrapped with timed(), and,
+# through a hook on the session's message queue, how many elements of each type
+# were emitted and how many bytes were sent to the browser. Finished reruns can
+# be appended to a JSONL log and folded into a Prometheus text file.
+#
+# Fragment reruns (a widget inside an st.fragment changed, so only that
+# function ran) are recorded as reruns of their own, tagged with the fragment
+# name, by begin_fragment.
+#
+# Everything here is UI-free and only touches Streamlit internals through the
+# run context handed to begin_rerun.
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from collections import Counter
+
+_local = threading.local()
+_prometheus_lock = threading.Lock()
+_prometheus_totals = {}
+
+
+class RerunMetrics:
+    def __init__(self, session_id=None, profile=False):
+        self.session_id = session_id
+        self.fragment = None
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self._phase = None
+        self._phase_start = self._start
+        self.phases = {}
+        self.calls = Counter()
+        self.seconds = Counter()
+        self.elements = Counter()
+        self.messages = 0
+        self.payload_bytes = 0
+        self.payload_tracked = False
+        self.wall_seconds = None
+        self.profile_text = None
+        self._profiler = _start_profiler(profile) if profile else None
+
+    # Starts a named phase; the time since the previous mark goes to that phase
+    def mark(self, phase):
+        now = time.perf_counter()
+        if self._phase is not None:
+            self.phases[self._phase] = self.phases.get(self._phase, 0) + now - self._phase_start
+        self._phase, self._phase_start = phase, now
+
+    def record(self, name, seconds):
+        self.calls[name] += 1
+        self.seconds[name] += seconds
+
+    def timer(self, name):
+        return _Timer(self, name)
+
+    # Counts every message the session sends to the browser during the rerun
+    def track_messages(self, ctx):
+        # The hook stays on the context across reruns and reports to whichever
+        # rerun is active on the script thread
+        enqueue = getattr(ctx, "_enqueue", None)
+        if enqueue is None:
+            return
+        self.payload_tracked = True
+        if getattr(enqueue, "_password_meter_hook", False):
+            return
+
+        def hooked(msg):
+            metrics = current()
+            if metrics is not None:
+                try:
+                    metrics.messages += 1
+                    metrics.payload_bytes += msg.ByteSize()
+                    if msg.WhichOneof("type") == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                        metrics.elements[msg.delta.new_element.WhichOneof("type")] += 1
+                except Exception:
+                    pass
+            return enqueue(msg)
+
+        hooked._password_meter_hook = True
+        ctx._enqueue = hooked
+
+    def finish(self):
+        self.mark(None)
+        self.wall_seconds = time.perf_counter() - self._start
+        if self._profiler is not None:
+            self.profile_text = _stop_profiler(self._profiler)
+            self._profiler = None
+        if getattr(_local, "metrics", None) is self:
+            _local.metrics = None
+        return self
+
+    def as_dict(self):
+        return {
+            "timestamp": self.started,
+            "session": self.session_id,
+            "fragment": self.fragment,
+            "wall_ms": round((self.wall_seconds or 0) * 1000, 3),
+            "phases_ms": {name: round(s * 1000, 3) for name, s in self.phases.items()},
+            "calls": dict(self.calls),
+            "call_ms": {name: round(s * 1000, 3) for name, s in self.seconds.items()},
+            "elements": dict(self.elements),
+            "markdown_calls": self.elements.get("markdown", 0),
+            "messages": self.messages,
+            "payload_bytes": self.payload_bytes if self.payload_tracked else None,
+        }
+
+
+# profile is "cprofile", or "pyinstrument" when that package is installed
+def _start_profiler(profile):
+    if profile == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            pass
+        else:
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _stop_profiler(profiler):
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+        return out.getvalue()
+    profiler.stop()
+    return profiler.output_text()
+
+
+class _Timer:
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+
+
+def begin_rerun(session_id=None, ctx=None, profile=False):
+    metrics = RerunMetrics(session_id, profile)
+    if ctx is not None:
+        metrics.track_messages(ctx)
+    _local.metrics = metrics
+    return metrics
+
+
+# Metrics for a fragment run: the enclosing rerun's when the fragment runs as
+# part of a full rerun, otherwise new metrics for the fragment rerun alone.
+# Returns (metrics, own); the caller finishes the metrics when own is True.
+def begin_fragment(name, session_id=None, ctx=None):
+    metrics = current()
+    own = metrics is None
+    if own:
+        metrics = begin_rerun(session_id, ctx)
+        metrics.fragment = name
+    metrics.mark(f"fragment: {name}")
+    return metrics, own
+
+
+# Metrics of the rerun running on this thread, if any
+def current():
+    return getattr(_local, "metrics", None)
+
+
+# Wraps a function so each call is counted and timed in the current rerun
+def timed(name, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        metrics = current()
+        if metrics is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.record(name, time.perf_counter() - start)
+    return wrapper
+
+
+def write_jsonl(path, metrics):
+    with open(path, "a") as f:
+        f.write(json.dumps(metrics.as_dict()) + "\n")
+
+
+# Folds a finished rerun into process-wide totals and rewrites the Prometheus
+# text file atomically
+def write_prometheus(path, metrics):
+    with _prometheus_lock:
+        totals = _prometheus_totals
+        totals["reruns"] = totals.get("reruns", 0) + 1
+        totals["rerun_seconds"] = totals.get("rerun_seconds", 0) + metrics.wall_seconds
+        totals["payload_bytes"] = totals.get("payload_bytes", 0) + metrics.payload_bytes
+        totals["messages"] = totals.get("messages", 0) + metrics.messages
+        for kind, name, value in ([("calls", n, v) for n, v in metrics.calls.items()] +
+                                  [("call_seconds", n, v) for n, v in metrics.seconds.items()] +
+                                  [("elements", n, v) for n, v in metrics.elements.items()] +
+                                  [("phase_seconds", n, v) for n, v in metrics.phases.items()] +
+                                  ([("fragment_reruns", metrics.fragment, 1)] if metrics.fragment else [])):
+            totals[(kind, name)] = totals.get((kind, name), 0) + value
+
+        lines = [
+            "# TYPE password_meter_reruns_total counter",
+            f"password_meter_reruns_total {totals['reruns']}",
+            "# TYPE password_meter_rerun_seconds_total counter",
+            f"password_meter_rerun_seconds_total {totals['rerun_seconds']:.6f}",
+            "# TYPE password_meter_payload_bytes_total counter",
+            f"password_meter_payload_bytes_total {totals['payload_bytes']}",
+            "# TYPE password_meter_messages_total counter",
+            f"password_meter_messages_total {totals['messages']}",
+        ]
+        for kind, label in (("calls", "function"), ("call_seconds", "function"),
+                            ("elements", "element"), ("phase_seconds", "phase"),
+                            ("fragment_reruns", "fragment")):
+            metric = f"password_meter_{kind}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for key, value in sorted((k, v) for k, v in totals.items() if isinstance(k, tuple) and k[0] == kind):
+                lines.append(f'{metric}{{{label}="{key[1]}"}} {value:.6f}' if isinstance(value, float)
+                             else f'{metric}{{{label}="{key[1]}"}} {value}')
+
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, path)
@@ -0,0 +1,274 @@
+# Salted, memory-hard password digests, computed off the script thread.
+#
+# Digests are Argon2id when argon2-cffi is installed, scrypt otherwise, and
+# are encoded as PHC-style strings that carry the parameters and the salt:
+#
+#     $scrypt$ln=14,r=8,p=1$<salt>$<hash>
+#     $argon2id$v=19$m=19456,t=2,p=1$<salt>$<hash>
+#
+# Each digest costs tens of milliseconds and 16-19 MiB on purpose, so a
+# Hasher runs them on a thread pool (both KDFs release the GIL while hashing)
+# or a process pool. submit() only queues the password and returns a Future.
+# A dispatcher thread takes every request queued so far and sends it to the
+# pool in batches, one task per batch, so a burst of saves or an import chunk
+# pays one hand-off per batch instead of one per password.
+#
+# History backends hash appended entries through the process-wide hasher and
+# store the digest with the entry, tracking the ones in flight with
+# PendingDigests, which retries a failed digest a few times and logs it when
+# it gives up. Entries whose hash is not one of these PHC strings (empty, or
+# the 10-hex fingerprint of older versions) are hashed again. The History
+# tab, reuse checks and exports read the stored digest and never hash again.
+#
+# PASSWORD_METER_KDF=scrypt|argon2 picks the KDF (argon2 when installed by
+# default), PASSWORD_METER_HASH_WORKERS sets the pool size (0 hashes inline)
+# and PASSWORD_METER_HASH_PROCESSES=1 uses processes instead of threads.
+import base64
+import functools
+import hashlib
+import hmac
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future, wait
+
+ENV_KDF = "PASSWORD_METER_KDF"
+ENV_WORKERS = "PASSWORD_METER_HASH_WORKERS"
+ENV_PROCESSES = "PASSWORD_METER_HASH_PROCESSES"
+
+# Tries per digest before PendingDigests gives up on it
+HASH_ATTEMPTS = 3
+
+log = logging.getLogger(__name__)
+
+# scrypt: N = 2**14, 16 MiB per digest
+SCRYPT = {"ln": 14, "r": 8, "p": 1}
+# Argon2id: 19 MiB, 2 passes
+ARGON2 = {"m": 19456, "t": 2, "p": 1}
+SALT_BYTES = 16
+HASH_BYTES = 32
+BATCH_SIZE = 16
+
+
+def _b64(data):
+    return base64.b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _has_argon2():
+    try:
+        import argon2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def available_kdfs():
+    return ("argon2", "scrypt") if _has_argon2() else ("scrypt",)
+
+
+# KDF named by PASSWORD_METER_KDF, or the strongest one available
+def default_kdf():
+    kdf = os.environ.get(ENV_KDF) or available_kdfs()[0]
+    if kdf not in available_kdfs():
+        raise ValueError(f"KDF {kdf!r} is not available; use one of {', '.join(available_kdfs())}")
+    return kdf
+
+
+def _scrypt(secret, salt, ln, r, p):
+    return hashlib.scrypt(secret, salt=salt, n=1 << ln, r=r, p=p, maxmem=(1 << ln) * r * 256,
+                          dklen=HASH_BYTES)
+
+
+def _argon2(secret, salt, m, t, p):
+    from argon2.low_level import Type, hash_secret_raw
+
+    return hash_secret_raw(secret, salt, time_cost=t, memory_cost=m, parallelism=p, hash_len=HASH_BYTES,
+                           type=Type.ID)
+
+
+# Function to hash a password with a fresh salt, inline; use a Hasher to keep
+# the work off the calling thread
+def hash_password(password, kdf=None):
+    kdf = kdf or default_kdf()
+    secret = password.encode("utf-8", "surrogatepass")
+    salt = os.urandom(SALT_BYTES)
+    if kdf == "argon2":
+        digest = _argon2(secret, salt, **ARGON2)
+        return f"$argon2id$v=19$m={ARGON2['m']},t={ARGON2['t']},p={ARGON2['p']}${_b64(salt)}${_b64(digest)}"
+    if kdf == "scrypt":
+        digest = _scrypt(secret, salt, **SCRYPT)
+        return f"$scrypt$ln={SCRYPT['ln']},r={SCRYPT['r']},p={SCRYPT['p']}${_b64(salt)}${_b64(digest)}"
+    raise ValueError(f"Unknown KDF: {kdf}")
+
+
+# Function to check a password against a digest from hash_password
+def verify_password(password, encoded):
+    parts = encoded.split("$")
+    secret = password.encode("utf-8", "surrogatepass")
+    if len(parts) == 5 and parts[1] == "scrypt":
+        params = dict(item.split("=") for item in parts[2].split(","))
+        digest = _scrypt(secret, _unb64(parts[3]), int(params["ln"]), int(params["r"]), int(params["p"]))
+        return hmac.compare_digest(digest, _unb64(parts[4]))
+    if len(parts) == 6 and parts[1] == "argon2id":
+        params = dict(item.split("=") for item in parts[3].split(","))
+        digest = _argon2(secret, _unb64(parts[4]), int(params["m"]), int(params["t"]), int(params["p"]))
+        return hmac.compare_digest(digest, _unb64(parts[5]))
+    raise ValueError("Unsupported password digest")
+
+
+# True for a digest from hash_password, False for an empty or legacy hash
+def is_kdf_digest(encoded):
+    return bool(encoded) and encoded.startswith("$")
+
+
+# Function run on each batch (possibly in a worker process)
+def hash_batch(passwords, kdf):
+    return [hash_password(password, kdf) for password in passwords]
+
+
+class Hasher:
+    def __init__(self, workers=None, processes=False, batch_size=BATCH_SIZE, kdf=None):
+        self.kdf = kdf or default_kdf()
+        self.workers = min(4, os.cpu_count() or 1) if workers is None else workers
+        self.processes = processes
+        self.batch_size = batch_size
+        self._executor = None
+        self._queue = queue.SimpleQueue()
+        self._dispatcher = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._dispatcher is None:
+                if self.processes:
+                    from concurrent.futures import ProcessPoolExecutor
+                    self._executor = ProcessPoolExecutor(self.workers)
+                else:
+                    from concurrent.futures import ThreadPoolExecutor
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hasher")
+                self._dispatcher = threading.Thread(target=self._dispatch, name="password-hasher-dispatch",
+                                                    daemon=True)
+                self._dispatcher.start()
+
+    # Queues a password and returns a Future of its digest. With no workers,
+    # the digest is computed right away.
+    def submit(self, password):
+        future = Future()
+        if not self.workers:
+            future.set_result(hash_password(password, self.kdf))
+            return future
+        if self._dispatcher is None:
+            self._start()
+        self._queue.put((password, future))
+        return future
+
+    # Function to hash many passwords on the pool and wait for all of them
+    def map(self, passwords):
+        return [future.result() for future in [self.submit(password) for password in passwords]]
+
+    # Takes every queued request and splits it into one batch per worker, at
+    # most batch_size passwords each, so a small burst still uses the whole pool
+    def _dispatch(self):
+        while True:
+            requests = [self._queue.get()]
+            if requests[0] is None:
+                return
+            while len(requests) < self.batch_size * self.workers:
+                try:
+                    request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._queue.put(None)
+                    break
+                requests.append(request)
+            size = min(self.batch_size, -(-len(requests) // self.workers))
+            for start in range(0, len(requests), size):
+                batch = requests[start:start + size]
+                task = self._executor.submit(hash_batch, [password for password, _ in batch], self.kdf)
+                task.add_done_callback(functools.partial(_resolve, batch))
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._dispatcher is not None:
+                self._queue.put(None)
+                self._dispatcher.join()
+                self._executor.shutdown(wait=wait)
+                self._dispatcher = self._executor = None
+
+
+def _resolve(batch, task):
+    exception = task.exception()
+    if exception is not None:
+        for _, future in batch:
+            future.set_exception(exception)
+        return
+    for (_, future), digest in zip(batch, task.result()):
+        future.set_result(digest)
+
+
+# Digests a history backend is waiting for. add() submits a password and
+# calls store(digest) when it is computed; wait() returns once every store has
+# run, which is after the hash futures themselves complete.
+class PendingDigests:
+    def __init__(self):
+        self._stored = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._stored)
+
+    def add(self, hasher, password, store):
+        stored = Future()
+        with self._lock:
+            self._stored.add(stored)
+        self._submit(hasher, password, store, stored, HASH_ATTEMPTS)
+
+    def _submit(self, hasher, password, store, stored, attempts):
+        def done(future):
+            # Dropped by clear() while hashing
+            if stored.cancelled():
+                return
+            error = future.exception()
+            if error is not None and attempts > 1:
+                log.warning("password digest failed, retrying: %r", error)
+                self._submit(hasher, password, store, stored, attempts - 1)
+                return
+            try:
+                if error is None:
+                    store(future.result())
+                else:
+                    log.error("password digest failed %d times, leaving the entry unhashed: %r",
+                              HASH_ATTEMPTS, error)
+            finally:
+                with self._lock:
+                    self._stored.discard(stored)
+                    if not stored.cancelled():
+                        stored.set_result(None)
+
+        hasher.submit(password).add_done_callback(done)
+
+    def wait(self, timeout=None):
+        with self._lock:
+            stored = list(self._stored)
+        wait(stored, timeout)
+
+    # Forgets the digests in flight: they are not stored and wait() no longer
+    # waits for them
+    def clear(self):
+        with self._lock:
+            for stored in self._stored:
+                stored.cancel()
+            self._stored.clear()
+
+
+# Hasher configured through the environment, one per process
+@functools.lru_cache(maxsize=None)
+def get_default_hasher():
+    workers = os.environ.get(ENV_WORKERS)
+    return Hasher(None if workers is None else int(workers), os.environ.get(ENV_PROCESSES) == "1")
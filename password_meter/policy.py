@@ -0,0 +1,291 @@
+# Organization password policies.
+#
+# A policy is declared as a plain dict (or a JSON file), for example
+#
+#     {
+#         "name": "acme",
+#         "min_length": 12,
+#         "max_length": 64,
+#         "require": ["upper", "lower", "digits", "special"],
+#         "special_chars": "!@#$%^&*-_",
+#         "banned": ["acme", "password", "welcome"],
+#         "max_run": 2,
+#         "forbid_account_name": true
+#     }
+#
+# and compiled once into a CompiledPolicy (cached per distinct policy): a
+# 128-entry character-class table and an Aho-Corasick automaton over the
+# lowercased banned terms, completed into a DFA so each character costs one
+# dict lookup. Checking a password is then a single pass that collects the
+# character classes, the longest run of a repeated character and every banned
+# term. The same DFA drives generation: each character is drawn only from
+# those that neither complete a banned term nor extend a run past max_run, so
+# a generated password complies by construction instead of by retrying.
+#
+# PASSWORD_METER_POLICY=/path/to/policy.json sets the policy used by the app.
+import functools
+import json
+import os
+import random
+import re
+import string
+from collections import deque
+
+from password_meter.strength import DIGIT, LOWER, SPECIAL, SPECIAL_CHARS, UPPER
+
+ENV_VAR = "PASSWORD_METER_POLICY"
+CLASSES = {"upper": UPPER, "lower": LOWER, "digits": DIGIT, "special": SPECIAL}
+_CLASS_NAMES = {"upper": "an uppercase letter", "lower": "a lowercase letter", "digits": "a digit",
+                "special": "a special character"}
+DEFAULTS = {
+    "name": "default",
+    "min_length": 8,
+    "max_length": None,
+    "require": ["upper", "lower", "digits", "special"],
+    "special_chars": SPECIAL_CHARS,
+    "banned": [],
+    "max_run": None,
+    "forbid_account_name": False,
+}
+# Account names are matched by their alphanumeric parts of at least this length
+MIN_ACCOUNT_TOKEN = 3
+
+_random = random.SystemRandom()
+
+
+# Aho-Corasick automaton over lowercase terms, completed into a DFA: delta[s]
+# maps every character that leaves the root to the next state (uppercase
+# letters move like their lowercase form) and match[s] is the tuple of every
+# term that ends in state s ("she" and "he" both end after "ushe"), or None
+class _Automaton:
+    def __init__(self, terms):
+        goto, fail, match = [{}], [0], [None]
+        for term in terms:
+            state = 0
+            for char in term:
+                if char not in goto[state]:
+                    goto.append({})
+                    fail.append(0)
+                    match.append(None)
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            match[state] = (term,)
+
+        alphabet = {char for term in terms for char in term}
+        delta = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        queue = deque()
+        for state in goto[0].values():
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            # Terms ending at the failure state are suffixes of this one's
+            inherited = match[fail[state]]
+            if inherited is not None:
+                match[state] = inherited if match[state] is None else match[state] + inherited
+            delta[state] = {char: delta[fail[state]].get(char, 0) for char in alphabet}
+            for char, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0) if state else 0
+                delta[state][char] = child
+                queue.append(child)
+        for transitions in delta:
+            for char in [c for c in transitions if c.upper() != c]:
+                transitions.setdefault(char.upper(), transitions[char])
+            for key in [key for key, value in transitions.items() if not value]:
+                del transitions[key]
+        self.delta = delta
+        self.match = match
+        self._allowed = {}
+
+    # Characters of pool that can follow state without completing a term
+    def allowed(self, state, pool):
+        key = (state, pool)
+        allowed = self._allowed.get(key)
+        if allowed is None:
+            transitions, match = self.delta[state], self.match
+            allowed = self._allowed[key] = tuple(char for char in pool if match[transitions.get(char, 0)] is None)
+        return allowed
+
+
+def _times(n):
+    return "once" if n == 1 else f"{n} times"
+
+
+def _account_tokens(account):
+    if not account:
+        return ()
+    return tuple(sorted({token for token in re.split(r"[^0-9a-z]+", account.lower())
+                         if len(token) >= MIN_ACCOUNT_TOKEN}))
+
+
+class CompiledPolicy:
+    def __init__(self, spec):
+        unknown = set(spec) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown policy keys: {', '.join(sorted(unknown))}")
+        spec = {**DEFAULTS, **spec}
+        unknown = set(spec["require"]) - set(CLASSES)
+        if unknown:
+            raise ValueError(f"Unknown character classes: {', '.join(sorted(unknown))}")
+
+        self.spec = spec
+        self.name = spec["name"]
+        self.min_length = spec["min_length"]
+        self.max_length = spec["max_length"]
+        self.require = tuple(name for name in CLASSES if name in spec["require"])
+        self.special_chars = spec["special_chars"]
+        self.banned = tuple(sorted({term.lower() for term in spec["banned"] if term}))
+        self.max_run = spec["max_run"]
+        self.forbid_account_name = spec["forbid_account_name"]
+        if self.max_length is not None and self.max_length < max(self.min_length, len(self.require)):
+            raise ValueError("max_length is shorter than the policy requires")
+        if self.max_run is not None and self.max_run < 1:
+            raise ValueError("max_run must be at least 1")
+
+        self.pools = {
+            "upper": string.ascii_uppercase,
+            "lower": string.ascii_lowercase,
+            "digits": string.digits,
+            "special": self.special_chars,
+        }
+        self._table = [self._classify(chr(code)) for code in range(128)]
+        self._automata = {(): _Automaton(self.banned)}
+
+    def _classify(self, char):
+        mask = 0
+        if char.isupper():
+            mask |= UPPER
+        if char.islower():
+            mask |= LOWER
+        if char.isdigit():
+            mask |= DIGIT
+        if char in self.special_chars:
+            mask |= SPECIAL
+        return mask
+
+    # Automaton for the banned terms plus, when the policy forbids it, the
+    # parts of this account name
+    def _automaton(self, account=None):
+        tokens = _account_tokens(account) if self.forbid_account_name else ()
+        automaton = self._automata.get(tokens)
+        if automaton is None:
+            if len(self._automata) > 256:
+                self._automata = {(): self._automata[()]}
+            automaton = self._automata[tokens] = _Automaton(sorted(set(self.banned) | set(tokens)))
+        return automaton
+
+    # List of rule violations, empty when the password complies
+    def check(self, password, account=None):
+        automaton = self._automaton(account)
+        delta, match = automaton.delta, automaton.match
+        table, classify = self._table, self._classify
+        mask = state = run = longest_run = 0
+        previous = None
+        found = set()
+        for char in password:
+            code = ord(char)
+            mask |= table[code] if code < 128 else classify(char)
+            run = run + 1 if char == previous else 1
+            if run > longest_run:
+                longest_run = run
+            previous = char
+            state = delta[state].get(char, 0)
+            if match[state] is not None:
+                found.update(match[state])
+
+        violations = []
+        if len(password) < self.min_length:
+            violations.append(f"Use at least {self.min_length} characters")
+        if self.max_length is not None and len(password) > self.max_length:
+            violations.append(f"Use at most {self.max_length} characters")
+        for name in self.require:
+            if not mask & CLASSES[name]:
+                violations.append(f"Include {_CLASS_NAMES[name]}")
+        if self.max_run is not None and longest_run > self.max_run:
+            violations.append(f"Do not repeat a character more than {_times(self.max_run)} in a row")
+        tokens = set(_account_tokens(account)) if self.forbid_account_name else set()
+        for term in sorted(found):
+            if term in tokens:
+                violations.append(f"Do not include the account name ('{term}')")
+            else:
+                violations.append(f"Do not include '{term}'")
+        return violations
+
+    def complies(self, password, account=None):
+        return not self.check(password, account)
+
+    # Human-readable rules, for showing the policy in the UI
+    def describe(self):
+        rules = [f"At least {self.min_length} characters" if self.max_length is None
+                 else f"{self.min_length} to {self.max_length} characters"]
+        rules += [f"Include {_CLASS_NAMES[name]}" for name in self.require]
+        if self.max_run is not None:
+            rules.append(f"No character repeated more than {_times(self.max_run)} in a row")
+        if self.banned:
+            rules.append(f"No banned terms ({len(self.banned)})")
+        if self.forbid_account_name:
+            rules.append("No parts of the account name")
+        return rules
+
+    # Function to generate a compliant password in one left-to-right pass.
+    # The required classes (the policy's plus the included ones) get one
+    # randomly chosen position each; every position then draws uniformly from
+    # the characters of its pool that keep the password compliant.
+    def generate(self, length, include=(), account=None, rng=_random):
+        length = max(length, self.min_length, len(self.require))
+        if self.max_length is not None:
+            length = min(length, self.max_length)
+        classes = [name for name in CLASSES if name in self.require or name in include]
+        if not classes:
+            classes = list(CLASSES)
+        classes = [name for name in classes if self.pools[name]]
+        pool = "".join(self.pools[name] for name in classes)
+        required = [name for name in classes if name in self.require or name in include][:length]
+
+        slots = [pool] * length
+        for position, name in zip(rng.sample(range(length), len(required)), required):
+            slots[position] = self.pools[name]
+
+        automaton = self._automaton(account)
+        delta = automaton.delta
+        chars = []
+        state = run = 0
+        previous = None
+        for slot in slots:
+            allowed = automaton.allowed(state, slot)
+            if self.max_run is not None and run >= self.max_run:
+                allowed = [char for char in allowed if char != previous]
+            if not allowed:
+                raise ValueError(f"Policy '{self.name}' leaves no allowed character at position {len(chars) + 1}")
+            char = rng.choice(allowed)
+            run = run + 1 if char == previous else 1
+            previous = char
+            state = delta[state].get(char, 0)
+            chars.append(char)
+        return "".join(chars)
+
+
+@functools.lru_cache(maxsize=64)
+def _compile(key):
+    return CompiledPolicy(json.loads(key))
+
+
+# Function to compile a policy dict, once per distinct policy
+def compile_policy(spec):
+    if isinstance(spec, CompiledPolicy):
+        return spec
+    return _compile(json.dumps(spec, sort_keys=True))
+
+
+def load_policy(path):
+    with open(path) as f:
+        return compile_policy(json.load(f))
+
+
+# The policy named by PASSWORD_METER_POLICY, or None when it is not set
+@functools.lru_cache(maxsize=None)
+def get_default_policy():
+    path = os.environ.get(ENV_VAR)
+    if not path:
+        return None
+    return load_policy(path)
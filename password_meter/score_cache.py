@@ -0,0 +1,153 @@
+# Process-wide cache of strength results, shared by every Streamlit session.
+#
+# Reruns score the same inputs over and over: the password in the Check tab on
+# every keystroke, the generated password each time the Generate tab redraws,
+# in every open session. score_password computes check_strength,
+# estimate_strength and the strength code once per distinct password and
+# serves repeats from a bounded LRU with a time-to-live.
+#
+# Entries are keyed by a blake2b digest keyed with a random per-process salt,
+# so no plaintext password is kept as a key and digests cannot be compared
+# across processes. Cached estimates are stripped of the matched tokens and
+# words (see estimator.without_plaintext) and only keep their offsets; pass
+# the password to describe_patterns to name the patterns.
+# The cache empties itself when the scoring rules change: a reloaded scoring
+# module, a different common-password list or index, or a different policy.
+#
+# PASSWORD_METER_SCORE_CACHE_SIZE (entries, 0 disables the cache) and
+# PASSWORD_METER_SCORE_CACHE_TTL (seconds, 0 for no expiry) configure the
+# process-wide cache.
+import functools
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+ENV_SIZE = "PASSWORD_METER_SCORE_CACHE_SIZE"
+ENV_TTL = "PASSWORD_METER_SCORE_CACHE_TTL"
+DEFAULT_SIZE = 4096
+DEFAULT_TTL = 600
+
+
+# Everything a cached result depends on; compared by identity, so it is cheap
+# to check on every lookup
+def _rules_token():
+    from password_meter import estimator, strength
+    from password_meter.common_index import get_default_index
+    from password_meter.policy import get_default_policy
+
+    return (strength.check_strength, strength.get_strength_code, estimator.estimate_strength,
+            strength.COMMON_PASSWORDS, strength.SPECIAL_CHARS, get_default_index(), get_default_policy())
+
+
+# (score, criteria, estimate, strength code) of a password, with no piece of
+# the password left in the estimate
+def _score(password):
+    from password_meter.estimator import estimate_strength, without_plaintext
+    from password_meter.strength import check_strength, get_strength_code
+
+    score, criteria = check_strength(password)
+    estimate = estimate_strength(password)
+    return score, criteria, without_plaintext(estimate), get_strength_code(score, estimate)
+
+
+class ScoreCache:
+    def __init__(self, maxsize=DEFAULT_SIZE, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._salt = os.urandom(16)
+        self._rules = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _key(self, password):
+        return hashlib.blake2b(password.encode("utf-8", "surrogatepass"), key=self._salt,
+                               digest_size=16).digest()
+
+    # Drops every entry; also done automatically when the rules change
+    def invalidate(self, rules=None):
+        with self._lock:
+            self._invalidate(rules)
+
+    def _invalidate(self, rules):
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+        self._salt = os.urandom(16)
+        self._rules = rules
+
+    # Function to get the cached result for a password, computing and storing
+    # it with compute(password) on a miss. compute runs outside the lock, so a
+    # slow score does not hold up other sessions.
+    def get(self, password, compute=_score):
+        if not self.maxsize:
+            return compute(password)
+        rules = _rules_token()
+        with self._lock:
+            if rules != self._rules:
+                self._invalidate(rules)
+            key = self._key(password)
+            item = self._entries.get(key)
+            if item is not None:
+                expires, value = item
+                if expires is None or expires > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        value = compute(password)
+
+        with self._lock:
+            # Results computed under rules that changed meanwhile are not kept
+            if self._rules == rules:
+                self._entries[self._key(password)] = (None if self.ttl is None else self._clock() + self.ttl, value)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+# Cache configured through the environment, one per process
+@functools.lru_cache(maxsize=None)
+def get_score_cache():
+    ttl = os.environ.get(ENV_TTL)
+    return ScoreCache(int(os.environ.get(ENV_SIZE, DEFAULT_SIZE)),
+                      DEFAULT_TTL if ttl is None else float(ttl) or None)
+
+
+# Function to score a password through the process-wide cache. Returns
+# (score, criteria, estimate, strength code) as check_strength,
+# estimate_strength and get_strength_code give them, except that the
+# estimate's matches carry offsets instead of tokens; results are shared
+# between sessions, so treat them as read-only.
+def score_password(password, cache=None):
+    if cache is None:
+        cache = get_score_cache()
+    return cache.get(password)
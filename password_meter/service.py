@@ -0,0 +1,234 @@
+# Asyncio HTTP service for strength checks.
+#
+#     python -m password_meter serve --port 8080
+#
+#     POST /score        {"password": "..."}          -> {"score": ..., "label": ..., "criteria": {...}}
+#     POST /score/batch  {"passwords": ["...", ...]}  -> {"results": [...]}
+#     GET  /health                                    -> {"status": "ok", ...batching counters}
+#
+# Requests are not scored one by one: each is queued, and a single batcher task
+# drains the queue into micro-batches (up to max_batch passwords, or whatever
+# arrived within max_wait) that are scored with check_strength_batch off the
+# event loop. The queue is bounded; when it is full, requests are rejected with
+# 503 and a Retry-After header instead of piling up.
+import asyncio
+import json
+import time
+
+from password_meter.estimator import estimate_strength
+from password_meter.strength import CRITERIA, STRENGTH_CATEGORIES, check_strength_batch, get_strength_code
+
+MAX_BODY = 1 << 20
+MAX_BATCH_REQUEST = 1000
+
+
+class Overloaded(Exception):
+    pass
+
+
+class MicroBatcher:
+    def __init__(self, max_batch=512, max_wait=0.002, max_queue=1024):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = asyncio.Queue(max_queue)
+        self._task = None
+        self.batches = 0
+        self.scored = 0
+        self.rejected = 0
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def queued(self):
+        return self._queue.qsize()
+
+    # Scores a list of passwords as part of the next micro-batch
+    async def score(self, passwords):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((passwords, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise Overloaded from None
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            size = len(items[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                size += len(item[0])
+
+            passwords = [password for batch, _ in items for password in batch]
+            try:
+                results = await loop.run_in_executor(None, score_passwords, passwords)
+            except Exception as exc:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.scored += len(passwords)
+            start = 0
+            for batch, future in items:
+                if not future.done():
+                    future.set_result(results[start:start + len(batch)])
+                start += len(batch)
+
+
+# Function to score a batch; labels are capped by the guess estimate, as in
+# the app
+def score_passwords(passwords):
+    columns = check_strength_batch(passwords)
+    return [{
+        "score": score,
+        "label": STRENGTH_CATEGORIES[get_strength_code(score, estimate_strength(passwords[i]))],
+        "criteria": {name: columns[name][i] for name in CRITERIA},
+    } for i, score in enumerate(columns["score"])]
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+class ScoringService:
+    def __init__(self, batcher=None):
+        self.batcher = batcher or MicroBatcher()
+        self.started = time.time()
+
+    async def handle(self, method, path, body):
+        if path == "/health":
+            if method != "GET":
+                raise HTTPError(405, "use GET")
+            return {"status": "ok", "uptime_s": round(time.time() - self.started, 1),
+                    "queued": self.batcher.queued, "batches": self.batcher.batches,
+                    "scored": self.batcher.scored, "rejected": self.batcher.rejected}
+        if path not in ("/score", "/score/batch"):
+            raise HTTPError(404, "not found")
+        if method != "POST":
+            raise HTTPError(405, "use POST")
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "body must be JSON") from None
+
+        if path == "/score":
+            password = payload.get("password") if isinstance(payload, dict) else None
+            if not isinstance(password, str):
+                raise HTTPError(400, "'password' must be a string")
+            return (await self._score([password]))[0]
+
+        passwords = payload.get("passwords") if isinstance(payload, dict) else None
+        if not isinstance(passwords, list) or not all(isinstance(p, str) for p in passwords):
+            raise HTTPError(400, "'passwords' must be a list of strings")
+        if len(passwords) > MAX_BATCH_REQUEST:
+            raise HTTPError(413, f"at most {MAX_BATCH_REQUEST} passwords per request")
+        return {"results": await self._score(passwords) if passwords else []}
+
+    async def _score(self, passwords):
+        try:
+            return await self.batcher.score(passwords)
+        except Overloaded:
+            raise HTTPError(503, "overloaded, retry later", [("Retry-After", "1")]) from None
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                try:
+                    status, extra, result = 200, [], await self.handle(method, path, body)
+                except HTTPError as exc:
+                    status, extra, result = exc.status, list(exc.headers), {"error": str(exc)}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                _write_response(writer, status, result, extra, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HTTPError as exc:
+            _write_response(writer, exc.status, {"error": str(exc)}, [], False)
+        finally:
+            writer.close()
+
+
+async def _read_request(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "malformed request line") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = headers.get("content-length") or "0"
+    # int() alone would also take "-1", "+5", "1_000" and non-ASCII digits
+    if not (length.isascii() and length.isdigit()):
+        raise HTTPError(400, "Content-Length must be a non-negative integer")
+    length = int(length)
+    if length > MAX_BODY:
+        raise HTTPError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], headers, body
+
+
+def _write_response(writer, status, result, extra_headers, keep_alive):
+    body = json.dumps(result).encode()
+    head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    head += [f"{name}: {value}" for name, value in extra_headers]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+
+
+async def start_service(host="127.0.0.1", port=8080, **batcher_options):
+    service = ScoringService(MicroBatcher(**batcher_options))
+    service.batcher.start()
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    return service, server
+
+
+async def serve(host="127.0.0.1", port=8080, **batcher_options):
+    service, server = await start_service(host, port, **batcher_options)
+    print(f"Serving password strength checks on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.batcher.stop()
@@ -0,0 +1,144 @@
+# Near-duplicate password detection.
+#
+# Every saved password gets a MinHash signature over the character trigrams of
+# its lowercased form, split into LSH bands. One blake2b digest per trigram
+# supplies all the 16-bit hash values of the signature at once. Passwords
+# sharing any band bucket (or the same normalized form, with digit runs
+# collapsed, when that form keeps at least MIN_NORMALIZED non-digit
+# characters) become candidates, and only those candidates are compared by
+# edit distance against the threshold. A lookup therefore touches a handful of
+# buckets instead of every entry in the history, and "Summer2024!" is caught
+# as a reuse of "Summer2025!".
+import hashlib
+import struct
+
+NGRAM = 3
+BANDS = 8
+ROWS = 2
+THRESHOLD = 0.75
+# Digit-only or nearly digit-only passwords would all share one normalized
+# bucket ("#", "a#", ...), so they are only indexed by their MinHash bands
+MIN_NORMALIZED = 4
+
+_HASHES = struct.Struct(f"<{BANDS * ROWS}H")
+
+
+# Lowercased, with every run of digits collapsed to a single "#"
+def normalize(password):
+    out = []
+    for char in password.lower():
+        if char.isdigit():
+            if not out or out[-1] != "#":
+                out.append("#")
+        else:
+            out.append(char)
+    return "".join(out)
+
+
+def _ngrams(text):
+    padded = f"^{text}$"
+    if len(padded) <= NGRAM:
+        return {padded}
+    return {padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1)}
+
+
+def _gram_hashes(gram):
+    return _HASHES.unpack(hashlib.blake2b(gram.encode("utf-8", "surrogatepass"),
+                                          digest_size=_HASHES.size).digest())
+
+
+def minhash(password):
+    return list(map(min, zip(*map(_gram_hashes, _ngrams(password.lower())))))
+
+
+# Bucket keys of a password: one int per LSH band, plus its normalized form
+# if it has enough non-digit characters
+def _keys(password):
+    signature = minhash(password)
+    keys = [band << 32 | signature[band * ROWS] << 16 | signature[band * ROWS + 1] for band in range(BANDS)]
+    if sum(not char.isdigit() for char in password) >= MIN_NORMALIZED:
+        keys.append(normalize(password))
+    return keys
+
+
+def edit_distance(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+# 1.0 for equal (case-insensitive) passwords, 0.0 for nothing in common
+def similarity(a, b):
+    a, b = a.lower(), b.lower()
+    if not a and not b:
+        return 1.0
+    return 1 - edit_distance(a, b) / max(len(a), len(b))
+
+
+# Buckets hold a single entry id, or a set of ids once a second entry lands in
+# them, since nearly all buckets of unrelated passwords stay singletons
+class SimilarityIndex:
+    def __init__(self, threshold=THRESHOLD):
+        self.threshold = threshold
+        self._buckets = {}
+        self._passwords = {}
+
+    def __len__(self):
+        return len(self._passwords)
+
+    def add(self, entry_id, password):
+        buckets = self._buckets
+        for key in _keys(password):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = entry_id
+            elif isinstance(bucket, set):
+                bucket.add(entry_id)
+            elif bucket != entry_id:
+                buckets[key] = {bucket, entry_id}
+        self._passwords[entry_id] = password
+
+    def remove(self, entry_id):
+        password = self._passwords.pop(entry_id, None)
+        if password is None:
+            return
+        buckets = self._buckets
+        for key in _keys(password):
+            bucket = buckets.get(key)
+            if bucket == entry_id:
+                del buckets[key]
+            elif isinstance(bucket, set):
+                bucket.discard(entry_id)
+                if len(bucket) == 1:
+                    buckets[key] = bucket.pop()
+
+    def clear(self):
+        self._buckets.clear()
+        self._passwords.clear()
+
+    # (entry id, similarity) of saved passwords that are similar but not
+    # identical to this one, most similar first
+    def query(self, password, limit=None):
+        candidates = set()
+        for key in _keys(password):
+            bucket = self._buckets.get(key)
+            if isinstance(bucket, set):
+                candidates |= bucket
+            elif bucket is not None:
+                candidates.add(bucket)
+        matches = []
+        for entry_id in candidates:
+            saved = self._passwords[entry_id]
+            if saved == password:
+                continue
+            score = similarity(password, saved)
+            if score >= self.threshold:
+                matches.append((entry_id, score))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:limit] if limit else matches
@@ -0,0 +1,327 @@
+# Persistent history backend stored in SQLite (WAL mode).
+#
+# It exposes the same interface as PasswordHistory, but filtering, paging,
+# reuse counts and the Statistics aggregates are answered by indexed SQL
+# queries instead of in-memory structures, and the history survives restarts.
+# Reuse counts use a digest keyed with a random key stored in the database,
+# never a plain hash of the password. The Statistics aggregates and trend
+# buckets live in their own tables, kept up to date by triggers on insert and
+# delete, so reading them costs O(number of buckets); the snapshots built from
+# them are reused until the database changes.
+# The near-duplicate LSH index is the exception: it lives in memory, is built
+# from the table on the first similar() call and then kept up to date by
+# append, extend, delete and clear.
+#
+# Rows are inserted right away with an empty hash and their KDF digest is
+# written back when the hasher has computed it; rows left without one (the
+# process stopped first, or the row still has the 10-hex fingerprint of older
+# versions) are queued again when the database is opened.
+import os
+import sqlite3
+import threading
+from collections import Counter
+
+from password_meter.history import DIGEST_KEY_BYTES, HistoryEntry, HistoryStats, password_digest
+from password_meter.kdf import PendingDigests, get_default_hasher, is_kdf_digest
+from password_meter.similarity import SimilarityIndex
+from password_meter.strength import STRENGTH_CATEGORIES, strength_code
+from password_meter.trends import TrendIndex
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account TEXT NOT NULL,
+    password TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    digest BLOB NOT NULL,
+    code INTEGER NOT NULL,
+    score REAL NOT NULL,
+    length INTEGER NOT NULL,
+    created INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_account ON history (account, code, id);
+CREATE INDEX IF NOT EXISTS history_code ON history (code, id);
+CREATE INDEX IF NOT EXISTS history_created ON history (created);
+CREATE INDEX IF NOT EXISTS history_score ON history (score);
+CREATE INDEX IF NOT EXISTS history_digest ON history (digest);
+CREATE INDEX IF NOT EXISTS history_length ON history (length);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value BLOB NOT NULL);
+
+CREATE TABLE IF NOT EXISTS history_codes (
+    code INTEGER PRIMARY KEY,
+    n INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    length_sum INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history_lengths (length INTEGER PRIMARY KEY, n INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS history_days (
+    account TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    weak INTEGER NOT NULL,
+    moderate INTEGER NOT NULL,
+    strong INTEGER NOT NULL,
+    PRIMARY KEY (account, day)
+);
+CREATE TRIGGER IF NOT EXISTS history_insert AFTER INSERT ON history BEGIN
+    INSERT INTO history_codes VALUES (NEW.code, 1, NEW.score, NEW.length)
+        ON CONFLICT (code) DO UPDATE SET n = n + 1, score_sum = score_sum + excluded.score_sum,
+                                         length_sum = length_sum + excluded.length_sum;
+    INSERT INTO history_lengths VALUES (NEW.length, 1) ON CONFLICT (length) DO UPDATE SET n = n + 1;
+    INSERT INTO history_days VALUES (NEW.account, {day}, NEW.score, NEW.code = 0, NEW.code = 1, NEW.code = 2)
+        ON CONFLICT (account, day) DO UPDATE SET score_sum = score_sum + excluded.score_sum,
+            weak = weak + excluded.weak, moderate = moderate + excluded.moderate, strong = strong + excluded.strong;
+END;
+CREATE TRIGGER IF NOT EXISTS history_delete AFTER DELETE ON history BEGIN
+    UPDATE history_codes SET n = n - 1, score_sum = score_sum - OLD.score, length_sum = length_sum - OLD.length
+        WHERE code = OLD.code;
+    DELETE FROM history_codes WHERE code = OLD.code AND n = 0;
+    UPDATE history_lengths SET n = n - 1 WHERE length = OLD.length;
+    DELETE FROM history_lengths WHERE length = OLD.length AND n = 0;
+    UPDATE history_days SET score_sum = score_sum - OLD.score, weak = weak - (OLD.code = 0),
+                            moderate = moderate - (OLD.code = 1), strong = strong - (OLD.code = 2)
+        WHERE account = OLD.account AND day = {old_day};
+    DELETE FROM history_days WHERE account = OLD.account AND day = {old_day} AND weak + moderate + strong = 0;
+END;
+"""
+# Local calendar day of a row as a date ordinal, like trends.day_of
+_DAY = "CAST(julianday({}.created, 'unixepoch', 'localtime', 'start of day') - 1721424.5 AS INTEGER)"
+SCHEMA = SCHEMA.format(day=_DAY.format("NEW"), old_day=_DAY.format("OLD"))
+
+_COLUMNS = "id, account, password, hash, code, score, created"
+_INSERT = ("INSERT INTO history (account, password, hash, digest, code, score, length, created) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+BATCH_SIZE = 1000
+
+
+def _entry(row):
+    entry_id, account, password, hash_, code, score, created = row
+    return HistoryEntry(account, password, code, score, created, hash_ or None, entry_id)
+
+
+# Row parameters; the hash column is empty until the digest is written back
+def _params(entry, digest_key):
+    password = entry.password
+    return (entry.account, password, entry.hash or "", password_digest(password, digest_key), entry.code,
+            entry.score, len(password), entry.created)
+
+
+def _where(account, strength):
+    clauses, params = [], []
+    if account is not None:
+        clauses.append("account = ?")
+        params.append(account)
+    if strength is not None:
+        clauses.append("code = ?")
+        params.append(strength_code(strength))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+class SQLiteHistory:
+    def __init__(self, path, hasher=None):
+        self.path = path
+        self._hasher = hasher
+        self._pending = PendingDigests()
+        # Streamlit may run reruns of one session on different threads
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._similar = None
+        # Statistics and trend snapshots with the database version they were
+        # read at
+        self._changes = 0
+        self._snapshots = {}
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            with self._conn:
+                self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('digest_key', ?)",
+                                   (os.urandom(DIGEST_KEY_BYTES),))
+            self._digest_key = self._conn.execute("SELECT value FROM meta WHERE name = 'digest_key'").fetchone()[0]
+            unhashed = self._conn.execute(
+                "SELECT id, password FROM history WHERE hash = '' OR hash NOT LIKE '$%'").fetchall()
+        for entry_id, password in unhashed:
+            self._hash_later(entry_id, password)
+
+    @property
+    def hasher(self):
+        if self._hasher is None:
+            self._hasher = get_default_hasher()
+        return self._hasher
+
+    # Queues the digest of a row and writes it back (and onto entry, when
+    # given) once computed. Must be called without holding the lock: with an
+    # inline hasher the write-back runs right away.
+    def _hash_later(self, entry_id, password, entry=None):
+        def store(digest):
+            if entry is not None:
+                entry.hash = digest
+            with self._lock, self._conn:
+                self._conn.execute("UPDATE history SET hash = ? WHERE id = ?", (digest, entry_id))
+
+        self._pending.add(self.hasher, password, store)
+
+    # Number of inserted rows still waiting for their digest
+    @property
+    def pending_hashes(self):
+        return len(self._pending)
+
+    # Waits until every inserted row has its digest
+    def wait_hashes(self, timeout=None):
+        self._pending.wait(timeout)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _scalar(self, sql, params=()):
+        return self._query(sql, params)[0][0]
+
+    def __len__(self):
+        return self._scalar("SELECT COUNT(*) FROM history")
+
+    # Streams entries in insertion order without loading the table
+    def __iter__(self):
+        last_id = 0
+        while True:
+            rows = self._query(f"SELECT {_COLUMNS} FROM history WHERE id > ? ORDER BY id LIMIT ?",
+                               (last_id, BATCH_SIZE))
+            if not rows:
+                return
+            for row in rows:
+                yield _entry(row)
+            last_id = rows[-1][0]
+
+    def __contains__(self, entry_id):
+        return bool(self._query("SELECT 1 FROM history WHERE id = ?", (entry_id,)))
+
+    def get(self, entry_id):
+        rows = self._query(f"SELECT {_COLUMNS} FROM history WHERE id = ?", (entry_id,))
+        return _entry(rows[0]) if rows else None
+
+    def append(self, entry):
+        params = _params(entry, self._digest_key)
+        with self._lock, self._conn:
+            entry_id = self._conn.execute(_INSERT, params).lastrowid
+            self._changes += 1
+            if self._similar is not None:
+                self._similar.add(entry_id, params[1])
+        entry.id = entry_id
+        if not is_kdf_digest(params[2]):
+            self._hash_later(entry_id, params[1], entry)
+        return entry_id
+
+    # Inserts many entries, BATCH_SIZE rows per transaction
+    def extend(self, entries):
+        batch = []
+        for entry in entries:
+            batch.append(_params(entry, self._digest_key))
+            if len(batch) == BATCH_SIZE:
+                self._insert_many(batch)
+                batch = []
+        if batch:
+            self._insert_many(batch)
+
+    def _insert_many(self, batch):
+        with self._lock, self._conn:
+            self._changes += 1
+            if self._similar is None:
+                # AUTOINCREMENT ids of one transaction are consecutive
+                self._conn.executemany(_INSERT, batch)
+                last_id = self._conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                ids = range(last_id - len(batch) + 1, last_id + 1)
+            else:
+                ids = [self._conn.execute(_INSERT, params).lastrowid for params in batch]
+                for entry_id, params in zip(ids, batch):
+                    self._similar.add(entry_id, params[1])
+        for entry_id, params in zip(ids, batch):
+            if not is_kdf_digest(params[2]):
+                self._hash_later(entry_id, params[1])
+
+    def delete(self, entry_id):
+        entry = self.get(entry_id)
+        if entry is None:
+            raise KeyError(entry_id)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM history WHERE id = ?", (entry_id,))
+            self._changes += 1
+            if self._similar is not None:
+                self._similar.remove(entry_id)
+        return entry
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM history")
+            self._pending.clear()
+            self._changes += 1
+            if self._similar is not None:
+                self._similar.clear()
+
+    def count(self, password):
+        return self._scalar("SELECT COUNT(*) FROM history WHERE digest = ?", (password_digest(password, self._digest_key),))
+
+    def similar(self, password, limit=5):
+        with self._lock:
+            if self._similar is None:
+                self._similar = SimilarityIndex()
+                for entry_id, saved in self._conn.execute("SELECT id, password FROM history"):
+                    self._similar.add(entry_id, saved)
+            matches = self._similar.query(password, limit)
+        return [(self.get(entry_id), score) for entry_id, score in matches]
+
+    def accounts(self):
+        return [row[0] for row in self._query("SELECT DISTINCT account FROM history ORDER BY account")]
+
+    def filtered_count(self, account=None, strength=None):
+        where, params = _where(account, strength)
+        return self._scalar(f"SELECT COUNT(*) FROM history{where}", params)
+
+    def page(self, page=0, page_size=10, account=None, strength=None):
+        where, params = _where(account, strength)
+        rows = self._query(f"SELECT {_COLUMNS} FROM history{where} ORDER BY id DESC LIMIT ? OFFSET ?",
+                           params + [page_size, page * page_size])
+        return [_entry(row) for row in rows]
+
+    def recent(self, n=5):
+        return self.page(0, n)
+
+    # Value of build(), reused until this or another connection changes the
+    # database; treat it as read-only
+    def _snapshot(self, name, build):
+        with self._lock:
+            version = (self._conn.execute("PRAGMA data_version").fetchone()[0], self._changes)
+        cached = self._snapshots.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        value = build()
+        self._snapshots[name] = (version, value)
+        return value
+
+    # Snapshot of the Statistics aggregates, read from the aggregate tables
+    @property
+    def stats(self):
+        return self._snapshot("stats", self._read_stats)
+
+    def _read_stats(self):
+        stats = HistoryStats()
+        for code, n, score_sum, length_sum in self._query("SELECT code, n, score_sum, length_sum FROM history_codes"):
+            stats.count += n
+            stats.score_sum += score_sum
+            stats.length_sum += length_sum
+            stats.strength_counts[STRENGTH_CATEGORIES[code]] = n
+        stats.length_counts = Counter(dict(self._query("SELECT length, n FROM history_lengths")))
+        return stats
+
+    # Snapshot of the trend buckets, read from the per-account, per-day table
+    @property
+    def trends(self):
+        return self._snapshot("trends", self._read_trends)
+
+    def _read_trends(self):
+        trends = TrendIndex()
+        trends.add_rows(self._query("SELECT account, day, score_sum, weak, moderate, strong FROM history_days"))
+        return trends
+
+    def close(self):
+        self.wait_hashes()
+        self._conn.close()
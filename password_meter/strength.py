@@ -0,0 +1,186 @@
+from password_meter.common_index import get_default_index
+
+SPECIAL_CHARS = "!@#$%^&*()-_=+[]{}|;:,.<>?/"
+COMMON_PASSWORDS = frozenset(["password", "123456", "qwerty", "admin"])
+
+CRITERIA = ("length", "uppercase", "lowercase", "digits", "special")
+
+# Bit flags for the character classes a password can contain
+UPPER = 1
+LOWER = 2
+DIGIT = 4
+SPECIAL = 8
+
+
+class _ClassTable(dict):
+    # Lazily caches the class bits of every character seen so far, so each
+    # distinct character is classified once per process instead of once per
+    # password and per criterion
+    def __missing__(self, char):
+        mask = 0
+        if char.isupper():
+            mask |= UPPER
+        if char.islower():
+            mask |= LOWER
+        if char.isdigit():
+            mask |= DIGIT
+        if char in SPECIAL_CHARS:
+            mask |= SPECIAL
+        self[char] = mask
+        return mask
+
+
+_CLASS_TABLE = _ClassTable()
+
+
+# Function to check against the built-in list and, when configured, the
+# on-disk common/breached password index
+def is_common_password(password):
+    lowered = password.lower()
+    if lowered in COMMON_PASSWORDS:
+        return True
+    index = get_default_index()
+    return index is not None and lowered in index
+
+
+# Single pass over the distinct characters of a password
+def _class_mask(password):
+    mask = 0
+    table = _CLASS_TABLE
+    for char in set(password):
+        mask |= table[char]
+    return mask
+
+
+def _score(length, mask, common):
+    score = (length >= 8) + bool(mask & UPPER) + bool(mask & LOWER) + bool(mask & DIGIT) + bool(mask & SPECIAL)
+
+    # Additional checks for better strength assessment
+    if length >= 12:
+        score += 0.5
+    if length >= 16:
+        score += 0.5
+
+    # Check for common patterns
+    if common:
+        score = min(score, 1)
+
+    return score
+
+
+# Function to check password strength
+def check_strength(password):
+    mask = _class_mask(password)
+    criteria = {
+        "length": len(password) >= 8,
+        "uppercase": bool(mask & UPPER),
+        "lowercase": bool(mask & LOWER),
+        "digits": bool(mask & DIGIT),
+        "special": bool(mask & SPECIAL)
+    }
+    score = _score(len(password), mask, is_common_password(password))
+    return score, criteria
+
+
+# Function to check the strength of many passwords at once.
+# Accepts a list (or any iterable), a pandas Series or a NumPy string array and
+# returns the same scores and criteria as check_strength, column by column:
+# a DataFrame for a Series input, otherwise a dict of lists.
+def check_strength_batch(passwords):
+    # Only a pandas Series has to_frame; its index is kept on the result
+    index = passwords.index if hasattr(passwords, "to_frame") else None
+    if hasattr(passwords, "tolist"):
+        passwords = passwords.tolist()
+    else:
+        passwords = list(passwords)
+
+    lengths = list(map(len, passwords))
+    masks = list(map(_class_mask, passwords))
+    common = list(map(is_common_password, passwords))
+
+    columns = {
+        "score": list(map(_score, lengths, masks, common)),
+        "length": [n >= 8 for n in lengths],
+        "uppercase": [bool(m & UPPER) for m in masks],
+        "lowercase": [bool(m & LOWER) for m in masks],
+        "digits": [bool(m & DIGIT) for m in masks],
+        "special": [bool(m & SPECIAL) for m in masks],
+    }
+
+    if index is not None:
+        import pandas as pd
+        return pd.DataFrame(columns, index=index)
+    return columns
+
+
+# Function to suggest improvements for the criteria a password misses
+def get_suggestions(criteria):
+    suggestions = []
+    if not criteria["length"]:
+        suggestions.append("Make your password at least 8 characters long")
+    if not criteria["uppercase"]:
+        suggestions.append("Add uppercase letters (A-Z)")
+    if not criteria["lowercase"]:
+        suggestions.append("Add lowercase letters (a-z)")
+    if not criteria["digits"]:
+        suggestions.append("Add numbers (0-9)")
+    if not criteria["special"]:
+        suggestions.append("Add special characters (!@#$%^&*)")
+    return suggestions
+
+
+# Strength levels of the history, indexed by the small integer code stored on
+# each entry
+STRENGTH_CATEGORIES = ("Weak", "Moderate", "Strong")
+STRENGTH_LABELS = ("🔴 Weak", "🟡 Moderate", "🟢 Strong")
+STRENGTH_CLASSES = ("password-weak", "password-moderate", "password-strong")
+WEAK, MODERATE, STRONG = range(3)
+_LABEL_CODES = {label: code for code, label in enumerate(STRENGTH_LABELS)}
+_CATEGORY_CODES = {category: code for code, category in enumerate(STRENGTH_CATEGORIES)}
+
+
+# Function to get the strength code (WEAK, MODERATE or STRONG) for a score.
+# When a guess estimate from estimate_strength is given, easily guessed
+# passwords are capped regardless of their criteria: estimate score 0-1 is
+# always Weak and 2 is at most Moderate.
+def get_strength_code(score, estimate=None):
+    if estimate is not None:
+        if estimate["score"] <= 1:
+            score = min(score, 0)
+        elif estimate["score"] == 2:
+            score = min(score, 3)
+    if score >= 5:
+        return STRONG
+    elif score >= 3:
+        return MODERATE
+    else:
+        return WEAK
+
+
+# Function to get label and CSS class
+def get_strength_label(score, estimate=None):
+    code = get_strength_code(score, estimate)
+    return STRENGTH_LABELS[code], STRENGTH_CLASSES[code]
+
+
+# Function to map a stored strength label back to its category
+def get_strength_category(label):
+    if label.startswith("🟢"):
+        return "Strong"
+    elif label.startswith("🟡"):
+        return "Moderate"
+    elif label.startswith("🔴"):
+        return "Weak"
+    return None
+
+
+# Function to map a strength label or category name to its code
+def strength_code(label):
+    code = _LABEL_CODES.get(label)
+    if code is None:
+        code = _CATEGORY_CODES.get(label)
+    if code is None:
+        code = _CATEGORY_CODES.get(get_strength_category(label))
+    if code is None:
+        raise ValueError(f"Unknown strength: {label!r}")
+    return code
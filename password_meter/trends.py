@@ -0,0 +1,193 @@
+# Strength-over-time analytics for the Statistics tab.
+#
+# TrendIndex keeps per-day and per-week buckets (count, score sum and the
+# number of entries of each strength code), overall and per account, and is
+# updated on every add and discard, along with the number of entries of each
+# account. Series, rolling averages and per-account trends are then computed
+# from the buckets, so their cost depends on the time span of the history, not
+# on its size, and account_trends only looks at the busiest accounts it is
+# asked for. downsample() reduces a series to a fixed number of chart points
+# with largest-triangle-three-buckets, which keeps the peaks and dips a plain
+# stride would drop.
+import bisect
+import datetime
+import heapq
+from collections import Counter
+
+PERIODS = ("day", "week")
+PERIOD_DAYS = {"day": 1, "week": 7}
+MAX_POINTS = 200
+
+# Bucket fields
+COUNT, SCORE_SUM, WEAK, MODERATE, STRONG = range(5)
+_CODE_COUNTS = ((1, 0, 0), (0, 1, 0), (0, 0, 1))
+
+
+# Function to get the local calendar day of an epoch timestamp as an ordinal
+def day_of(epoch):
+    return datetime.date.fromtimestamp(epoch).toordinal()
+
+
+# Ordinal of the Monday starting the week of a day ordinal
+def week_of(day):
+    return day - (day - 1) % 7
+
+
+class TrendIndex:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._buckets = {(period, None): {} for period in PERIODS}
+        # Entries per account, and the accounts grouped by that count with
+        # the distinct counts kept sorted, so the busiest accounts are found
+        # without looking at the others
+        self._account_counts = Counter()
+        self._by_count = {}
+        self._counts = []
+
+    def add(self, entry):
+        self._update(entry.account, day_of(entry.created), entry.score, _CODE_COUNTS[entry.code], 1)
+
+    def discard(self, entry):
+        self._update(entry.account, day_of(entry.created), entry.score, _CODE_COUNTS[entry.code], -1)
+
+    # Adds entries with this score sum and (weak, moderate, strong) counts to
+    # the buckets of an account and day, or removes them when sign is -1
+    def _update(self, account, day, score_sum, counts, sign):
+        week = week_of(day)
+        count = sum(counts)
+        self._count_account(account, sign * count)
+        for key, bucket_key in ((("day", None), day), (("day", account), day),
+                                (("week", None), week), (("week", account), week)):
+            buckets = self._buckets.setdefault(key, {})
+            bucket = buckets.get(bucket_key)
+            if bucket is None:
+                bucket = buckets[bucket_key] = [0, 0, 0, 0, 0]
+            bucket[COUNT] += sign * count
+            bucket[SCORE_SUM] += sign * score_sum
+            bucket[WEAK] += sign * counts[0]
+            bucket[MODERATE] += sign * counts[1]
+            bucket[STRONG] += sign * counts[2]
+            if not bucket[COUNT]:
+                del buckets[bucket_key]
+                if not buckets and key[1] is not None:
+                    del self._buckets[key]
+
+    def _count_account(self, account, delta):
+        old = self._account_counts.get(account, 0)
+        new = old + delta
+        if old:
+            group = self._by_count[old]
+            group.discard(account)
+            if not group:
+                del self._by_count[old]
+                del self._counts[bisect.bisect_left(self._counts, old)]
+        if new:
+            self._account_counts[account] = new
+            group = self._by_count.get(new)
+            if group is None:
+                group = self._by_count[new] = set()
+                bisect.insort(self._counts, new)
+            group.add(account)
+        else:
+            self._account_counts.pop(account, None)
+
+    # Loads pre-aggregated rows (account, day ordinal, score sum, weak,
+    # moderate, strong), as computed by a database
+    def add_rows(self, rows):
+        for account, day, score_sum, *counts in rows:
+            self._update(account, day, score_sum, counts, 1)
+
+    def accounts(self):
+        return sorted(self._account_counts)
+
+    def has_account(self, account):
+        return account in self._account_counts
+
+    # The n accounts with the most entries, most entries first, ties by name
+    def top_accounts(self, n):
+        accounts = []
+        for count in reversed(self._counts):
+            if len(accounts) >= n:
+                break
+            accounts += heapq.nsmallest(n - len(accounts), self._by_count[count])
+        return accounts
+
+    # (date, count, average score, weak, moderate, strong) per bucket, oldest
+    # first
+    def series(self, period="day", account=None):
+        buckets = self._buckets.get((period, account), {})
+        return [(datetime.date.fromordinal(key), bucket[COUNT], bucket[SCORE_SUM] / bucket[COUNT],
+                 bucket[WEAK], bucket[MODERATE], bucket[STRONG])
+                for key, bucket in sorted(buckets.items())]
+
+    # (date, average score of the entries in the window periods up to and
+    # including that bucket), for every non-empty bucket
+    def rolling(self, period="day", window=7, account=None):
+        buckets = sorted(self._buckets.get((period, account), {}).items())
+        span = window * PERIOD_DAYS[period]
+        points = []
+        count = score_sum = 0
+        start = 0
+        for key, bucket in buckets:
+            count += bucket[COUNT]
+            score_sum += bucket[SCORE_SUM]
+            while buckets[start][0] <= key - span:
+                old = buckets[start][1]
+                count -= old[COUNT]
+                score_sum -= old[SCORE_SUM]
+                start += 1
+            points.append((datetime.date.fromordinal(key), score_sum / count))
+        return points
+
+    # Per account: (account, entries, average score, average of the latest
+    # window buckets, change against the window before it), most entries
+    # first; only the limit busiest accounts when a limit is given
+    def account_trends(self, period="week", window=4, limit=None):
+        trends = []
+        accounts = self.accounts() if limit is None else self.top_accounts(limit)
+        for account in accounts:
+            buckets = [bucket for _, bucket in sorted(self._buckets[(period, account)].items())]
+            count = sum(bucket[COUNT] for bucket in buckets)
+            average = sum(bucket[SCORE_SUM] for bucket in buckets) / count
+            recent = _average(buckets[-window:])
+            previous = _average(buckets[-2 * window:-window])
+            trends.append((account, count, average, recent, None if previous is None else recent - previous))
+        trends.sort(key=lambda trend: (-trend[1], trend[0]))
+        return trends
+
+
+def _average(buckets):
+    count = sum(bucket[COUNT] for bucket in buckets)
+    return sum(bucket[SCORE_SUM] for bucket in buckets) / count if count else None
+
+
+# Function to reduce (x, y) points to at most max_points with the
+# largest-triangle-three-buckets algorithm; x values may be dates
+def downsample(points, max_points=MAX_POINTS):
+    if len(points) <= max_points or max_points < 3:
+        return list(points)
+    xs = [x.toordinal() if hasattr(x, "toordinal") else x for x, _ in points]
+    ys = [y for _, y in points]
+    size = (len(points) - 2) / (max_points - 2)
+    sampled = [points[0]]
+    a = 0
+    for i in range(max_points - 2):
+        start = int(i * size) + 1
+        end = int((i + 1) * size) + 1
+        next_end = min(int((i + 2) * size) + 1, len(points))
+        # Average of the next bucket is the third corner of the triangle
+        next_start = end if end < len(points) - 1 else len(points) - 1
+        span = max(next_end - next_start, 1)
+        avg_x = sum(xs[next_start:next_start + span]) / span
+        avg_y = sum(ys[next_start:next_start + span]) / span
+        best, best_area = start, -1
+        for j in range(start, end):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
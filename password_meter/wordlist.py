@@ -0,0 +1,168 @@
+# On-disk wordlist for passphrase generation.
+#
+# The file holds the UTF-8 words back to back followed by a table of their
+# start offsets. It is opened with mmap, so picking a word reads one offset
+# pair and the word's bytes no matter how long the list is, nothing is loaded
+# or split per request, and every session in the process shares the same
+# read-only pages. The header also records how many words start with a cased
+# letter, which random capitalization needs and which would otherwise take a
+# scan of the whole list. Words are stored lowercased and deduplicated, so
+# each one is equally likely and a passphrase of n words from a list of N
+# words has exactly n * log2(N) bits of entropy.
+#
+# Build a wordlist from one or more newline-delimited lists (plain words or
+# diceware "11111<TAB>word" lines) with:
+#
+#     python -m password_meter.wordlist build words.idx eff_large_wordlist.txt
+import functools
+import math
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+
+MAGIC = b"PWWORDS2"
+# magic, count, offset of the offset table, number of capitalizable words
+HEADER = struct.Struct("<8sQQQ")
+ENV_VAR = "PASSWORD_METER_WORDLIST"
+
+_random = random.SystemRandom()
+
+
+class Wordlist:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, table, self.capitalizable = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a wordlist file; build it with python -m password_meter.wordlist build")
+        if not self.count:
+            raise ValueError(f"{path} holds no words")
+        view = memoryview(self._mmap)
+        self._data = view[HEADER.size:table]
+        self._offsets = view[table:table + 4 * (self.count + 1)].cast("I")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not -self.count <= i < self.count:
+            raise IndexError("wordlist index out of range")
+        i %= self.count
+        return str(self._data[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+    # Bits of entropy of one word drawn uniformly from the list
+    @property
+    def bits_per_word(self):
+        return math.log2(self.count)
+
+    # Function to draw n words uniformly and independently (with replacement,
+    # like rolling dice) from a CSPRNG
+    def sample(self, n, rng=_random):
+        return [self[rng.randrange(self.count)] for _ in range(n)]
+
+
+# Wordlist configured through the environment, opened once per process
+@functools.lru_cache(maxsize=None)
+def get_default_wordlist():
+    path = os.environ.get(ENV_VAR)
+    if not path:
+        return None
+    return Wordlist(path)
+
+
+# Function to open the wordlist file at path, sharing one Wordlist per file
+# across calls; a file rebuilt since is opened again
+def open_wordlist(path):
+    stat = os.stat(path)
+    return _open_wordlist(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=8)
+def _open_wordlist(path, mtime_ns, size):
+    return Wordlist(path)
+
+
+# Words of a newline-delimited list; a leading dice-roll column is dropped
+def _read_words(path):
+    with open(path, "rb") as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) > 1 and fields[0].isdigit():
+                fields = fields[1:]
+            if len(fields) == 1:
+                yield fields[0].decode("utf-8", "replace").lower()
+
+
+# Function to build a wordlist file from newline-delimited lists. Words are
+# written as they are read; only the offsets and the set of words seen so far
+# are kept in memory. Words that capitalize() changes are counted on the way.
+def build_wordlist(wordlists, out_path):
+    seen = set()
+    offsets = array("I", [0])
+    capitalizable = 0
+    tmp = f"{out_path}.tmp"
+    with open(tmp, "wb") as out:
+        out.write(bytes(HEADER.size))
+        for path in wordlists:
+            for word in _read_words(path):
+                if word in seen:
+                    continue
+                seen.add(word)
+                capitalizable += word.capitalize() != word
+                data = word.encode("utf-8")
+                if offsets[-1] + len(data) >= 1 << 32:
+                    raise ValueError("wordlist is larger than 4 GiB")
+                out.write(data)
+                offsets.append(offsets[-1] + len(data))
+
+        # The offset table starts on an 8-byte boundary
+        table = HEADER.size + offsets[-1]
+        padding = -table % 8
+        out.write(bytes(padding))
+        table += padding
+        offsets.tofile(out)
+        out.seek(0)
+        out.write(HEADER.pack(MAGIC, len(offsets) - 1, table, capitalizable))
+    os.replace(tmp, out_path)
+    return len(offsets) - 1
+
+
+def main(argv=None):
+    import argparse
+
+    from password_meter.generator import CAPITALIZATIONS, generate_passphrase, passphrase_entropy
+
+    parser = argparse.ArgumentParser(prog="python -m password_meter.wordlist",
+                                     description="Build a passphrase wordlist or generate passphrases from one.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="build a wordlist from newline-delimited lists")
+    build.add_argument("output")
+    build.add_argument("wordlists", nargs="+")
+
+    generate = commands.add_parser("generate", help="generate passphrases from a wordlist")
+    generate.add_argument("wordlist")
+    generate.add_argument("--words", type=int, default=6)
+    generate.add_argument("--separator", default="-")
+    generate.add_argument("--capitalize", choices=CAPITALIZATIONS, default="lower")
+    generate.add_argument("--count", type=int, default=1)
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        count = build_wordlist(args.wordlists, args.output)
+        print(f"Stored {count} unique words in {args.output}")
+    else:
+        wordlist = Wordlist(args.wordlist)
+        for _ in range(args.count):
+            print(generate_passphrase(args.words, args.separator, args.capitalize, wordlist))
+        bits = passphrase_entropy(args.words, wordlist, args.capitalize)
+        print(f"{bits:.1f} bits of entropy each ({args.words} words from {len(wordlist)})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
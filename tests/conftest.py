@@ -0,0 +1,6 @@
+# Makes the package importable when pytest is run from the repository root,
+# the same way the benchmarks put it on sys.path
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
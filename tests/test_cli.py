@@ -0,0 +1,43 @@
+import io
+import json
+
+from password_meter.cli import _parse, iter_chunks, score_chunk, unescape_delimiter
+from password_meter.estimator import estimate_strength
+from password_meter.strength import STRENGTH_CATEGORIES, check_strength, get_strength_code
+
+
+def test_parse_splits_on_newline_only():
+    chunk = "a\x0bb\r\nc d\x1ce\n\nf\rg\r\n".encode()
+    assert _parse(chunk, None) == (["", "", ""], ["a\x0bb", "c d\x1ce", "f\rg"])
+
+
+def test_parse_delimiter():
+    assert _parse(b"bob:pa:ss\r\nnopass\n", ":") == (["bob", ""], ["pa:ss", "nopass"])
+
+
+def test_iter_chunks_keeps_records_whole():
+    data = b"".join(b"user%d:password%d\r\n" % (i, i) for i in range(200))
+    records = []
+    for chunk in iter_chunks(io.BytesIO(data), chunk_bytes=7):
+        assert chunk.endswith(b"\n")
+        records += _parse(chunk, ":")[1]
+    assert records == ["password%d" % i for i in range(200)]
+
+
+def test_labels_use_the_estimate():
+    passwords = ["Password1!", "P@ssw0rd2024!", "correct horse battery staple", "Tr0ub4dor&3x!q"]
+    out, count = score_chunk("\n".join(passwords).encode(), None, "jsonl")
+    assert count == len(passwords)
+    rows = [json.loads(line) for line in out.decode().splitlines()]
+    for password, row in zip(passwords, rows):
+        score, _ = check_strength(password)
+        assert row["label"] == STRENGTH_CATEGORIES[get_strength_code(score, estimate_strength(password))]
+    assert rows[0]["label"] != STRENGTH_CATEGORIES[get_strength_code(check_strength(passwords[0])[0])]
+
+
+def test_delimiter_escapes():
+    assert unescape_delimiter("\\t") == "\t"
+    assert unescape_delimiter(":") == ":"
+    assert unescape_delimiter("§") == "§"
+    assert unescape_delimiter("→\\t") == "→\t"
+    assert _parse("bob§pw\n".encode(), unescape_delimiter("§")) == (["bob"], ["pw"])
@@ -0,0 +1,44 @@
+import random
+import string
+
+from password_meter.common_index import CommonPasswordIndex, build_index, main
+
+
+def _build(tmp_path, *lists):
+    paths = []
+    for i, words in enumerate(lists):
+        path = tmp_path / f"list{i}.txt"
+        path.write_text("".join(f"{word}\n" for word in words))
+        paths.append(str(path))
+    out = str(tmp_path / "common.idx")
+    return build_index(paths, out), CommonPasswordIndex(out)
+
+
+def test_lookups_are_case_insensitive_and_deduplicated(tmp_path):
+    count, index = _build(tmp_path, ["password", "123456", "Dragon"], ["PASSWORD", "letmein", ""])
+    assert count == len(index) == 4
+    for password in ("password", "Password", "123456", "dragon", "LetMeIn"):
+        assert password in index
+    for password in ("passw0rd", "1234567", "", "dragon "):
+        assert password not in index
+
+
+def test_matches_a_set_across_partitions(tmp_path):
+    rng = random.Random(0)
+    words = {"".join(rng.choices(string.ascii_lowercase, k=rng.randrange(4, 12))) for _ in range(5000)}
+    listed = sorted(words)[::2]
+    count, index = _build(tmp_path, listed[:1000], listed[1000:])
+    assert count == len(listed)
+    assert all((word in index) == (word in set(listed)) for word in words)
+
+
+def test_empty_wordlist(tmp_path):
+    count, index = _build(tmp_path, [])
+    assert count == len(index) == 0
+    assert "password" not in index
+
+
+def test_query_command(tmp_path, capsys):
+    _build(tmp_path, ["hunter2"])
+    assert main(["query", str(tmp_path / "common.idx"), "hunter2", "correct horse"]) == 0
+    assert capsys.readouterr().out == "hunter2\tcommon\ncorrect horse\tnot found\n"
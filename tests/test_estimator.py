@@ -0,0 +1,37 @@
+import random
+import string
+import time
+
+from password_meter.estimator import LATENCY_BUDGET_MS, MAX_GUESSES, describe_patterns, estimate_strength
+
+
+def test_long_random_password():
+    rng = random.Random(0)
+    password = "".join(rng.choices(string.ascii_letters + string.digits, k=400))
+    estimate = estimate_strength(password)
+    assert estimate["guesses"] == MAX_GUESSES
+    assert estimate["guesses_log10"] == 300
+    assert estimate["score"] == 4
+
+
+def test_very_long_password():
+    estimate = estimate_strength("a1!" * 2000)
+    assert estimate["guesses"] <= MAX_GUESSES
+    describe_patterns(estimate)
+
+
+def test_long_repeats_stay_weak():
+    for password in ("a" * 500, "abc" * 400, "password" * 80):
+        assert estimate_strength(password)["score"] <= 2
+
+
+def test_long_repeat_within_budget():
+    estimate_strength("1" * 100)
+    best = min(_elapsed_ms("1" * 100) for _ in range(5))
+    assert best < LATENCY_BUDGET_MS
+
+
+def _elapsed_ms(password):
+    start = time.perf_counter()
+    estimate_strength(password)
+    return (time.perf_counter() - start) * 1000
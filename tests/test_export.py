@@ -0,0 +1,61 @@
+import csv
+import io
+
+import pytest
+
+from password_meter.export import EXPORT_COLUMNS, export_history
+from password_meter.history import HistoryEntry, PasswordHistory, format_timestamp
+from password_meter.kdf import Hasher, is_kdf_digest
+from password_meter.sqlite_history import SQLiteHistory
+from password_meter.strength import STRENGTH_LABELS
+
+DIGEST = "$scrypt$ln=14,r=8,p=1$c2FsdA$aGFzaA"
+
+
+def _entries():
+    return [HistoryEntry("mail", "hunter2", 0, 1, 1_700_000_000, DIGEST),
+            HistoryEntry("bank", "correct horse battery", 2, 7, 1_700_086_400, DIGEST),
+            HistoryEntry("shop, inc", "Tr0ub4dor&3", 1, 4.5, 1_700_172_800)]
+
+
+def _export(history, fmt="CSV", chunk_rows=2):
+    out = io.BytesIO()
+    export_history(history, out, fmt, chunk_rows)
+    return out.getvalue()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def history(request, tmp_path):
+    hasher = Hasher(workers=0, kdf="scrypt")
+    if request.param == "memory":
+        history = PasswordHistory(_entries(), hasher=hasher)
+    else:
+        history = SQLiteHistory(str(tmp_path / "history.db"), hasher=hasher)
+        history.extend(_entries())
+    yield history
+    if request.param == "sqlite":
+        history.close()
+
+
+def test_csv_columns_come_from_the_entries(history):
+    rows = list(csv.reader(io.StringIO(_export(history).decode())))
+    assert tuple(rows[0]) == EXPORT_COLUMNS
+    assert [row[:2] + row[3:] for row in rows[1:]] == [
+        ["1", "mail", STRENGTH_LABELS[0], "1.0", format_timestamp(1_700_000_000)],
+        ["2", "bank", STRENGTH_LABELS[2], "7.0", format_timestamp(1_700_086_400)],
+        ["3", "shop, inc", STRENGTH_LABELS[1], "4.5", format_timestamp(1_700_172_800)],
+    ]
+    # The password column holds the stored digest, computed before exporting
+    digests = [row[2] for row in rows[1:]]
+    assert digests[:2] == [DIGEST, DIGEST]
+    assert is_kdf_digest(digests[2]) and digests[2] != DIGEST
+    assert _export(history, chunk_rows=1) == _export(history, chunk_rows=100)
+
+
+def test_arrow_columns_match_csv(history):
+    pa = pytest.importorskip("pyarrow")
+    table = pa.ipc.open_file(pa.BufferReader(_export(history, "Arrow"))).read_all()
+    assert tuple(table.column_names) == EXPORT_COLUMNS
+    assert table.column("strength").to_pylist() == [STRENGTH_LABELS[code] for code in (0, 2, 1)]
+    assert [ts.timestamp() for ts in table.column("timestamp").to_pylist()] == [1_700_000_000, 1_700_086_400,
+                                                                                 1_700_172_800]
@@ -0,0 +1,43 @@
+import string
+from collections import Counter
+
+from password_meter.generator import generate_password, generate_passwords
+
+SPECIAL = "!@#$%^&*()-_=+[]{}|;:,.<>?/"
+CLASSES = (string.ascii_lowercase, string.ascii_uppercase, string.digits, SPECIAL)
+
+
+def _classes(password):
+    return [any(char in pool for char in password) for pool in CLASSES]
+
+
+def test_every_password_has_each_selected_class():
+    for selected in ((True, True, True, True), (False, True, False, True), (True, False, True, False)):
+        upper, lower, digits, special = selected
+        pools = [pool for pool, on in zip(CLASSES, (lower, upper, digits, special)) if on]
+        for password in generate_passwords(2000, 6, upper, lower, digits, special):
+            assert len(password) == 6
+            assert all(any(char in pool for char in password) for pool in pools)
+            assert all(any(char in pool for pool in pools) for char in password)
+
+
+def test_short_passwords_keep_the_classes_that_fit():
+    for password in generate_passwords(1000, 2):
+        assert _classes(password)[:2] == [True, True]
+
+
+def test_no_class_selected_falls_back_to_all_classes():
+    for password in generate_passwords(500, 8, False, False, False, False):
+        assert all(_classes(password))
+
+
+def test_characters_are_spread_over_the_pool():
+    counts = Counter("".join(generate_passwords(2000, 16, include_upper=False, include_digits=False,
+                                                include_special=False)))
+    assert set(counts) == set(string.ascii_lowercase)
+    assert max(counts.values()) < 1.3 * min(counts.values())
+
+
+def test_matches_generate_password_guarantees():
+    for _ in range(200):
+        assert all(_classes(generate_password(4)))
@@ -0,0 +1,95 @@
+import random
+
+from password_meter.history import HistoryEntry, PasswordHistory
+
+DIGEST = "$scrypt$ln=14,r=8,p=1$c2FsdA$aGFzaA"
+
+
+def _entry(account, password, code=0, score=1, created=1_700_000_000):
+    return HistoryEntry(account, password, code, score, created, DIGEST)
+
+
+def test_reuse_counts_follow_appends_and_deletes():
+    history = PasswordHistory()
+    first = history.append(_entry("mail", "hunter2"))
+    history.append(_entry("bank", "hunter2"))
+    history.append(_entry("shop", "Hunter2"))
+    assert history.count("hunter2") == 2
+    assert history.count("Hunter2") == 1
+    assert history.count("hunter3") == 0
+
+    history.delete(first)
+    assert history.count("hunter2") == 1
+    history.clear()
+    assert history.count("hunter2") == 0
+
+
+def test_stats_match_a_rescan_after_deletes():
+    rng = random.Random(0)
+    history = PasswordHistory()
+    ids = [history.append(_entry("a", "x" * rng.randrange(1, 30), rng.randrange(3), rng.randrange(8)))
+           for _ in range(300)]
+    for entry_id in rng.sample(ids, 200):
+        history.delete(entry_id)
+
+    entries = list(history)
+    lengths = [len(entry.password) for entry in entries]
+    stats = history.stats
+    assert stats.count == len(entries)
+    assert stats.average_score == sum(entry.score for entry in entries) / len(entries)
+    assert stats.average_length == sum(lengths) / len(entries)
+    assert (stats.min_length, stats.max_length) == (min(lengths), max(lengths))
+    for category in stats.strength_counts:
+        assert stats.strength_counts[category] == sum(entry.category == category for entry in entries)
+
+
+def test_min_and_max_length_move_when_the_extremes_are_deleted():
+    history = PasswordHistory()
+    shortest = history.append(_entry("a", "abc"))
+    history.append(_entry("a", "abcdef"))
+    longest = history.append(_entry("a", "abcdefghi"))
+    history.delete(shortest)
+    history.delete(longest)
+    assert (history.stats.min_length, history.stats.max_length) == (6, 6)
+    history.clear()
+    assert (history.stats.count, history.stats.min_length, history.stats.average_score) == (0, 0, 0)
+
+
+def _expected_page(entries, page, page_size, account=None, strength=None):
+    matching = [entry for entry in reversed(entries)
+                if account in (None, entry.account) and strength in (None, entry.category)]
+    return matching[page * page_size:(page + 1) * page_size]
+
+
+def test_pages_match_a_filtered_scan():
+    rng = random.Random(1)
+    history = PasswordHistory()
+    for i in range(500):
+        history.append(_entry(rng.choice("abc"), f"password{i}", rng.randrange(3)))
+    for entry_id in rng.sample(range(1, 501), 300):
+        history.delete(entry_id)
+
+    entries = list(history)
+    for account in (None, "a", "c"):
+        for strength in (None, "Weak", "Strong"):
+            assert history.filtered_count(account, strength) == len(_expected_page(entries, 0, 1000, account, strength))
+            for page in range(4):
+                assert history.page(page, 25, account, strength) == _expected_page(entries, page, 25, account, strength)
+    assert history.accounts() == ["a", "b", "c"]
+    assert history.recent(3) == entries[:-4:-1]
+
+
+def test_tombstones_are_compacted():
+    history = PasswordHistory()
+    ids = [history.append(_entry("a", f"password{i}")) for i in range(100)]
+    for entry_id in ids[:60]:
+        history.delete(entry_id)
+    # Each filter list is compacted once tombstones outnumber live ids
+    for key, ids_left in history._index.items():
+        assert len(ids_left) - history._index_counts[key] <= history._index_counts[key]
+    assert [entry.id for entry in history.page(0, 100)] == ids[:59:-1]
+
+    for entry_id in ids[60:]:
+        history.delete(entry_id)
+    assert history._index == {}
+    assert history.page(0, 10) == []
@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import Future
+
+from password_meter.history import PasswordHistory, new_entry
+from password_meter.kdf import HASH_ATTEMPTS, Hasher, is_kdf_digest
+from password_meter.sqlite_history import SQLiteHistory
+
+
+class _GatedHasher(Hasher):
+    def __init__(self):
+        super().__init__(workers=1, kdf="scrypt")
+        self.gate = threading.Event()
+
+    def submit(self, password):
+        future = super().submit(password)
+        blocked = type(future)()
+        future.add_done_callback(lambda done: (self.gate.wait(), blocked.set_result(done.result())))
+        return blocked
+
+
+def test_pending_count_and_wait():
+    hasher = _GatedHasher()
+    history = PasswordHistory(hasher=hasher)
+    history.append(new_entry("a", "first password"))
+    history.append(new_entry("b", "second password"))
+    assert history.pending_hashes == 2
+    hasher.gate.set()
+    history.wait_hashes()
+    assert history.pending_hashes == 0
+    assert all(is_kdf_digest(entry.hash) for entry in history)
+    hasher.shutdown()
+
+
+def test_legacy_hashes_are_rehashed(tmp_path):
+    hasher = Hasher(workers=0, kdf="scrypt")
+    entry = new_entry("a", "old password")
+    entry.hash = "0123456789"
+    history = PasswordHistory([entry], hasher=hasher)
+    assert is_kdf_digest(history.get(1).hash)
+
+    path = str(tmp_path / "history.db")
+    history = SQLiteHistory(path, hasher=hasher)
+    history.append(new_entry("a", "old password"))
+    history._conn.execute("UPDATE history SET hash = '0123456789'")
+    history._conn.commit()
+    history.close()
+
+    history = SQLiteHistory(path, hasher=hasher)
+    history.wait_hashes()
+    assert is_kdf_digest(history.get(1).hash)
+    history.close()
+
+
+def test_clear_drops_pending_digests():
+    hasher = _GatedHasher()
+    history = PasswordHistory(hasher=hasher)
+    entry = new_entry("a", "first password")
+    history.append(entry)
+    history.clear()
+    assert history.pending_hashes == 0
+    history.wait_hashes(timeout=1)
+    hasher.gate.set()
+    hasher.shutdown()
+    assert not is_kdf_digest(entry.hash)
+
+
+class _FlakyHasher(Hasher):
+    def __init__(self, failures):
+        super().__init__(workers=0, kdf="scrypt")
+        self.failures = failures
+
+    def submit(self, password):
+        if self.failures:
+            self.failures -= 1
+            future = Future()
+            future.set_exception(OSError("out of memory"))
+            return future
+        return super().submit(password)
+
+
+def test_failed_digests_are_retried_then_logged(caplog):
+    history = PasswordHistory(hasher=_FlakyHasher(2))
+    history.append(new_entry("a", "first password"))
+    assert is_kdf_digest(history.get(1).hash)
+
+    history = PasswordHistory(hasher=_FlakyHasher(HASH_ATTEMPTS))
+    history.append(new_entry("a", "first password"))
+    assert history.pending_hashes == 0
+    assert not is_kdf_digest(history.get(1).hash)
+    assert "leaving the entry unhashed" in caplog.text
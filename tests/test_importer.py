@@ -0,0 +1,47 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from password_meter import importer
+from password_meter._parallel import ordered_map
+
+DOCUMENT = {
+    "encrypted": False,
+    "folders": [{"id": 12345, "name": "work"}],
+    "count": 1234567890,
+    "items": [
+        {"name": "bank", "login": {"password": "hunter2"}, "id": 9876543210, "score": -12.5e3},
+        {"name": "note", "type": 2, "login": None, "flags": [true_ for true_ in (True, False, None)]},
+        {"name": "mail", "login": {"password": "correct horse"}, "revision": 31415926535},
+        42,
+        12345678901234567890,
+    ],
+    "trailer": 3.14159,
+}
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 3, 5, 7, 64])
+def test_json_array_across_read_boundaries(monkeypatch, read_size):
+    monkeypatch.setattr(importer, "_READ_SIZE", read_size)
+    for text in (json.dumps(DOCUMENT), json.dumps(DOCUMENT, indent=2)):
+        assert list(importer.iter_json_array(io.StringIO(text), "items")) == DOCUMENT["items"]
+
+
+def test_bitwarden_with_tiny_reads(monkeypatch):
+    monkeypatch.setattr(importer, "_READ_SIZE", 3)
+    stream = io.BytesIO(json.dumps(DOCUMENT).encode())
+    records = [record and record[:2] for record in importer.iter_bitwarden(stream)]
+    assert records == [("bank", "hunter2"), None, ("mail", "correct horse"), None, None]
+
+
+def test_truncated_json_raises(monkeypatch):
+    monkeypatch.setattr(importer, "_READ_SIZE", 4)
+    with pytest.raises(ValueError):
+        list(importer.iter_json_array(io.StringIO('{"items": [1, 2'), "items"))
+
+
+def test_ordered_map_keeps_order():
+    with ThreadPoolExecutor(4) as executor:
+        assert list(ordered_map(executor, pow, range(50), (2,), 3)) == [i * i for i in range(50)]
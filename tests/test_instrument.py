@@ -0,0 +1,105 @@
+import json
+
+from password_meter import instrument
+
+
+class _Message:
+    def __init__(self, element=None, size=10):
+        self.size = size
+        self.delta = _Oneof("new_element", new_element=_Oneof(element))
+        self.type = "delta" if element else "page_info"
+
+    def ByteSize(self):
+        return self.size
+
+    def WhichOneof(self, group):
+        return self.type
+
+
+# Stand-in for a protobuf message with one "type" oneof
+class _Oneof:
+    def __init__(self, which, **fields):
+        self.which = which
+        self.__dict__.update(fields)
+
+    def WhichOneof(self, group):
+        return self.which
+
+
+class _Context:
+    def __init__(self):
+        self.sent = []
+
+    def _enqueue(self, msg):
+        self.sent.append(msg)
+
+
+def test_timed_calls_are_counted_only_inside_a_rerun():
+    double = instrument.timed("double", lambda x: 2 * x)
+    assert double(1) == 2
+    metrics = instrument.begin_rerun("session")
+    metrics.mark("setup")
+    assert double(2) == 4 and double(3) == 6
+    metrics.mark("tab")
+    with metrics.timer("block"):
+        pass
+    metrics.finish()
+    assert double(4) == 8
+    assert instrument.current() is None
+
+    record = metrics.as_dict()
+    assert record["calls"] == {"double": 2, "block": 1}
+    assert set(record["phases_ms"]) == {"setup", "tab"}
+    assert sum(metrics.phases.values()) <= metrics.wall_seconds
+    assert record["payload_bytes"] is None
+
+
+def test_fragment_reruns_get_their_own_metrics():
+    outer = instrument.begin_rerun()
+    assert instrument.begin_fragment("check") == (outer, False)
+    outer.finish()
+
+    metrics, own = instrument.begin_fragment("check")
+    assert own and metrics.fragment == "check"
+    assert "fragment: check" in metrics.finish().phases
+
+
+def test_messages_are_counted_through_the_session_queue():
+    ctx = _Context()
+    metrics = instrument.begin_rerun(ctx=ctx)
+    ctx._enqueue(_Message("markdown", 30))
+    ctx._enqueue(_Message("markdown", 20))
+    ctx._enqueue(_Message(None, 5))
+    metrics.finish()
+    # The hook is installed once and reports to whichever rerun is active
+    second = instrument.begin_rerun(ctx=ctx)
+    ctx._enqueue(_Message("button", 7))
+    second.finish()
+
+    assert len(ctx.sent) == 4
+    assert (metrics.messages, metrics.payload_bytes, metrics.elements) == (3, 55, {"markdown": 2})
+    assert metrics.as_dict()["markdown_calls"] == 2
+    assert (second.messages, second.payload_bytes, dict(second.elements)) == (1, 7, {"button": 1})
+
+
+def test_jsonl_and_prometheus_outputs(tmp_path, monkeypatch):
+    monkeypatch.setattr(instrument, "_prometheus_totals", {})
+    metrics = instrument.begin_rerun("session")
+    metrics.mark("setup")
+    metrics.record("score_password", 0.5)
+    metrics.finish()
+
+    log = tmp_path / "reruns.jsonl"
+    instrument.write_jsonl(str(log), metrics)
+    instrument.write_jsonl(str(log), metrics)
+    records = [json.loads(line) for line in log.read_text().splitlines()]
+    assert len(records) == 2 and records[0]["call_ms"] == {"score_password": 500.0}
+
+    prom = tmp_path / "metrics.prom"
+    instrument.write_prometheus(str(prom), metrics)
+    instrument.write_prometheus(str(prom), metrics)
+    text = prom.read_text()
+    assert "password_meter_reruns_total 2\n" in text
+    assert 'password_meter_calls_total{function="score_password"} 2\n' in text
+    assert 'password_meter_call_seconds_total{function="score_password"} 1.000000\n' in text
+    assert 'password_meter_phase_seconds_total{phase="setup"}' in text
@@ -0,0 +1,68 @@
+import math
+
+import pytest
+
+from password_meter.generator import generate_passphrase, passphrase_conflicts, passphrase_entropy
+from password_meter.policy import compile_policy
+from password_meter.wordlist import Wordlist, build_wordlist, open_wordlist
+
+
+@pytest.fixture
+def wordlist(tmp_path):
+    source = tmp_path / "words.txt"
+    source.write_text("11111\tapple\n11112\t123go\n11113\tbanana\n11114\t-dash\nApple\n")
+    build_wordlist([str(source)], str(tmp_path / "words.idx"))
+    return Wordlist(str(tmp_path / "words.idx"))
+
+
+def test_words_are_lowercased_and_unique(wordlist):
+    assert sorted(wordlist[i] for i in range(len(wordlist))) == ["-dash", "123go", "apple", "banana"]
+
+
+def test_random_capitalization_counts_only_letter_words(wordlist):
+    assert wordlist.capitalizable == 2
+    assert passphrase_entropy(6, wordlist) == pytest.approx(6 * math.log2(4))
+    assert passphrase_entropy(6, wordlist, "random") == pytest.approx(6 * math.log2(4) + 6 * 2 / 4)
+
+
+def test_generate_uses_separator(wordlist):
+    words = generate_passphrase(5, "_", "title", wordlist).split("_")
+    assert len(words) == 5
+    assert all(word.lower() in {"-dash", "123go", "apple", "banana"} for word in words)
+
+
+def test_policy_conflicts():
+    policy = {"min_length": 8, "require": ["upper", "lower", "special"], "special_chars": "-!"}
+    assert passphrase_conflicts(policy, "-", "title") == []
+    assert len(passphrase_conflicts(policy, " ", "lower")) == 2
+    assert len(passphrase_conflicts({"require": ["digits"]}, "-", "title")) == 1
+    with pytest.raises(ValueError, match="digit"):
+        generate_passphrase(4, "-", "title", None, policy={"require": ["digits"]})
+
+
+def test_policy_passphrases_comply(wordlist):
+    policy = {"min_length": 12, "require": ["lower", "special"], "special_chars": "-",
+              "banned": ["banana"], "forbid_account_name": True}
+    for _ in range(50):
+        passphrase = generate_passphrase(3, "-", "title", wordlist, policy=policy, account="apple.com")
+        assert compile_policy(policy).complies(passphrase, "apple.com")
+        assert "banana" not in passphrase.lower() and "apple" not in passphrase.lower()
+
+
+def test_unsatisfiable_policy_raises(wordlist):
+    with pytest.raises(ValueError, match="met the policy"):
+        generate_passphrase(3, "-", "lower", wordlist, policy={"require": [], "min_length": 1, "max_length": 4})
+
+
+def test_wordlist_paths_are_opened_once(tmp_path):
+    source = tmp_path / "words.txt"
+    source.write_text("apple\nbanana\n")
+    path = str(tmp_path / "words.idx")
+    build_wordlist([str(source)], path)
+    assert open_wordlist(path) is open_wordlist(path)
+    assert passphrase_entropy(2, path) == pytest.approx(2)
+
+    source.write_text("apple\nbanana\ncherry\n9lives\n")
+    build_wordlist([str(source)], path)
+    assert len(open_wordlist(path)) == 4
+    assert open_wordlist(path).capitalizable == 3
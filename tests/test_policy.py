@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from password_meter.generator import generate_password
+from password_meter.policy import compile_policy
+
+
+def _banned(policy, password, account=None):
+    return sorted(v for v in policy.check(password, account) if v.startswith("Do not include"))
+
+
+def test_overlapping_banned_terms_are_all_reported():
+    policy = compile_policy({"min_length": 1, "require": [], "banned": ["he", "she", "hers"]})
+    assert _banned(policy, "ushers") == ["Do not include 'he'", "Do not include 'hers'", "Do not include 'she'"]
+    assert _banned(policy, "SHE") == ["Do not include 'he'", "Do not include 'she'"]
+
+
+def test_terms_match_naive_search():
+    rng = random.Random(0)
+    terms = ["ab", "bab", "abab", "b", "ca", "abc"]
+    policy = compile_policy({"min_length": 1, "require": [], "banned": terms})
+    for _ in range(500):
+        password = "".join(rng.choices("abcd", k=rng.randint(0, 12)))
+        expected = sorted(f"Do not include '{term}'" for term in terms if term in password)
+        assert _banned(policy, password) == expected, password
+
+
+def test_generated_passwords_avoid_every_term():
+    policy = compile_policy({"min_length": 16, "banned": ["he", "she", "hers", "aa"], "max_run": 1})
+    for _ in range(200):
+        assert policy.complies(policy.generate(16))
+
+
+def test_impossible_policy_raises():
+    policy = compile_policy({"min_length": 4, "require": ["digits"], "special_chars": "",
+                             "banned": [str(digit) for digit in range(10)]})
+    with pytest.raises(ValueError):
+        policy.generate(8, include=("digits",))
+
+
+def test_generated_passwords_avoid_the_account_name():
+    policy = compile_policy({"min_length": 12, "require": [], "forbid_account_name": True})
+    for _ in range(200):
+        password = generate_password(12, include_upper=False, include_digits=False, include_special=False,
+                                     policy=policy, account="abc-cba")
+        assert policy.complies(password, "abc-cba")
+        assert "abc" not in password and "cba" not in password
@@ -0,0 +1,27 @@
+from password_meter.estimator import PLAINTEXT_KEYS, describe_patterns, estimate_strength
+from password_meter.score_cache import ScoreCache, score_password
+
+PASSWORDS = ["Password1!", "qwertyuiop", "abcabcabc", "aaaaaaa", "1994-03-12", "drowssap", "p4ssw0rd", "xK9#mQ2$"]
+
+
+def test_cached_estimates_hold_no_plaintext():
+    cache = ScoreCache()
+    for password in PASSWORDS:
+        score_password(password, cache)
+    for _, value in cache._entries.values():
+        for match in value[2]["sequence"]:
+            assert not set(PLAINTEXT_KEYS) & set(match)
+
+
+def test_descriptions_match_uncached():
+    cache = ScoreCache()
+    for password in PASSWORDS:
+        _, _, estimate, _ = score_password(password, cache)
+        assert describe_patterns(estimate, password) == describe_patterns(estimate_strength(password))
+
+
+def test_hits_and_size_limit():
+    cache = ScoreCache(maxsize=2)
+    for password in ["a", "b", "a", "c", "b"]:
+        score_password(password, cache)
+    assert (cache.hits, cache.misses, cache.evictions, len(cache)) == (1, 4, 2, 2)
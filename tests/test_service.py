@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import pytest
+
+from password_meter.score_cache import ScoreCache, score_password
+from password_meter.service import MAX_BODY, score_passwords, start_service
+from password_meter.strength import STRENGTH_CATEGORIES
+
+
+def test_labels_match_the_app():
+    passwords = ["Password1!", "P@ssw0rd2024!", "abc", "Tr0ub4dor&3x!q", "kX9#mQ2$vL7@nR4!"]
+    cache = ScoreCache(maxsize=0)
+    for password, result in zip(passwords, score_passwords(passwords)):
+        score, criteria, _, code = score_password(password, cache)
+        assert result["score"] == score
+        assert result["criteria"] == criteria
+        assert result["label"] == STRENGTH_CATEGORIES[code]
+
+
+async def _exchange(request):
+    service, server = await start_service(port=0)
+    try:
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 10)
+        writer.close()
+    finally:
+        server.close()
+        await server.wait_closed()
+        await service.batcher.stop()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def _post(body, length):
+    headers = b"" if length is None else b"Content-Length: " + length.encode() + b"\r\n"
+    return b"POST /score HTTP/1.1\r\nConnection: close\r\n" + headers + b"\r\n" + body
+
+
+@pytest.mark.parametrize("length", ["abc", "-1", "+5", "1_0", "1.5", "١"])
+def test_bad_content_length(length):
+    status, body = asyncio.run(_exchange(_post(b"", length)))
+    assert status == 400
+    assert "Content-Length" in body["error"]
+
+
+def test_missing_content_length():
+    status, body = asyncio.run(_exchange(_post(b"", None)))
+    assert status == 400
+    assert body["error"] == "'password' must be a string"
+
+
+def test_content_length_too_large():
+    status, _ = asyncio.run(_exchange(_post(b"", str(MAX_BODY + 1))))
+    assert status == 413
+
+
+def test_score_request():
+    payload = json.dumps({"password": "Password1!"}).encode()
+    status, body = asyncio.run(_exchange(_post(payload, str(len(payload)))))
+    assert status == 200
+    assert body["label"] == score_passwords(["Password1!"])[0]["label"]
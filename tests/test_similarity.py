@@ -0,0 +1,27 @@
+from password_meter.similarity import SimilarityIndex
+
+
+def test_digit_only_passwords_are_not_grouped():
+    index = SimilarityIndex()
+    for i, password in enumerate(["123456", "987654321", "20240101", "5"]):
+        index.add(i, password)
+    assert index.query("31415926") == []
+    assert index.query("1") == []
+
+
+def test_normalized_candidates_respect_threshold():
+    index = SimilarityIndex()
+    index.add(1, "Summer2024!")
+    index.add(2, "Summer1!")
+    assert [entry_id for entry_id, _ in index.query("Summer2025!")] == [1]
+    for _, score in index.query("Summer9999999!"):
+        assert score >= index.threshold
+
+
+def test_remove_short_and_digit_passwords():
+    index = SimilarityIndex()
+    index.add(1, "1234")
+    index.add(2, "1235")
+    index.remove(1)
+    index.remove(2)
+    assert index._buckets == {}
@@ -0,0 +1,78 @@
+import copy
+import random
+
+import pytest
+
+from password_meter.history import HistoryEntry, PasswordHistory
+from password_meter.kdf import Hasher
+from password_meter.sqlite_history import SQLiteHistory
+
+DIGEST = "$scrypt$ln=14,r=8,p=1$c2FsdA$aGFzaA"
+
+
+def _entries(n, seed=0):
+    rng = random.Random(seed)
+    return [HistoryEntry(f"account{rng.randrange(6)}", f"password{rng.randrange(150)}", rng.randrange(3),
+                         rng.randrange(8), 1_700_000_000 - rng.randrange(86400 * 60), DIGEST) for _ in range(n)]
+
+
+@pytest.fixture
+def backends(tmp_path):
+    hasher = Hasher(workers=0, kdf="scrypt")
+    sqlite = SQLiteHistory(str(tmp_path / "history.db"), hasher=hasher)
+    memory = PasswordHistory(hasher=hasher)
+    entries = _entries(400)
+    for entry in entries[:100]:
+        sqlite.append(copy.copy(entry))
+        memory.append(copy.copy(entry))
+    sqlite.extend(copy.copy(entry) for entry in entries[100:])
+    memory.extend(copy.copy(entry) for entry in entries[100:])
+    for entry_id in range(1, 401, 7):
+        sqlite.delete(entry_id)
+        memory.delete(entry_id)
+    yield sqlite, memory
+    sqlite.close()
+
+
+def test_paging_and_counts_match(backends):
+    sqlite, memory = backends
+    assert len(sqlite) == len(memory)
+    assert sqlite.accounts() == memory.accounts()
+    for account in (None, "account1"):
+        for strength in (None, "Strong", "Weak"):
+            assert sqlite.filtered_count(account, strength) == memory.filtered_count(account, strength)
+            assert sqlite.page(1, 25, account, strength) == memory.page(1, 25, account, strength)
+    for password in ("password7", "password149", "missing"):
+        assert sqlite.count(password) == memory.count(password)
+
+
+def test_aggregates_match(backends):
+    sqlite, memory = backends
+    a, b = sqlite.stats, memory.stats
+    assert (a.count, a.length_sum, a.min_length, a.max_length) == (b.count, b.length_sum, b.min_length, b.max_length)
+    assert a.score_sum == pytest.approx(b.score_sum)
+    assert dict(a.strength_counts) == dict(b.strength_counts)
+    assert dict(a.length_counts) == dict(b.length_counts)
+    for period in ("day", "week"):
+        assert sqlite.trends.series(period) == memory.trends.series(period)
+        assert sqlite.trends.account_trends(period) == memory.trends.account_trends(period)
+
+
+def test_snapshots_follow_changes(backends):
+    sqlite, memory = backends
+    stats = sqlite.stats
+    assert sqlite.stats is stats
+    sqlite.append(HistoryEntry("new", "new password", 2, 7, 1_700_000_000, DIGEST))
+    assert sqlite.stats.count == stats.count + 1
+    sqlite.clear()
+    assert sqlite.stats.count == 0
+    assert sqlite.trends.series("day") == []
+
+
+def test_reuse_digest_is_keyed(tmp_path, backends):
+    sqlite, _ = backends
+    digests = {row[0] for row in sqlite._query("SELECT digest FROM history")}
+    other = SQLiteHistory(str(tmp_path / "other.db"), hasher=Hasher(workers=0, kdf="scrypt"))
+    other.extend(copy.copy(entry) for entry in _entries(50))
+    assert not digests & {row[0] for row in other._query("SELECT digest FROM history")}
+    other.close()
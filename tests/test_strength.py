@@ -0,0 +1,38 @@
+import random
+import string
+
+import pytest
+
+from password_meter.strength import CRITERIA, check_strength, check_strength_batch
+
+ALPHABET = string.ascii_letters + string.digits + "!@#$%^&*()-_ é€😀\t"
+
+
+def _random_passwords(n, seed=0):
+    rng = random.Random(seed)
+    passwords = ["", "password", "PASSWORD", "Password1!", "123456", "qwerty", "é", "😀" * 20]
+    passwords += ["".join(rng.choices(ALPHABET, k=rng.randint(0, 24))) for _ in range(n)]
+    return passwords
+
+
+def test_batch_matches_single():
+    passwords = _random_passwords(2000)
+    columns = check_strength_batch(passwords)
+    for i, password in enumerate(passwords):
+        score, criteria = check_strength(password)
+        assert columns["score"][i] == score, password
+        for name in CRITERIA:
+            assert columns[name][i] == criteria[name], (password, name)
+
+
+def test_batch_accepts_any_iterable():
+    passwords = _random_passwords(50, seed=1)
+    assert check_strength_batch(iter(passwords)) == check_strength_batch(passwords)
+
+
+def test_batch_keeps_pandas_index():
+    pd = pytest.importorskip("pandas")
+    series = pd.Series(["abc", "Password1!"], index=[10, 20])
+    frame = check_strength_batch(series)
+    assert list(frame.index) == [10, 20]
+    assert list(frame["score"]) == [check_strength("abc")[0], check_strength("Password1!")[0]]
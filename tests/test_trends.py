@@ -0,0 +1,33 @@
+import random
+from types import SimpleNamespace
+
+from password_meter.trends import TrendIndex
+
+
+def _entries(n, accounts, seed=0):
+    rng = random.Random(seed)
+    return [SimpleNamespace(account=f"account{rng.randrange(accounts)}", created=1.7e9 - rng.randrange(86400 * 90),
+                            score=rng.random() * 7, code=rng.randrange(3)) for _ in range(n)]
+
+
+def test_top_accounts_match_full_ranking():
+    trends = TrendIndex()
+    entries = _entries(5000, 300)
+    for entry in entries:
+        trends.add(entry)
+    for entry in entries[::4]:
+        trends.discard(entry)
+    assert trends.account_trends("week", 4, 10) == trends.account_trends("week", 4)[:10]
+    assert trends.account_trends("day", 7, 1000) == trends.account_trends("day", 7)
+
+
+def test_account_counts_follow_discards():
+    trends = TrendIndex()
+    entries = _entries(50, 3, seed=1)
+    for entry in entries:
+        trends.add(entry)
+    for entry in entries:
+        trends.discard(entry)
+    assert trends.accounts() == []
+    assert trends.top_accounts(5) == []
+    assert not trends.has_account("account0")